@@ -0,0 +1,77 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+from dateutil import parser as dtparser
+from Evtx.Evtx import Evtx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rdp_analyzer.utils import safe_dt, filetime_to_dt
+from rdp_analyzer.evtx_reader import iter_evtx_records
+
+# SystemTime 처리 방식별 records/sec 비교 (before: dateutil, after: fast ISO / raw FILETIME)
+
+
+def collect_inputs(paths):
+    """
+    SystemTime 문자열(XML 경로 입력)과 record header 의 raw FILETIME 을 모음.
+    """
+    strings, filetimes = [], []
+    for path in paths:
+        with Evtx(path) as log:
+            for record in log.records():
+                strings.append(record.timestamp().isoformat(" "))
+                filetimes.append(record.unpack_qword(0x10))
+    return strings, filetimes
+
+
+def rate(func, values, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for v in values:
+            func(v)
+    elapsed = time.perf_counter() - start
+    return len(values) * repeat / elapsed if elapsed else float("inf")
+
+
+def reader_rate(paths, reader):
+    start = time.perf_counter()
+    n = 0
+    for path in paths:
+        for _ in iter_evtx_records(path, reader=reader):
+            n += 1
+    elapsed = time.perf_counter() - start
+    return n / elapsed if elapsed else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timestamp decoding benchmark (records/sec)")
+    parser.add_argument("--input", default="input", help="Directory with .evtx files")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.input, "*.evtx")))
+    strings, filetimes = collect_inputs(paths)
+    print(f"[*] {len(strings)} records from {len(paths)} files, repeat={args.repeat}")
+
+    results = {
+        "before: dateutil.parser.parse": rate(dtparser.parse, strings, args.repeat),
+        "after : safe_dt (strict ISO fast path)": rate(safe_dt, strings, args.repeat),
+        "after : filetime_to_dt (raw FILETIME)": rate(filetime_to_dt, filetimes, args.repeat),
+    }
+    for name, r in results.items():
+        print(f"{name:<42} {r:>14,.0f} records/sec")
+
+    print("\n[iter_evtx_records end-to-end]")
+    for reader in ("xml", "native"):
+        print(f"reader={reader:<7} {reader_rate(paths, reader):>14,.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
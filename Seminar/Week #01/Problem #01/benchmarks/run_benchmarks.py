@@ -0,0 +1,196 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import subprocess
+from itertools import islice
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rdp_analyzer.evtx_reader import iter_evtx_records, READERS
+from rdp_analyzer.parsers import parse_records
+from rdp_analyzer.event_store import EventStore
+from rdp_analyzer.correlator import correlate_sessions
+from rdp_analyzer.failures import analyze_failures
+from rdp_analyzer.outputs import write_sessions, write_failures, write_timeline, write_summary_report
+from build_session_artifacts import load_timeline, build_sessions_from_timeline
+
+from synth_evtx import load_corpus
+
+# synthetic corpus(synth_evtx.py) 로 pipeline 단계를 하나씩 따로 측정해서 JSON 으로 남김.
+# 각 단계의 입력은 측정 전에 미리 만들어 두므로 앞 단계 비용이 섞이지 않음.
+
+STAGES = ("read", "parse", "correlate", "failures", "outputs", "build_sessions")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(func, repeat):
+    """
+    Run func repeat times. Returns (last result, [seconds per run]).
+    """
+    runs = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+
+def _entry(runs, records):
+    best = min(runs)
+    return {
+        "records": records,
+        "seconds": round(best, 6),
+        "runs": [round(r, 6) for r in runs],
+        "records_per_sec": round(records / best, 1) if best else None,
+    }
+
+
+class Bench:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+
+    def run(self, name, func, records):
+        result, runs = timed(func, self.repeat)
+        n = records(result) if callable(records) else records
+        self.results[name] = _entry(runs, n)
+        r = self.results[name]
+        rate = f"{r['records_per_sec']:>14,.0f} rec/s" if r["records_per_sec"] else ""
+        print(f"{name:<36} {r['seconds']:>10.4f}s  {n:>10,} rec {rate}")
+        return result
+
+
+def _files(manifest, log_type=None):
+    return [f for f in manifest["files"] if log_type is None or f["log_type"] == log_type]
+
+
+def _records(manifest, log_type, reader, limit):
+    records = (r for f in _files(manifest, log_type) for r in iter_evtx_records(f["path"], reader=reader))
+    return islice(records, limit)
+
+
+def bench_read(bench, manifest, readers, limit):
+    for reader in readers:
+        for log_type in sorted({f["log_type"] for f in manifest["files"]}):
+            bench.run(f"iter_evtx_records[{reader}][{log_type}]",
+                      lambda: sum(1 for _ in _records(manifest, log_type, reader, limit)),
+                      lambda n: n)
+
+
+def bench_parse(bench, manifest, limit):
+    stores = {}
+    for log_type in sorted({f["log_type"] for f in manifest["files"]}):
+        # reader 비용은 빼고 parser + EventStore 적재만 측정
+        records = list(_records(manifest, log_type, "native", limit))
+        stores[log_type] = bench.run(f"parse_records[{log_type}]",
+                                     lambda: EventStore(log_type).extend(parse_records(records, log_type)),
+                                     len(records))
+    return stores
+
+
+def load_fixtures(manifest):
+    return {log_type: EventStore.load(path) for log_type, path in manifest["fixtures"].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage benchmark on a synthetic EVTX corpus")
+    parser.add_argument("--corpus", default="synth_corpus", help="Directory written by synth_evtx.py")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma separated: " + ",".join(STAGES))
+    parser.add_argument("--readers", default=",".join(READERS))
+    parser.add_argument("--limit", type=int, default=200_000,
+                        help="Max records per log type for the read/parse stages (0 = all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is reported")
+    parser.add_argument("--json", default="bench_results.json", help="Where to write the results")
+    parser.add_argument("--work", help="Directory for the output stages (default: a temp dir, removed)")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    limit = args.limit or None
+
+    manifest = load_corpus(args.corpus)
+    bench = Bench(args.repeat)
+    print(f"[*] Corpus {args.corpus}: {sum(f['records'] for f in manifest['files']):,} records, "
+          f"{len(manifest['files'])} files, repeat={args.repeat}")
+
+    if "read" in stages:
+        bench_read(bench, manifest, args.readers.split(","), limit)
+
+    stores = bench_parse(bench, manifest, limit) if "parse" in stages else {}
+    if manifest.get("fixtures"):
+        # 뒤 단계는 corpus 전체(fixture)로 측정
+        stores = load_fixtures(manifest)
+    security = stores.get("Security", EventStore("Security"))
+    rcm = stores.get("RCM", EventStore("RCM"))
+    lsm = stores.get("LSM", EventStore("LSM"))
+    n_events = len(security) + len(rcm) + len(lsm)
+
+    sessions = None
+    if "correlate" in stages or "outputs" in stages:
+        sessions = bench.run("correlate_sessions",
+                             lambda: correlate_sessions(security, rcm, lsm), n_events)
+
+    failures = None
+    if "failures" in stages or "outputs" in stages:
+        failures = bench.run("analyze_failures", lambda: analyze_failures(security), len(security))
+
+    work = args.work or tempfile.mkdtemp(prefix="rdp_bench_")
+    os.makedirs(work, exist_ok=True)
+    try:
+        timeline_path = None
+        if "outputs" in stages:
+            df_failures, by_ip, by_user_ip = failures
+            bench.run("write_sessions", lambda: write_sessions(work, sessions), len(sessions))
+            bench.run("write_failures", lambda: write_failures(work, df_failures, by_ip, by_user_ip),
+                      len(df_failures))
+            timeline_path = bench.run("write_timeline", lambda: write_timeline(work, security, rcm, lsm), n_events)
+            bench.run("write_summary_report",
+                      lambda: write_summary_report(work, sessions, by_ip, by_user_ip), len(sessions))
+
+        if "build_sessions" in stages:
+            if timeline_path is None:
+                timeline_path = write_timeline(work, security, rcm, lsm)
+            timeline = load_timeline(timeline_path)
+            bench.run("build_sessions_from_timeline", lambda: build_sessions_from_timeline(timeline),
+                      len(timeline))
+    finally:
+        if not args.work:
+            shutil.rmtree(work, ignore_errors=True)
+
+    result = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "corpus": {"path": os.path.abspath(args.corpus), "params": manifest["params"], "counts": manifest["counts"]},
+        "limit": limit,
+        "repeat": args.repeat,
+        "stages": bench.results,
+    }
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\n[+] Results: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
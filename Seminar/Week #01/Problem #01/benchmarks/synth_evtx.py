@@ -0,0 +1,755 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import sys
+import json
+import heapq
+import random
+import struct
+import hashlib
+import argparse
+import zlib
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rdp_analyzer.config import LOG_TYPE_EVENT_IDS
+from rdp_analyzer.parsers import PARSERS
+from rdp_analyzer.raw_index import RawRef
+from rdp_analyzer.event_store import EventStore
+from rdp_analyzer.utils import filetime_to_dt, ensure_dir
+
+# 벤치마크용 synthetic EVTX 생성기.
+# 실제 EVTX 와 같은 구조(file header / 64 KiB chunk / BinXML template + 치환값)로 쓰기 때문에
+# python-evtx 와 native reader 가 그대로 읽을 수 있음. 같은 이벤트를 parser 에 통과시킨
+# EventStore(.col) 도 fixture 로 같이 저장해서 파싱 없이 correlate/output 단계만 잴 수 있음.
+
+CORPUS_MANIFEST_NAME = "corpus.json"
+
+FILE_HEADER_SIZE = 0x1000
+CHUNK_SIZE = 0x10000
+CHUNK_HEADER_SIZE = 0x200
+MAX_CHUNKS_PER_FILE = 0xFFFF   # file header 의 chunk_count 는 word
+
+FILETIME_EPOCH_DIFF = 11644473600
+
+# BinXML tokens
+T_EOF, T_OPEN, T_CLOSE_START, T_CLOSE_EMPTY, T_CLOSE = 0x00, 0x01, 0x02, 0x03, 0x04
+T_VALUE, T_ATTR, T_TEMPLATE, T_SUB, T_OPT_SUB, T_START = 0x05, 0x06, 0x0C, 0x0D, 0x0E, 0x0F
+HAS_MORE = 0x40
+
+# value types
+V_NULL, V_WSTRING, V_UINT8, V_UINT16, V_UINT32, V_UINT64 = 0x00, 0x01, 0x04, 0x06, 0x08, 0x0A
+V_GUID, V_FILETIME, V_SID, V_HEX32, V_HEX64 = 0x0F, 0x11, 0x13, 0x14, 0x15
+
+# Default event mix (relative weights)
+DEFAULT_MIX = {
+    4624: 10, 4634: 10, 4672: 5, 4625: 30, 1149: 10,
+    21: 8, 22: 8, 23: 6, 24: 6, 25: 7,
+}
+
+LOGS = {
+    "Security": {
+        "file": "Security",
+        "provider": "Microsoft-Windows-Security-Auditing",
+        "guid": "{54849625-5478-4994-a5ba-3e3b0328c30d}",
+        "channel": "Security",
+    },
+    "LSM": {
+        "file": "Microsoft-Windows-TerminalServices-LocalSessionManager%4Operational",
+        "provider": "Microsoft-Windows-TerminalServices-LocalSessionManager",
+        "guid": "{5d896912-022d-40aa-a3a8-4fa5515c76d7}",
+        "channel": "Microsoft-Windows-TerminalServices-LocalSessionManager/Operational",
+    },
+    "RCM": {
+        "file": "Microsoft-Windows-TerminalServices-RemoteConnectionManager%4Operational",
+        "provider": "Microsoft-Windows-TerminalServices-RemoteConnectionManager",
+        "guid": "{c76baa63-ae81-421c-b425-340b4b24157f}",
+        "channel": "Microsoft-Windows-TerminalServices-RemoteConnectionManager/Operational",
+    },
+}
+
+# EventData / UserData field 별 value type
+SECURITY_FIELDS = {
+    4624: [("SubjectUserSid", V_SID), ("SubjectUserName", V_WSTRING), ("SubjectDomainName", V_WSTRING),
+           ("SubjectLogonId", V_HEX64), ("TargetUserSid", V_SID), ("TargetUserName", V_WSTRING),
+           ("TargetDomainName", V_WSTRING), ("TargetLogonId", V_HEX64), ("LogonType", V_UINT32),
+           ("LogonProcessName", V_WSTRING), ("AuthenticationPackageName", V_WSTRING),
+           ("WorkstationName", V_WSTRING), ("IpAddress", V_WSTRING), ("IpPort", V_WSTRING)],
+    4625: [("SubjectUserSid", V_SID), ("SubjectUserName", V_WSTRING), ("SubjectDomainName", V_WSTRING),
+           ("SubjectLogonId", V_HEX64), ("TargetUserName", V_WSTRING), ("TargetDomainName", V_WSTRING),
+           ("Status", V_HEX32), ("FailureReason", V_WSTRING), ("SubStatus", V_HEX32),
+           ("LogonType", V_UINT32), ("WorkstationName", V_WSTRING), ("IpAddress", V_WSTRING),
+           ("IpPort", V_WSTRING)],
+    4634: [("TargetUserSid", V_SID), ("TargetUserName", V_WSTRING), ("TargetDomainName", V_WSTRING),
+           ("TargetLogonId", V_HEX64), ("LogonType", V_UINT32)],
+    4672: [("SubjectUserSid", V_SID), ("SubjectUserName", V_WSTRING), ("SubjectDomainName", V_WSTRING),
+           ("SubjectLogonId", V_HEX64), ("PrivilegeList", V_WSTRING)],
+}
+USERDATA_FIELDS = {
+    1149: ["Param1", "Param2", "Param3"],
+    21: ["User", "SessionID", "Address"],
+    22: ["User", "SessionID", "Address"],
+    23: ["User", "SessionID"],
+    24: ["User", "SessionID", "Address"],
+    25: ["User", "SessionID", "Address"],
+}
+
+# System 의 치환값 순서 (template 마다 공통)
+# 0~7: EventID, Version, Level, Task, Opcode, Keywords, SystemTime, EventRecordID
+_SUB_PROCESS, _SUB_THREAD, _SUB_COMPUTER, _SUB_USERID = 8, 9, 10, 11
+_FIRST_DATA_SUB = 12
+
+
+def log_type_of_event(event_id):
+    for log_type, ids in LOG_TYPE_EVENT_IDS.items():
+        if ids is not None and event_id in ids:
+            return log_type
+    raise ValueError(f"unsupported event id: {event_id}")
+
+
+def parse_mix(text):
+    """
+    "4624=10,4625=30,..." -> {event_id: weight}
+    """
+    mix = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        eid, _, weight = part.partition("=")
+        eid = int(eid)
+        log_type_of_event(eid)
+        mix[eid] = float(weight) if weight else 1.0
+    return mix
+
+
+def dt_to_filetime(dt):
+    return int(round((dt.replace(tzinfo=timezone.utc).timestamp() + FILETIME_EPOCH_DIFF) * 1_000_000)) * 10
+
+
+# ------------------------------------------------------------
+# value encoding (python-evtx 의 VariantTypeNode.string() 과 같은 문자열로 렌더링)
+# ------------------------------------------------------------
+def _sid_bytes(sid):
+    parts = sid.split("-")
+    authority = int(parts[2])
+    subs = [int(p) for p in parts[3:]]
+    return (struct.pack("<BB", int(parts[1]), len(subs)) + authority.to_bytes(6, "big")
+            + b"".join(struct.pack("<I", s) for s in subs))
+
+
+def encode_value(type_, value):
+    if value is None:
+        return V_NULL, b""
+    if type_ == V_WSTRING:
+        return type_, value.encode("utf-16-le")
+    if type_ == V_UINT8:
+        return type_, struct.pack("<B", value)
+    if type_ == V_UINT16:
+        return type_, struct.pack("<H", value)
+    if type_ == V_UINT32:
+        return type_, struct.pack("<I", int(value))
+    if type_ in (V_UINT64, V_FILETIME):
+        return type_, struct.pack("<Q", value)
+    if type_ == V_HEX32:
+        return type_, struct.pack("<I", int(value, 16))
+    if type_ == V_HEX64:
+        return type_, struct.pack("<Q", int(value, 16))
+    if type_ == V_SID:
+        return type_, _sid_bytes(value)
+    if type_ == V_GUID:
+        return type_, value
+    raise ValueError(f"unsupported value type {type_:#x}")
+
+
+def render_value(type_, value):
+    """
+    What the readers see for a substitution value (data dict 문자열).
+    """
+    if value is None:
+        return None
+    if type_ == V_HEX32:
+        return "0x{:08x}".format(int(value, 16))
+    if type_ == V_HEX64:
+        return "0x{:016x}".format(int(value, 16))
+    return str(value)
+
+
+def _name_hash(name):
+    h = 0
+    for c in name:
+        h = (h * 65599 + ord(c)) & 0xFFFFFFFF
+    return h & 0xFFFF
+
+
+# ------------------------------------------------------------
+# templates
+# ------------------------------------------------------------
+def _lit(text):
+    return ("lit", text)
+
+
+def _sub(index, optional=False):
+    return ("sub", index, optional)
+
+
+def _elem(name, attrs=(), content=()):
+    return (name, list(attrs), list(content))
+
+
+def build_template(log_type, event_id):
+    """
+    Element tree of the template for one (log type, event id), with
+    substitution indexes for everything that changes per record.
+    """
+    info = LOGS[log_type]
+    system = _elem("System", content=[
+        _elem("Provider", [("Name", _lit(info["provider"])), ("Guid", _lit(info["guid"]))]),
+        _elem("EventID", content=[_sub(0)]),
+        _elem("Version", content=[_sub(1)]),
+        _elem("Level", content=[_sub(2)]),
+        _elem("Task", content=[_sub(3)]),
+        _elem("Opcode", content=[_sub(4)]),
+        _elem("Keywords", content=[_sub(5)]),
+        _elem("TimeCreated", [("SystemTime", _sub(6))]),
+        _elem("EventRecordID", content=[_sub(7)]),
+        _elem("Execution", [("ProcessID", _sub(_SUB_PROCESS)), ("ThreadID", _sub(_SUB_THREAD))]),
+        _elem("Channel", content=[_lit(info["channel"])]),
+        _elem("Computer", content=[_sub(_SUB_COMPUTER)]),
+        _elem("Security", [("UserID", _sub(_SUB_USERID, optional=True))]),
+    ])
+
+    if log_type == "Security":
+        data = [_elem("Data", [("Name", _lit(name))], [_sub(_FIRST_DATA_SUB + i, optional=True)])
+                for i, (name, _) in enumerate(SECURITY_FIELDS[event_id])]
+        body = _elem("EventData", content=data)
+    else:
+        data = [_elem(name, content=[_sub(_FIRST_DATA_SUB + i, optional=True)])
+                for i, name in enumerate(USERDATA_FIELDS[event_id])]
+        body = _elem("UserData", content=[_elem("EventXML", [("xmlns", _lit("Event_NS"))], data)])
+
+    event = _elem("Event", [("xmlns", _lit("http://schemas.microsoft.com/win/2004/08/events/event"))],
+                  [system, body])
+    guid = hashlib.md5(f"{log_type}:{event_id}".encode("utf-8")).digest()
+    return event, guid
+
+
+class _Chunk:
+    """
+    One 64 KiB chunk being filled. Name strings and templates are defined
+    inline on first use in the chunk and referenced by offset after that
+    (the same as Windows does), and both are linked into the header tables.
+    """
+
+    def __init__(self, first_record_num):
+        self.buf = bytearray(CHUNK_SIZE)
+        self.pos = CHUNK_HEADER_SIZE
+        self.first_record_num = first_record_num
+        self.last_record_num = first_record_num - 1
+        self.last_record_offset = 0
+        self.strings = {}                # name -> chunk offset
+        self.templates = {}              # guid -> chunk offset of the template node
+        self.string_table = [0] * 64
+        self.template_table = [0] * 32
+
+    # ---- BinXML emit (out 은 record 버퍼, base 는 그 버퍼 시작의 chunk offset) ----
+    def _name(self, out, base, name):
+        offset = self.strings.get(name)
+        if offset is not None:
+            out += struct.pack("<I", offset)
+            return
+        offset = base + len(out) + 4
+        h = _name_hash(name)
+        bucket = h % 64
+        out += struct.pack("<I", offset)
+        out += struct.pack("<IHH", self.string_table[bucket], h, len(name))
+        out += name.encode("utf-16-le") + b"\x00\x00"
+        self.string_table[bucket] = offset
+        self.strings[name] = offset
+
+    def _part(self, out, part):
+        if part[0] == "lit":
+            text = part[1].encode("utf-16-le")
+            out += struct.pack("<BBH", T_VALUE, V_WSTRING, len(part[1])) + text
+        else:
+            _, index, optional = part
+            out += struct.pack("<BHB", T_OPT_SUB if optional else T_SUB, index, 0)
+
+    def _element(self, out, base, elem):
+        name, attrs, content = elem
+        start = len(out)
+        out += struct.pack("<BHI", T_OPEN | (HAS_MORE if attrs else 0), 0xFFFF, 0)
+        self._name(out, base, name)
+        if attrs:
+            attr_size_at = len(out)
+            out += b"\x00\x00\x00\x00"
+            for i, (attr_name, part) in enumerate(attrs):
+                out.append(T_ATTR | (HAS_MORE if i + 1 < len(attrs) else 0))
+                self._name(out, base, attr_name)
+                self._part(out, part)
+            struct.pack_into("<I", out, attr_size_at, len(out) - attr_size_at - 4)
+        if content:
+            out.append(T_CLOSE_START)
+            for child in content:
+                if child[0] in ("lit", "sub"):
+                    self._part(out, child)
+                else:
+                    self._element(out, base, child)
+            out.append(T_CLOSE)
+        else:
+            out.append(T_CLOSE_EMPTY)
+        struct.pack_into("<I", out, start + 3, len(out) - start - 7)
+
+    def _template_definition(self, out, base, tree, guid):
+        """
+        TemplateNode at base + len(out): next_offset, guid, data_length, body.
+        """
+        offset = base + len(out)
+        bucket = struct.unpack_from("<I", guid)[0] % 32
+        out += struct.pack("<I", self.template_table[bucket]) + guid + b"\x00\x00\x00\x00"
+        body_start = len(out)
+        out += struct.pack("<BBBB", T_START, 1, 1, 0)
+        self._element(out, base, tree)
+        out.append(T_EOF)
+        struct.pack_into("<I", out, body_start - 4, len(out) - body_start)
+        self.template_table[bucket] = offset
+        self.templates[guid] = offset
+
+    def add_record(self, record_num, filetime, template, values):
+        """
+        values: [(type, bytes)] substitution array. Returns the chunk offset
+        of the record, or None if it does not fit (caller starts a new chunk).
+        """
+        tree, guid = template
+        base = self.pos
+        out = bytearray(struct.pack("<IIQQ", 0x2A2A, 0, record_num, filetime))
+        out += struct.pack("<BBBB", T_START, 1, 1, 0)
+
+        template_offset = self.templates.get(guid)
+        saved = None
+        if template_offset is None:
+            # 이 chunk 에서 처음 쓰는 template -> inline 정의 (안 들어가면 되돌림)
+            saved = (dict(self.strings), list(self.string_table), list(self.template_table), dict(self.templates))
+            template_offset = base + len(out) + 10
+            out += struct.pack("<BBII", T_TEMPLATE, 1, struct.unpack_from("<I", guid)[0], template_offset)
+            self._template_definition(out, base, tree, guid)
+        else:
+            out += struct.pack("<BBII", T_TEMPLATE, 1, struct.unpack_from("<I", guid)[0], template_offset)
+
+        out += struct.pack("<I", len(values))
+        for type_, data in values:
+            out += struct.pack("<HBB", len(data), type_, 0)
+        for _, data in values:
+            out += data
+        out += b"\x00\x00\x00\x00"
+        struct.pack_into("<I", out, 4, len(out))
+        struct.pack_into("<I", out, len(out) - 4, len(out))
+
+        if base + len(out) > CHUNK_SIZE:
+            if saved is not None:
+                self.strings, self.string_table, self.template_table, self.templates = saved
+            return None
+        self.buf[base:base + len(out)] = out
+        self.pos += len(out)
+        self.last_record_num = record_num
+        self.last_record_offset = base
+        return base
+
+    def __len__(self):
+        return self.last_record_num - self.first_record_num + 1
+
+    def finish(self):
+        buf = self.buf
+        struct.pack_into("<8sQQQQIIII", buf, 0, b"ElfChnk\x00",
+                         self.first_record_num, self.last_record_num,
+                         self.first_record_num, self.last_record_num,
+                         0x80, self.last_record_offset, self.pos,
+                         zlib.crc32(bytes(buf[CHUNK_HEADER_SIZE:self.pos])) & 0xFFFFFFFF)
+        struct.pack_into("<64I", buf, 0x80, *self.string_table)
+        struct.pack_into("<32I", buf, 0x180, *self.template_table)
+        header_crc = zlib.crc32(bytes(buf[0:0x78]) + bytes(buf[0x80:0x200])) & 0xFFFFFFFF
+        struct.pack_into("<I", buf, 0x7C, header_crc)
+        return bytes(buf)
+
+
+def _file_header(chunk_count, next_record_num):
+    header = bytearray(FILE_HEADER_SIZE)
+    struct.pack_into("<8sQQQIHHHH", header, 0, b"ElfFile\x00", 0, max(chunk_count - 1, 0),
+                     next_record_num, 0x80, 1, 3, FILE_HEADER_SIZE, chunk_count)
+    struct.pack_into("<I", header, 0x78, 0)
+    struct.pack_into("<I", header, 0x7C, zlib.crc32(bytes(header[:0x78])) & 0xFFFFFFFF)
+    return bytes(header)
+
+
+class EvtxWriter:
+    """
+    Writes the records of one log type. When a file reaches max_chunks a new
+    file is started ({name}.evtx, {name}-0001.evtx, ...) and record numbers
+    continue, like archived logs.
+    """
+
+    def __init__(self, out_dir, log_type, computer, max_chunks=MAX_CHUNKS_PER_FILE):
+        self.out_dir = out_dir
+        self.log_type = log_type
+        self.computer = computer
+        self.max_chunks = min(max_chunks, MAX_CHUNKS_PER_FILE)
+        self.templates = {}
+        self.next_record_num = 1
+        self.files = []
+        self._f = None
+        self._chunk = None
+        self._chunks_in_file = 0
+        self._file_first = 1
+
+    def _open_file(self):
+        name = LOGS[self.log_type]["file"]
+        part = len(self.files)
+        path = os.path.join(self.out_dir, f"{name}.evtx" if part == 0 else f"{name}-{part:04d}.evtx")
+        self._f = open(path, "wb")
+        self._f.write(b"\x00" * FILE_HEADER_SIZE)
+        self._chunks_in_file = 0
+        self._file_first = self.next_record_num
+        self.files.append({"log_type": self.log_type, "path": path})
+
+    def _close_chunk(self):
+        if self._chunk is None or len(self._chunk) == 0:
+            return
+        self._f.write(self._chunk.finish())
+        self._chunks_in_file += 1
+        self._chunk = None
+
+    def _close_file(self):
+        self._close_chunk()
+        self._f.seek(0)
+        self._f.write(_file_header(self._chunks_in_file, self.next_record_num))
+        self._f.close()
+        self.files[-1].update(chunks=self._chunks_in_file, first_record=self._file_first,
+                              last_record=self.next_record_num - 1,
+                              records=self.next_record_num - self._file_first)
+        self._f = None
+
+    def _template(self, event_id):
+        t = self.templates.get(event_id)
+        if t is None:
+            t = self.templates[event_id] = build_template(self.log_type, event_id)
+        return t
+
+    def write(self, event_id, filetime, fields, user_sid):
+        """
+        fields: [(type, value)] in template order. Returns (file index, chunk offset, record number).
+        """
+        if self._f is None:
+            self._open_file()
+        record_num = self.next_record_num
+        values = [
+            encode_value(V_UINT16, event_id), encode_value(V_UINT8, 0), encode_value(V_UINT8, 4),
+            encode_value(V_UINT16, 0), encode_value(V_UINT8, 0), encode_value(V_HEX64, "0x8020000000000000"),
+            encode_value(V_FILETIME, filetime), encode_value(V_UINT64, record_num),
+            encode_value(V_UINT32, 716), encode_value(V_UINT32, 1200 + event_id % 97),
+            encode_value(V_WSTRING, self.computer), encode_value(V_SID, user_sid),
+        ]
+        values.extend(encode_value(type_, value) for type_, value in fields)
+
+        for _ in range(2):
+            if self._chunk is None:
+                if self._chunks_in_file >= self.max_chunks:
+                    self._close_file()
+                    self._open_file()
+                self._chunk = _Chunk(record_num)
+            offset = self._chunk.add_record(record_num, filetime, self._template(event_id), values)
+            if offset is not None:
+                break
+            self._close_chunk()
+        else:
+            raise ValueError(f"record {record_num} does not fit in a chunk")
+
+        self.next_record_num += 1
+        chunk_offset = FILE_HEADER_SIZE + self._chunks_in_file * CHUNK_SIZE
+        return len(self.files) - 1, chunk_offset, record_num
+
+    def close(self):
+        if self._f is not None:
+            self._close_file()
+        return self.files
+
+
+# ------------------------------------------------------------
+# event model
+# ------------------------------------------------------------
+def _spread(i, count, n):
+    # session i 가 가져가는 event 수 (count 개를 n 개 session 에 고르게 나눔)
+    return (i + 1) * count // n - i * count // n
+
+
+class CorpusModel:
+    """
+    Generates RDP activity as time-ordered (filetime, event_id, data) tuples.
+
+    Sessions are laid out evenly over `days`: RCM 1149 -> 4624(Type10) ->
+    4672 -> LSM 21/22 -> 24/25 (disconnect/reconnect) -> 23 -> 4634. Each
+    session-bound event id gets its share of the mix spread over the sessions,
+    so any mix gives consistent sessions. 4625 failures come from a small set
+    of attacker IPs, evenly spread over the same period.
+    """
+
+    SESSION_IDS = (4624, 4634, 4672, 1149, 21, 22, 23, 24, 25)
+
+    def __init__(self, records, mix=None, start="2025-12-01T00:00:00", days=30, users=50, ips=40,
+                 attackers=20, seed=7):
+        mix = dict(mix or DEFAULT_MIX)
+        total_w = sum(mix.values())
+        self.counts = {eid: int(round(records * w / total_w)) for eid, w in mix.items() if w > 0}
+        self.n_sessions = max([self.counts.get(e, 0) for e in self.SESSION_IDS] + [1])
+        self.start = dt_to_filetime(datetime.fromisoformat(start))
+        self.span = int(days * 86400 * 10_000_000)
+        self.spacing = self.span // self.n_sessions
+        self.rng = random.Random(seed)
+        self.users = [f"user{k:03d}" for k in range(users)]
+        self.ips = [f"10.{20 + k // 250}.{k % 250}.{(k * 37) % 200 + 10}" for k in range(ips)]
+        self.attackers = [f"203.0.113.{k + 1}" for k in range(attackers)]
+        self.max_1149 = -(-self.counts.get(1149, 0) // self.n_sessions)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def _session_events(self, i):
+        rng = self.rng
+        sec = 10_000_000
+        start = self.start + i * self.spacing + rng.randrange(max(self.spacing // 2, 1)) // 10 * 10
+        user = rng.choice(self.users)
+        ip = rng.choice(self.ips)
+        duration = rng.randrange(5 * 60, 4 * 3600) * sec
+        end = start + duration
+        sid = str(2 + i % 50)
+        user_sid = f"S-1-5-21-1004336348-1177238915-682003330-{1000 + self.users.index(user)}"
+        domain = "DESKTOP-SYNTH"
+        c = {eid: _spread(i, n, self.n_sessions) for eid, n in self.counts.items() if eid in self.SESSION_IDS}
+
+        events = []
+        for j in range(c.get(1149, 0)):
+            events.append((start - (2 + j) * sec, 1149, {"Param1": user, "Param2": "", "Param3": ip}))
+        logon_ids = [f"0x{(i << 4 | j) + 0x3e7000:x}" for j in range(max(c.get(4624, 0), 1))]
+        for j in range(c.get(4624, 0)):
+            events.append((start + j * 10, 4624, {
+                "SubjectUserSid": "S-1-5-18", "SubjectUserName": domain + "$", "SubjectDomainName": "WORKGROUP",
+                "SubjectLogonId": "0x3e7", "TargetUserSid": user_sid, "TargetUserName": user,
+                "TargetDomainName": domain, "TargetLogonId": logon_ids[j], "LogonType": 10,
+                "LogonProcessName": "User32 ", "AuthenticationPackageName": "Negotiate",
+                "WorkstationName": domain, "IpAddress": ip, "IpPort": str(49152 + i % 16000),
+            }))
+        for j in range(c.get(4672, 0)):
+            events.append((start + j * 10 + 10, 4672, {
+                "SubjectUserSid": user_sid, "SubjectUserName": user, "SubjectDomainName": domain,
+                "SubjectLogonId": logon_ids[j % len(logon_ids)],
+                "PrivilegeList": "SeBackupPrivilege\n\t\t\tSeDebugPrivilege",
+            }))
+        lsm_user = f"{domain}\\{user}"
+        for eid, at in ((21, start + 1 * sec), (22, start + 2 * sec), (24, start + duration // 2),
+                        (25, start + duration // 2 + 60 * sec), (23, end - sec)):
+            for j in range(c.get(eid, 0)):
+                d = {"User": lsm_user, "SessionID": sid}
+                if eid != 23:
+                    d["Address"] = ip
+                events.append((at + j * sec, eid, d))
+        for j in range(c.get(4634, 0)):
+            events.append((end + j * 10, 4634, {
+                "TargetUserSid": user_sid, "TargetUserName": user, "TargetDomainName": domain,
+                "TargetLogonId": logon_ids[j % len(logon_ids)], "LogonType": 10,
+            }))
+        return events
+
+    def _failures(self):
+        n = self.counts.get(4625, 0)
+        if not n:
+            return
+        rng = random.Random(self.rng.random())
+        step = self.span // n
+        names = ["administrator", "admin", "user", "test", "guest"] + self.users[:5]
+        for k in range(n):
+            ts = self.start + k * step + rng.randrange(max(step, 1)) // 10 * 10
+            ip = self.attackers[min(int(rng.expovariate(0.3)), len(self.attackers) - 1)]
+            user = rng.choice(names)
+            bad_user = user not in self.users
+            yield (ts, 4625, {
+                "SubjectUserSid": "S-1-0-0", "SubjectUserName": "-", "SubjectDomainName": "-",
+                "SubjectLogonId": "0x0", "TargetUserName": user, "TargetDomainName": "",
+                "Status": "0xc000006d", "FailureReason": "%%2313",
+                "SubStatus": "0xc0000064" if bad_user else "0xc000006a",
+                "LogonType": 3 if k % 3 else 10, "WorkstationName": "-", "IpAddress": ip,
+                "IpPort": str(1024 + k % 60000),
+            })
+
+    def events(self):
+        """
+        Time-ordered events. Sessions start in order, so anything earlier than
+        the next session's first possible event can be emitted from the heap.
+        """
+        sec = 10_000_000
+        lead = (3 + self.max_1149) * sec
+        heap = []
+        seq = 0
+        failures = self._failures()
+        next_fail = next(failures, None)
+        has_sessions = any(self.counts.get(e) for e in self.SESSION_IDS)
+
+        for i in range(self.n_sessions if has_sessions else 0):
+            for ts, eid, d in self._session_events(i):
+                heapq.heappush(heap, (ts, seq, eid, d))
+                seq += 1
+            bound = self.start + (i + 1) * self.spacing - lead
+            while next_fail is not None and next_fail[0] < bound:
+                heapq.heappush(heap, (next_fail[0], seq, next_fail[1], next_fail[2]))
+                seq += 1
+                next_fail = next(failures, None)
+            while heap and heap[0][0] < bound:
+                ts, _, eid, d = heapq.heappop(heap)
+                yield ts, eid, d
+
+        while next_fail is not None:
+            heapq.heappush(heap, (next_fail[0], seq, next_fail[1], next_fail[2]))
+            seq += 1
+            next_fail = next(failures, None)
+        while heap:
+            ts, _, eid, d = heapq.heappop(heap)
+            yield ts, eid, d
+
+
+def _field_types(log_type, event_id):
+    if log_type == "Security":
+        return SECURITY_FIELDS[event_id]
+    return [(name, V_WSTRING) for name in USERDATA_FIELDS[event_id]]
+
+
+def generate_corpus(out_dir, records, mix=None, fixtures=True, computer="DESKTOP-SYNTH",
+                    max_chunks=MAX_CHUNKS_PER_FILE, progress=True, **model_args):
+    """
+    Write the EVTX files (+ EventStore fixtures) into out_dir and corpus.json.
+    Returns the manifest dict.
+    """
+    ensure_dir(out_dir)
+    model = CorpusModel(records, mix, **model_args)
+    log_types = sorted({log_type_of_event(eid) for eid in model.counts})
+    writers = {lt: EvtxWriter(out_dir, lt, computer, max_chunks) for lt in log_types}
+    stores = {lt: EventStore(lt) for lt in log_types} if fixtures else None
+    file_ids = {}
+
+    bar = None
+    if progress:
+        from tqdm import tqdm
+        bar = tqdm(total=model.total, desc="Generating", unit="rec")
+
+    counts = {}
+    for filetime, event_id, d in model.events():
+        log_type = log_type_of_event(event_id)
+        types = _field_types(log_type, event_id)
+        user_sid = "S-1-5-18" if log_type != "RCM" else "S-1-5-20"
+        part, chunk_offset, record_num = writers[log_type].write(
+            event_id, filetime, [(t, d.get(name)) for name, t in types], user_sid)
+        counts[event_id] = counts.get(event_id, 0) + 1
+
+        if stores is not None:
+            key = (log_type, part)
+            if key not in file_ids:
+                file_ids[key] = len(file_ids)
+            rendered = {name: render_value(t, d.get(name)) for name, t in types}
+            stores[log_type].append(PARSERS[log_type](
+                event_id, filetime_to_dt(filetime), rendered, RawRef(file_ids[key], chunk_offset, record_num)))
+        if bar is not None:
+            bar.update(1)
+    if bar is not None:
+        bar.close()
+
+    files = []
+    for lt in log_types:
+        for part, info in enumerate(writers[lt].close()):
+            info["file_id"] = file_ids.get((lt, part))
+            files.append(info)
+
+    fixture_paths = {}
+    if stores is not None:
+        for lt, store in stores.items():
+            fixture_paths[lt] = store.save(os.path.join(out_dir, f"{lt}_events.col"), {"synthetic": True})
+
+    manifest = {
+        "params": dict(model_args, records=records, mix={str(k): v for k, v in (mix or DEFAULT_MIX).items()},
+                       computer=computer, max_chunks=max_chunks),
+        "counts": {str(k): v for k, v in sorted(counts.items())},
+        "files": files,
+        "fixtures": fixture_paths,
+    }
+    with open(os.path.join(out_dir, CORPUS_MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def load_corpus(corpus_dir):
+    with open(os.path.join(corpus_dir, CORPUS_MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_corpus(corpus_dir, reader="xml", limit=None):
+    """
+    Parse the generated files with iter_evtx_records and compare with the
+    fixtures. Returns the number of events compared; raises on a mismatch.
+    """
+    from rdp_analyzer.evtx_reader import iter_evtx_records
+    from rdp_analyzer.parsers import parse_records
+
+    manifest = load_corpus(corpus_dir)
+    checked = 0
+    for log_type, path in manifest["fixtures"].items():
+        expected = iter(EventStore.load(path))
+        for info in (f for f in manifest["files"] if f["log_type"] == log_type):
+            records = iter_evtx_records(info["path"], reader=reader)
+            for ev in parse_records(records, log_type, file_id=info["file_id"]):
+                want = next(expected)
+                if ev != want:
+                    raise AssertionError(f"{info['path']}: record {ev['raw_ref'].record_num} differs\n"
+                                         f"  parsed  : {ev}\n  fixture : {want}")
+                checked += 1
+                if limit is not None and checked >= limit:
+                    return checked
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic EVTX corpus generator (benchmarks)")
+    parser.add_argument("--out", default="synth_corpus")
+    parser.add_argument("--records", type=float, default=1e4, help="Total records (1e4 ~ 1e8)")
+    parser.add_argument("--mix", help="Event mix as EventID=weight,... (default: %s)"
+                        % ",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()))
+    parser.add_argument("--start", default="2025-12-01T00:00:00", help="First session time (UTC)")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--ips", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-chunks", type=int, default=MAX_CHUNKS_PER_FILE,
+                        help="Chunks per EVTX file before rolling over to the next file")
+    parser.add_argument("--no-fixtures", action="store_true", help="Only write the EVTX files")
+    parser.add_argument("--verify", type=int, nargs="?", const=-1, metavar="N",
+                        help="Re-parse the files (first N events, default all) and compare with the fixtures")
+    args = parser.parse_args()
+
+    manifest = generate_corpus(
+        args.out, int(args.records), parse_mix(args.mix) if args.mix else None,
+        fixtures=not args.no_fixtures, max_chunks=args.max_chunks,
+        start=args.start, days=args.days, users=args.users, ips=args.ips, seed=args.seed,
+    )
+    for info in manifest["files"]:
+        print(f"[+] {info['path']}: {info['records']} records, {info['chunks']} chunks")
+    for lt, path in manifest["fixtures"].items():
+        print(f"[+] Fixture {lt}: {path}")
+
+    if args.verify is not None:
+        if args.no_fixtures:
+            print("[!] --verify needs the fixtures")
+            return
+        for reader in ("xml", "native"):
+            n = verify_corpus(args.out, reader, None if args.verify < 0 else args.verify)
+            print(f"[+] Verified {n} events with reader={reader}")
+
+
+if __name__ == "__main__":
+    main()
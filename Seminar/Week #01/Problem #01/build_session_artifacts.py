@@ -1,13 +1,23 @@
 # My Python version: 3.10.12
 # IDE: VS code
 
+import os
 import argparse
 import json
 from datetime import timedelta
 from collections import defaultdict, Counter
 
+import numpy as np
 import pandas as pd
 
+from rdp_analyzer.event_cache import load_manifest
+from rdp_analyzer.event_store import EventStore
+from rdp_analyzer.columnar import write_frame
+from rdp_analyzer.dataset import read_dataset, write_dataset, DATASET_FORMATS
+from rdp_analyzer.filters import parse_time_bound
+from rdp_analyzer.outputs import timeline_frame, write_ndjson, TIMELINE_COLUMNS, DATASETS_DIR, JSON_FORMATS
+from rdp_analyzer.profiler import StageProfiler, PROFILE_MODES
+
 
 # -----------------------------
 # Helpers
@@ -28,6 +38,21 @@ def norm_ip(ip):
         return None
     return str(ip).strip()
 
+def _map_unique(s, func):
+    """
+    값마다 func 를 부르지 않고 distinct 값에만 적용 (NaN 포함).
+    """
+    codes, uniques = pd.factorize(s)
+    mapped = np.array([func(u) for u in uniques] + [func(None)], dtype=object)
+    return pd.Series(mapped[codes], index=s.index, dtype=object)
+
+def _ns(s):
+    # tz-aware timestamp column -> int64 ns (UTC)
+    return s.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+def _td_ns(td):
+    return int(pd.Timedelta(td).value)
+
 def calc_confidence(has_1149, has_lsm, user_known):
     # 간단하지만 납득 가능한 Confidence 규칙
     if has_1149 and has_lsm and user_known:
@@ -38,6 +63,51 @@ def calc_confidence(has_1149, has_lsm, user_known):
         return "LOW"
     return "UNKNOWN"
 
+def load_timeline(timeline):
+    """
+    timeline 입력 -> timestamp 가 UTC datetime 인 DataFrame (문자열 파싱은 여기서 한 번만).
+      - timeline_all_events.csv 경로
+      - 이미 만들어진 timeline DataFrame (load_timeline_from_cache / load_timeline_from_dataset)
+      - main.py load_events 의 EventStore ({log_type: store} 또는 list) -> CSV 를 거치지 않음
+    DataFrame 은 복사하지 않으므로 받은 쪽에서 수정하지 않음.
+    """
+    if isinstance(timeline, EventStore):
+        timeline = [timeline]
+    if isinstance(timeline, dict):
+        timeline = list(timeline.values())
+    if isinstance(timeline, (list, tuple)):
+        stores = {store.log_type: store for store in timeline}
+        return timeline_frame(*(stores.get(lt) or EventStore(lt) for lt in ("Security", "RCM", "LSM")))
+
+    if not isinstance(timeline, pd.DataFrame):
+        timeline = pd.read_csv(timeline)
+    if "timestamp" in timeline.columns and not isinstance(timeline["timestamp"].dtype, pd.DatetimeTZDtype):
+        timeline = timeline.assign(timestamp=to_dt(timeline["timestamp"]))
+    return timeline
+
+def load_timeline_from_cache(manifest_path):
+    """
+    main.py --cache 가 남긴 events_cache.json -> timeline CSV 와 같은 column 의 DataFrame.
+    EVTX 디코딩도, CSV 텍스트 파싱도 하지 않음 (timestamp 는 이미 datetime).
+    """
+    stores = load_manifest(manifest_path, ("Security", "RCM", "LSM"))
+    return timeline_frame(*(stores.get(lt) or EventStore(lt) for lt in ("Security", "RCM", "LSM")))
+
+def load_timeline_from_dataset(root, since=None, until=None):
+    """
+    main.py --columnar 가 남긴 datasets/timeline -> timeline CSV 와 같은 column 의 DataFrame.
+    session 계산에 쓰는 column / source 만 읽고, since/until 밖의 day partition 은 열지 않음.
+    """
+    since, until = parse_time_bound(since), parse_time_bound(until)
+    day = (since.strftime("%Y-%m-%d") if since else None, until.strftime("%Y-%m-%d") if until else None)
+    df = read_dataset(root, columns=TIMELINE_COLUMNS,
+                      where={"source": {"Security", "RCM", "LSM"}, "day": day if any(day) else None})
+    if since is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(since, tz="UTC")]
+    if until is not None:
+        df = df[df["timestamp"] <= pd.Timestamp(until, tz="UTC")]
+    return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
 def extract_host_from_1149_events(df_1149_group):
     """
     timeline_all_events.csv에는 client_name이 없을 수 있음.
@@ -55,7 +125,9 @@ def extract_host_from_1149_events(df_1149_group):
 # -----------------------------
 # Core: Build sessions from RCM1149 + attach LSM evidence
 # -----------------------------
-def build_sessions_from_timeline(timeline_csv, gap_minutes=30, endA_pad_minutes=10, endB_pad_minutes=5):
+LSM_PAD = timedelta(minutes=5)   # LSM 24/25 attach window: start-5m ~ End_A+5m
+
+def build_sessions_from_timeline(timeline, gap_minutes=30, endA_pad_minutes=10, endB_pad_minutes=5):
     """
     세션 구성: (username, ip) 기준으로 1149 인증 이벤트를 묶고
     LSM 24/25를 근접 window로 attach.
@@ -63,133 +135,127 @@ def build_sessions_from_timeline(timeline_csv, gap_minutes=30, endA_pad_minutes=
       - End_A: 다음 1149 전 / 또는 last_1149 + pad
       - End_B: 마지막 disconnect + pad
     """
-    df = pd.read_csv(timeline_csv)
-
-    # timestamp 처리
-    df["timestamp"] = to_dt(df["timestamp"])
+    df = load_timeline(timeline)
     df = df.dropna(subset=["timestamp"])
 
     # 필요한 컬럼 기본화
     if "username" not in df.columns:
-        df["username"] = None
+        df = df.assign(username=None)
     if "ip" not in df.columns:
-        df["ip"] = None
-
-    df["username"] = df["username"].apply(norm_user)
-    df["ip"] = df["ip"].apply(norm_ip)
+        df = df.assign(ip=None)
 
     # RCM 1149 only
     df_1149 = df[(df["source"] == "RCM") & (df["event_id"] == 1149)].copy()
+    df_1149["username"] = _map_unique(df_1149["username"], norm_user)
+    df_1149["ip"] = _map_unique(df_1149["ip"], norm_ip)
     df_1149 = df_1149.dropna(subset=["ip"])  # ip는 세션 키이므로 필수
-    df_1149 = df_1149.sort_values("timestamp")
+    # (username, ip) 별, 그 안에서는 시간순 -> groupby 순서와 같음
+    df_1149 = df_1149.sort_values(["username", "ip", "timestamp"], kind="stable").reset_index(drop=True)
 
-    # LSM 24/25
+    # LSM 24/25: username 별 시간순
     df_lsm = df[(df["source"] == "LSM") & (df["event_id"].isin([24, 25]))].copy()
-    df_lsm = df_lsm.sort_values("timestamp")
+    df_lsm["username"] = _map_unique(df_lsm["username"], norm_user)
+    df_lsm = df_lsm.sort_values(["username", "timestamp"], kind="stable").reset_index(drop=True)
 
     gap = timedelta(minutes=gap_minutes)
     endA_pad = timedelta(minutes=endA_pad_minutes)
     endB_pad = timedelta(minutes=endB_pad_minutes)
 
+    if df_1149.empty:
+        return pd.DataFrame(), []
+
+    # 1) 세션 번호: key 가 바뀌거나 직전 1149 와 gap 보다 멀면 새 세션 (diff / cumsum)
+    users = df_1149["username"].to_numpy(dtype=object)
+    ips = df_1149["ip"].to_numpy(dtype=object)
+    ts = _ns(df_1149["timestamp"])
+    new = np.ones(len(ts), dtype=bool)
+    new[1:] = (users[1:] != users[:-1]) | (ips[1:] != ips[:-1]) | (np.diff(ts) > _td_ns(gap))
+    first = np.flatnonzero(new)
+    last = np.append(first[1:], len(ts)) - 1
+
+    start_ns = ts[first]
+    # 다음 1149 는 항상 gap 밖이므로 End_A = 마지막 1149 + pad
+    endA_ns = ts[last] + _td_ns(endA_pad)
+
+    # 2) LSM attach: 같은 username 의 [start - 5m, End_A + 5m] 구간 (sorted interval join)
+    lsm_ts = _ns(df_lsm["timestamp"])
+    is24 = (df_lsm["event_id"] == 24).to_numpy()
+    lo = np.zeros(len(first), dtype=np.int64)
+    hi = np.zeros(len(first), dtype=np.int64)
+    s_users = users[first]
+    blocks = df_lsm.groupby("username", sort=False).indices
+    for user, idx in pd.Series(np.arange(len(first))).groupby(s_users, sort=False).indices.items():
+        block = blocks.get(user)
+        if block is None:
+            continue
+        b0, b1 = block[0], block[-1] + 1
+        lo[idx] = b0 + np.searchsorted(lsm_ts[b0:b1], start_ns[idx] - _td_ns(LSM_PAD), "left")
+        hi[idx] = b0 + np.searchsorted(lsm_ts[b0:b1], endA_ns[idx] + _td_ns(LSM_PAD), "right")
+
+    # 3) 건수 / 마지막 disconnect 는 누적합 / 누적 max 로
+    c24 = np.concatenate(([0], np.cumsum(is24)))
+    c25 = np.concatenate(([0], np.cumsum(~is24)))
+    disconnect_count = c24[hi] - c24[lo]
+    reconnect_count = c25[hi] - c25[lo]
+    last24 = np.maximum.accumulate(np.where(is24, np.arange(len(is24)), -1)) if len(is24) else np.array([], dtype=np.int64)
+
+    hosts = {}
+    if "client_name" in df_1149.columns:
+        for key, grp in df_1149.groupby(["username", "ip"]):
+            hosts[key] = extract_host_from_1149_events(grp.reset_index(drop=True))
+
+    # 세션마다 잘라 쓰는 값은 list 로 한 번만 꺼냄
+    t1149 = df_1149["timestamp"].tolist()
+    tlsm = df_lsm["timestamp"].tolist()
+    kinds_all = is24.tolist()
     sessions = []
-    session_id_counter = 0
-
-    for (user, ip), grp in df_1149.groupby(["username", "ip"]):
-        grp = grp.sort_values("timestamp").reset_index(drop=True)
-
-        # host 추출(가능하면)
-        host = extract_host_from_1149_events(grp)
-
-        current_start = None
-        last_ts = None
-        auth_times = []
-
-        def flush_session(next_start_ts=None):
-            nonlocal session_id_counter, current_start, last_ts, auth_times
-
-            if current_start is None:
-                return
-
-            session_id_counter += 1
-            sid = f"S{session_id_counter:04d}"
-
-            if next_start_ts is not None and (next_start_ts - last_ts) <= gap:
-                end_A = next_start_ts
-            else:
-                end_A = last_ts + endA_pad
-
-            wmin = current_start - timedelta(minutes=5)
-            wmax = end_A + timedelta(minutes=5)
-
-            # LSM 이벤트 attach: username 기준(LSM ip가 비어있을 수 있어 user가 더 reliable)
-            lsm_ev = df_lsm[(df_lsm["timestamp"] >= wmin) & (df_lsm["timestamp"] <= wmax) & (df_lsm["username"] == user)].copy()
-
-            disconnect_times = lsm_ev[lsm_ev["event_id"] == 24]["timestamp"].tolist()
-            reconnect_times = lsm_ev[lsm_ev["event_id"] == 25]["timestamp"].tolist()
-
-            if disconnect_times:
-                end_B = max(disconnect_times) + endB_pad
-            else:
-                end_B = pd.NaT
-
-            # Confidence
-            user_known = (user != "UNKNOWN")
-            has_lsm = (len(lsm_ev) > 0)
-            conf = calc_confidence(True, has_lsm, user_known)
-
-            sessions.append({
-                "session_id": sid,
-                "user": user,
-                "src_ip": ip,
-                "src_host": host,
-                "auth_count_1149": len(auth_times),
-                "start": current_start,
-                "end_A_next1149_or_pad": end_A,
-                "end_B_last_disconnect_or_none": end_B,
-                "duration_A_sec": int((end_A - current_start).total_seconds()) if pd.notna(end_A) else None,
-                "duration_B_sec": int((end_B - current_start).total_seconds()) if pd.notna(end_B) else None,
-                "disconnect_count": len(disconnect_times),
-                "reconnect_count": len(reconnect_times),
-                "confidence": conf,
-
-                "evidence_auth_1149_first": min(auth_times) if auth_times else None,
-                "evidence_auth_1149_last": max(auth_times) if auth_times else None,
-                "evidence_disconnect_last": max(disconnect_times) if disconnect_times else None,
-                "evidence_reconnect_last": max(reconnect_times) if reconnect_times else None,
-
-                "evidence_events": (
-                    [{"timestamp": t.isoformat(), "source": "RCM", "event_id": 1149, "note": "Auth Success"} for t in auth_times] +
-                    [{"timestamp": t.isoformat(), "source": "LSM", "event_id": 24, "note": "Disconnect"} for t in disconnect_times] +
-                    [{"timestamp": t.isoformat(), "source": "LSM", "event_id": 25, "note": "Reconnect"} for t in reconnect_times]
-                )
-            })
-
-            # reset
-            current_start = None
-            last_ts = None
-            auth_times = []
-
-        # iterate auth events and split by gap
-        for i, row in grp.iterrows():
-            ts = row["timestamp"]
-
-            if current_start is None:
-                current_start = ts
-                last_ts = ts
-                auth_times = [ts]
-                continue
-
-            if ts - last_ts > gap:
-                # 새로운 세션 시작
-                flush_session(next_start_ts=None)
-                current_start = ts
-                last_ts = ts
-                auth_times = [ts]
-            else:
-                last_ts = ts
-                auth_times.append(ts)
-
-        flush_session(next_start_ts=None)
+    for k in range(len(first)):
+        user, ip = users[first[k]], ips[first[k]]
+        auth_times = t1149[first[k]:last[k] + 1]
+        current_start = auth_times[0]
+        end_A = auth_times[-1] + endA_pad
+
+        window = tlsm[lo[k]:hi[k]]
+        kinds = kinds_all[lo[k]:hi[k]]
+        disconnect_times = [t for t, d in zip(window, kinds) if d]
+        reconnect_times = [t for t, d in zip(window, kinds) if not d]
+
+        if disconnect_count[k]:
+            end_B = tlsm[last24[hi[k] - 1]] + endB_pad
+        else:
+            end_B = pd.NaT
+
+        # Confidence
+        user_known = (user != "UNKNOWN")
+        has_lsm = bool(hi[k] > lo[k])
+        conf = calc_confidence(True, has_lsm, user_known)
+
+        sessions.append({
+            "session_id": f"S{k + 1:04d}",
+            "user": user,
+            "src_ip": ip,
+            "src_host": hosts.get((user, ip)),
+            "auth_count_1149": len(auth_times),
+            "start": current_start,
+            "end_A_next1149_or_pad": end_A,
+            "end_B_last_disconnect_or_none": end_B,
+            "duration_A_sec": int((end_A - current_start).total_seconds()) if pd.notna(end_A) else None,
+            "duration_B_sec": int((end_B - current_start).total_seconds()) if pd.notna(end_B) else None,
+            "disconnect_count": int(disconnect_count[k]),
+            "reconnect_count": int(reconnect_count[k]),
+            "confidence": conf,
+
+            "evidence_auth_1149_first": min(auth_times) if auth_times else None,
+            "evidence_auth_1149_last": max(auth_times) if auth_times else None,
+            "evidence_disconnect_last": max(disconnect_times) if disconnect_times else None,
+            "evidence_reconnect_last": max(reconnect_times) if reconnect_times else None,
+
+            "evidence_events": (
+                [{"timestamp": t.isoformat(), "source": "RCM", "event_id": 1149, "note": "Auth Success"} for t in auth_times] +
+                [{"timestamp": t.isoformat(), "source": "LSM", "event_id": 24, "note": "Disconnect"} for t in disconnect_times] +
+                [{"timestamp": t.isoformat(), "source": "LSM", "event_id": 25, "note": "Reconnect"} for t in reconnect_times]
+            )
+        })
 
     out_df = pd.DataFrame(sessions)
     if out_df.empty:
@@ -202,13 +268,13 @@ def build_sessions_from_timeline(timeline_csv, gap_minutes=30, endA_pad_minutes=
 # -----------------------------
 # Failures: try to infer from Security events (if available in timeline)
 # -----------------------------
-def build_failure_summary(timeline_csv):
+def build_failure_summary(timeline):
     """
     timeline_all_events.csv에 Security 이벤트가 포함돼 있다면:
     - 4625 존재 여부 (LogonType까지는 timeline에 없으므로 제한적)
     현재 데이터셋 특성상 실패가 거의 없을 것.
     """
-    df = pd.read_csv(timeline_csv)
+    df = load_timeline(timeline)
     if "source" not in df.columns:
         return {"observed_failures": 0, "top_failure_ips": []}
 
@@ -228,27 +294,18 @@ def build_failure_summary(timeline_csv):
 # -----------------------------
 # Outputs
 # -----------------------------
-def save_outputs(outdir, sessions_df, sessions_list, failures_summary):
-    outdir = outdir.rstrip("/")
+CASE_NOTES = [
+    "Security 4624(LogonType=10) not present in provided dataset; session timeline is inferred primarily from RCM 1149.",
+    "End_A is inferred from next 1149 event timing or a fixed padding after last 1149.",
+    "End_B is inferred from last LSM 24(Disconnect) timing if present."
+]
 
-    # 1) Summary CSV
-    summary_csv = f"{outdir}/rdp_session_summary_v2.csv"
-    df_out = sessions_df.copy()
-
-    # datetime -> iso string
-    for c in ["start", "end_A_next1149_or_pad", "end_B_last_disconnect_or_none",
-              "evidence_auth_1149_first", "evidence_auth_1149_last",
-              "evidence_disconnect_last", "evidence_reconnect_last"]:
-        if c in df_out.columns:
-            df_out[c] = df_out[c].apply(lambda x: x.isoformat() if pd.notna(x) else None)
-
-    df_out.to_csv(summary_csv, index=False, encoding="utf-8-sig")
-
-    # 2) Cases JSON
-    cases_json = f"{outdir}/rdp_session_cases.json"
-    cases = []
+def iter_cases(sessions_list):
+    """
+    session dict -> case dict (notes 제외), 하나씩 yield.
+    """
     for s in sessions_list:
-        cases.append({
+        yield {
             "session_id": s["session_id"],
             "identity": {
                 "user": s["user"],
@@ -276,46 +333,117 @@ def save_outputs(outdir, sessions_df, sessions_list, failures_summary):
                 "last_disconnect": s["evidence_disconnect_last"].isoformat() if s["evidence_disconnect_last"] else None,
                 "last_reconnect": s["evidence_reconnect_last"].isoformat() if s["evidence_reconnect_last"] else None,
                 "events": sorted(s["evidence_events"], key=lambda x: x["timestamp"])
-            },
-            "notes": [
-                "Security 4624(LogonType=10) not present in provided dataset; session timeline is inferred primarily from RCM 1149.",
-                "End_A is inferred from next 1149 event timing or a fixed padding after last 1149.",
-                "End_B is inferred from last LSM 24(Disconnect) timing if present."
-            ]
-        })
+            }
+        }
+
+def save_outputs(outdir, sessions_df, sessions_list, failures_summary, columnar=None, json_format="json"):
+    outdir = outdir.rstrip("/")
+
+    # 1) Summary CSV
+    summary_csv = f"{outdir}/rdp_session_summary_v2.csv"
+    df_out = sessions_df.copy()
 
-    with open(cases_json, "w", encoding="utf-8") as f:
-        json.dump({"cases": cases, "failures_summary": failures_summary}, f, indent=2, ensure_ascii=False)
+    # datetime -> iso string
+    for c in ["start", "end_A_next1149_or_pad", "end_B_last_disconnect_or_none",
+              "evidence_auth_1149_first", "evidence_auth_1149_last",
+              "evidence_disconnect_last", "evidence_reconnect_last"]:
+        if c in df_out.columns:
+            df_out[c] = df_out[c].apply(lambda x: x.isoformat() if pd.notna(x) else None)
+
+    df_out.to_csv(summary_csv, index=False, encoding="utf-8-sig")
 
-    return summary_csv, cases_json
+    # 1-1) 같은 표를 typed columnar 로도 저장 (plot_sessions_by_user.py --sessions 가 CSV 파싱 없이 읽음)
+    summary_col = f"{outdir}/rdp_session_summary_v2.col"
+    write_frame(summary_col, sessions_df)
+
+    # 1-2) --columnar: start 의 날짜로 partition 된 dataset (plot_sessions_by_user.py --dataset)
+    summary_dataset = None
+    if columnar:
+        summary_dataset = write_dataset(f"{outdir}/{DATASETS_DIR}/session_summary", sessions_df,
+                                        time_column="start", partition_by=("day",), fmt=columnar)
+
+    # 2) Cases JSON / NDJSON
+    if json_format == "ndjson":
+        # case 를 만들면서 바로 한 줄씩 씀; notes / failures_summary 는 header 한 번만
+        cases_json = f"{outdir}/rdp_session_cases.ndjson"
+        write_ndjson(cases_json, iter_cases(sessions_list),
+                     header={"kind": "rdp_session_cases", "notes": CASE_NOTES, "failures_summary": failures_summary})
+    else:
+        cases_json = f"{outdir}/rdp_session_cases.json"
+        cases = [dict(case, notes=CASE_NOTES) for case in iter_cases(sessions_list)]
+        with open(cases_json, "w", encoding="utf-8") as f:
+            json.dump({"cases": cases, "failures_summary": failures_summary}, f, indent=2, ensure_ascii=False)
+
+    return summary_csv, cases_json, summary_col, summary_dataset
 
 def main():
     parser = argparse.ArgumentParser(description="Build session artifacts (End_A & End_B) from timeline CSV")
-    parser.add_argument("--timeline", required=True, help="Path to timeline_all_events.csv")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--timeline", help="Path to timeline_all_events.csv")
+    source.add_argument("--events", help="Path to events_cache.json written by main.py --cache (skips CSV parsing)")
+    source.add_argument("--dataset", help="Path to datasets/timeline written by main.py --columnar")
     parser.add_argument("--outdir", default="output", help="Output directory")
     parser.add_argument("--gap", type=int, default=30, help="Gap minutes to split sessions (per user+ip)")
     parser.add_argument("--endA_pad", type=int, default=10, help="End_A padding minutes after last 1149 if no next event")
     parser.add_argument("--endB_pad", type=int, default=5, help="End_B padding minutes after last disconnect")
+    parser.add_argument("--since", help="--dataset: only read events at or after this time (UTC, ISO-8601)")
+    parser.add_argument("--until", help="--dataset: only read events at or before this time (UTC, ISO-8601)")
+    parser.add_argument("--columnar", nargs="?", const="auto", choices=("auto",) + DATASET_FORMATS,
+                        help="Also write the session summary as a day partitioned dataset under <outdir>/datasets")
+    parser.add_argument("--json-format", choices=JSON_FORMATS, default="json",
+                        help="ndjson: write rdp_session_cases.ndjson, one case per line (notes in the header line)")
+    parser.add_argument("--profile", nargs="?", const="basic", choices=PROFILE_MODES,
+                        help="Write per-stage time/throughput/peak RSS to <outdir>/profile.json")
     args = parser.parse_args()
-
-    sessions_df, sessions_list = build_sessions_from_timeline(
-        args.timeline,
-        gap_minutes=args.gap,
-        endA_pad_minutes=args.endA_pad,
-        endB_pad_minutes=args.endB_pad
-    )
-
-    failures_summary = build_failure_summary(args.timeline)
+    if (args.since or args.until) and not args.dataset:
+        parser.error("--since/--until need --dataset")
+
+    profiler = StageProfiler("build_session_artifacts.py", args.profile or "basic", enabled=bool(args.profile))
+
+    # timeline 은 한 번만 읽어서 session / failure 단계에 같이 씀
+    with profiler.stage("load_timeline") as st:
+        if args.dataset:
+            timeline = load_timeline_from_dataset(args.dataset, args.since, args.until)
+        elif args.events:
+            timeline = load_timeline_from_cache(args.events)
+        else:
+            timeline = load_timeline(args.timeline)
+        st["records"] = len(timeline)
+
+    with profiler.stage("build_sessions_from_timeline", records=len(timeline)) as st:
+        sessions_df, sessions_list = build_sessions_from_timeline(
+            timeline,
+            gap_minutes=args.gap,
+            endA_pad_minutes=args.endA_pad,
+            endB_pad_minutes=args.endB_pad
+        )
+        st["sessions"] = len(sessions_list)
+
+    with profiler.stage("build_failure_summary", records=len(timeline)):
+        failures_summary = build_failure_summary(timeline)
 
     if sessions_df.empty:
         print("[!] No sessions inferred from timeline.")
+        if profiler.enabled:
+            os.makedirs(args.outdir, exist_ok=True)
+            print(f"[+] Profile: {profiler.save(args.outdir)}")
         return
 
-    summary_csv, cases_json = save_outputs(args.outdir, sessions_df, sessions_list, failures_summary)
+    with profiler.stage("save_outputs", records=len(sessions_list)):
+        summary_csv, cases_json, summary_col, summary_dataset = save_outputs(
+            args.outdir, sessions_df, sessions_list, failures_summary, columnar=args.columnar,
+            json_format=args.json_format)
+    profile_path = profiler.save(args.outdir)
+    profiler.print_table()
 
     print("\n=== DONE ===")
     print(f"[+] Summary CSV: {summary_csv}")
     print(f"[+] Case JSON: {cases_json}")
+    print(f"[+] Summary (typed): {summary_col}")
+    if summary_dataset:
+        print(f"[+] Summary dataset: {summary_dataset}")
+    if profile_path:
+        print(f"[+] Profile: {profile_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import time
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tqdm import tqdm
+
+from main import run_analysis
+from rdp_analyzer.evtx_reader import READERS
+from rdp_analyzer.filters import RecordFilter, parse_time_bound
+from rdp_analyzer.fleet import HOSTS_DIR_NAME, FleetState, discover_hosts, input_signature, merge_fleet_tables
+from rdp_analyzer.utils import ensure_dir
+
+# 여러 호스트의 EVTX 세트를 process pool 로 나눠서 분석하고 fleet 전체 표를 만듦.
+# 입력: --root/<host>/ 아래에 Security / LocalSessionManager / RemoteConnectionManager / RDPClient .evtx
+# log type 당 파일이 여러 개여도 됨 (live + Archive-*.evtx 등): run_analysis 가 중복을 빼고 시간순으로 합침.
+
+
+def _analyze_host(task):
+    """
+    Worker: main.py 와 같은 분석을 호스트 하나에 대해 실행. 예외는 결과로 돌려줌.
+    """
+    host, files, host_out, options = task
+    t0 = time.perf_counter()
+    try:
+        result = run_analysis(
+            files.get("Security"), files.get("LSM"), files.get("RCM"), files.get("RDPClient"), host_out,
+            progress=False, **options
+        )
+    except Exception:
+        return {"host": host, "status": "failed", "error": traceback.format_exc(),
+                "seconds": time.perf_counter() - t0}
+
+    return {
+        "host": host,
+        "status": "done",
+        "sessions": result["sessions"],
+        "events": result["events"],
+        "input_bytes": sum(os.path.getsize(p) for paths in files.values() for p in paths),
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fleet mode: analyze per-host EVTX folders in parallel")
+    parser.add_argument("--root", required=True, help="Directory with one sub-folder of EVTX files per host")
+    parser.add_argument("--out", default="fleet_output")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hosts analyzed at the same time")
+    parser.add_argument("--time-window", type=int, default=5)
+    parser.add_argument("--reader", choices=READERS, default="xml")
+    parser.add_argument("--since", help="Only keep events at or after this time (UTC, ISO-8601)")
+    parser.add_argument("--until", help="Only keep events at or before this time (UTC, ISO-8601)")
+    parser.add_argument("--cache", help="Parsed-event cache directory shared by all hosts")
+    parser.add_argument("--restart", action="store_true", help="Ignore fleet_state.json and analyze every host again")
+    args = parser.parse_args()
+
+    ensure_dir(args.out)
+    hosts_out = os.path.join(args.out, HOSTS_DIR_NAME)
+    ensure_dir(hosts_out)
+
+    hosts = discover_hosts(args.root)
+    state = FleetState(args.out)
+    if args.restart:
+        state.hosts = {}
+
+    todo = [h for h in hosts if not state.is_done(h, hosts[h])]
+    print(f"[*] hosts: {len(hosts)}, already done: {len(hosts) - len(todo)}, to analyze: {len(todo)}")
+
+    options = {
+        "time_window": args.time_window,
+        "reader": args.reader,
+        "record_filter": RecordFilter(since=parse_time_bound(args.since), until=parse_time_bound(args.until)),
+        "filter_params": {"since": args.since, "until": args.until},
+        "cache": args.cache,
+    }
+    tasks = [(h, hosts[h], os.path.join(hosts_out, h), options) for h in todo]
+
+    t0 = time.perf_counter()
+    total_events = total_bytes = failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool, \
+            tqdm(total=len(tasks), desc="Hosts", unit="host") as bar:
+        futures = [pool.submit(_analyze_host, task) for task in tasks]
+        for fut in as_completed(futures):
+            r = fut.result()
+            host = r.pop("host")
+            if r["status"] == "done":
+                r["inputs"] = input_signature(hosts[host])
+                total_events += sum(r["events"].values())
+                total_bytes += r["input_bytes"]
+                tqdm.write(f"[+] {host}: {r['sessions']} sessions, {sum(r['events'].values())} events, {r['seconds']:.1f}s")
+            else:
+                failed += 1
+                tqdm.write(f"[!] {host}: failed\n{r['error']}")
+            state.update(host, r)
+
+            elapsed = time.perf_counter() - t0
+            bar.set_postfix(events_s=f"{total_events / elapsed:.0f}", MB_s=f"{total_bytes / elapsed / 1e6:.1f}",
+                            failed=failed)
+            bar.update(1)
+
+    done_dirs = {h: os.path.join(hosts_out, h) for h in hosts if state.hosts.get(h, {}).get("status") == "done"}
+    paths = merge_fleet_tables(args.out, done_dirs)
+
+    print("\n=== DONE ===")
+    print(f"[*] hosts analyzed: {len(done_dirs)}/{len(hosts)} (failed: {sum(1 for h in hosts if state.hosts.get(h, {}).get('status') == 'failed')})")
+    for k, v in paths.items():
+        print(f"[+] {k}: {v}")
+    print(f"[+] Fleet state: {state.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,96 +2,491 @@
 # IDE: VS code
 
 import os
+import sys
+import csv
+import json
+import time
 import argparse
 from tqdm import tqdm
 
-from rdp_analyzer.config import SECURITY_EVENT_IDS, LSM_EVENT_IDS, RCM_EVENT_IDS
-from rdp_analyzer.evtx_reader import iter_evtx_records
-from rdp_analyzer.parsers import (
-    parse_security_event,
-    parse_rcm_event,
-    parse_lsm_event,
-    parse_rdpclient_event
-)
+from rdp_analyzer.config import LOG_TYPE_EVENT_IDS
+from rdp_analyzer.evtx_reader import iter_evtx_records, record_count, READERS
+from rdp_analyzer.filters import RecordFilter, parse_time_bound
+from rdp_analyzer.parsers import parse_records
+from rdp_analyzer.event_store import EventStore
+from rdp_analyzer.parallel import load_events_parallel, load_logs_concurrently
+from rdp_analyzer.chunk_index import select_chunks, load_chunk_index
+from rdp_analyzer.raw_index import FileRegistry, write_raw_index
+from rdp_analyzer.checkpoint import Checkpoint
+from rdp_analyzer.event_cache import load_or_parse, cache_entry, load_entry, save_entry, save_merged, write_manifest
+from rdp_analyzer.dedup import plan_overlaps, dedup_stores
+from rdp_analyzer.merge import expand_inputs
 from rdp_analyzer.correlator import correlate_sessions
+from rdp_analyzer.streaming import StreamingCorrelator
+from rdp_analyzer.follow import follow_logs
+from rdp_analyzer.profiler import StageProfiler, PROFILE_MODES
 from rdp_analyzer.failures import analyze_failures
+from rdp_analyzer.detection import detect_failure_alerts
 from rdp_analyzer.outputs import (
     write_sessions,
     write_failures,
+    write_failure_alerts,
     write_timeline,
-    write_summary_report
+    write_summary_report,
+    write_datasets,
+    JSON_FORMATS
 )
+from rdp_analyzer.dataset import DATASET_FORMATS
+from rdp_analyzer.event_db import write_event_db, query_events, query_sessions, DB_NAME
 from rdp_analyzer.utils import ensure_dir
+from build_session_artifacts import load_timeline, build_sessions_from_timeline, build_failure_summary, save_outputs
+
+def load_events(evtx_path: str, log_type: str, reader: str = "xml", workers: int = 1, record_filter=None,
+                file_id=None, min_record_num=None, max_record_num=None, progress=True, index_dir=None,
+                skip_chunks=None):
+    # 필요한 EventID 는 reader 까지 내려보내서 EventData 를 만들기 전에 버림
+    record_filter = (record_filter or RecordFilter()).for_event_ids(LOG_TYPE_EVENT_IDS[log_type])
+    if record_filter.has_time and progress:
+        # 시간 범위 밖 chunk 는 reader 가 건너뜀 (chunk_index)
+        keep = select_chunks(evtx_path, record_filter.since, record_filter.until, index_dir)
+        print(f"[*] {log_type}: {len(keep)}/{len(load_chunk_index(evtx_path, index_dir))} chunks overlap --since/--until")
+
+    if workers > 1:
+        return load_events_parallel(evtx_path, log_type, reader=reader, workers=workers,
+                                    record_filter=record_filter, file_id=file_id,
+                                    min_record_num=min_record_num, max_record_num=max_record_num,
+                                    index_dir=index_dir, skip_chunks=skip_chunks)
+
+    records = tqdm(iter_evtx_records(evtx_path, reader=reader, record_filter=record_filter,
+                                     min_record_num=min_record_num, max_record_num=max_record_num,
+                                     index_dir=index_dir, skip_chunks=skip_chunks),
+                   desc=f"Parsing {log_type}", disable=not progress)
+    return EventStore(log_type).extend(parse_records(records, log_type, record_filter, file_id))
+
+
+def _paths(value):
+    # 인자 하나: 파일 / glob / 폴더 또는 그 list / None -> EVTX 경로 list
+    if not value:
+        return []
+    return expand_inputs([value] if isinstance(value, str) else value)
+
+
+def run_analysis(security, lsm, rcm, rdpclient=None, out="output", time_window=5, reader="xml", workers=1,
+                 record_filter=None, filter_params=None, incremental=False, cache=None, progress=True,
+                 concurrent_logs=False, profiler=None, columnar=None, json_format="json",
+                 failure_rules=None, v2=False, session_rules=None, db=False):
+    """
+    EVTX 한 세트(호스트 하나)를 분석해서 out 에 결과 파일을 씀.
+    security/lsm/rcm 이 None 이면 빈 log 로 처리함 (fleet mode 에서 일부 로그가 없는 호스트).
+    각 인자는 경로 / glob / 폴더의 list 도 됨 (live 파일 + Archive-*.evtx 등): 앞의 파일에 이미 있는
+    chunk / 파일은 건너뛰고, 파일별 event 를 시간순 k-way merge 하면서
+    (computer, EventRecordID, timestamp) 기준으로 중복 제거함 (dedup.py, merge.py).
+    profiler(StageProfiler) 를 주면 단계별 측정값을 out/profile.json 에 씀.
+    columnar("auto" / "parquet" / "arrow" / "col") 를 주면 out/datasets/ 에 partition 된 column 파일도 씀.
+    failure_rules: detection.FailureDetector 인자 (burst / spray window, threshold).
+    v2=True 이면 build_session_artifacts.py 의 End_A/End_B 세션 표와 case JSON 도 같은 실행에서
+    메모리의 EventStore 로 바로 만듦 (timeline CSV 를 다시 읽지 않음).
+    session_rules: v2 의 build_sessions_from_timeline 인자 (gap / End_A, End_B pad minutes).
+    db=True 이면 event 와 세션을 index 가 있는 out/rdp_events.sqlite 에도 넣음 (main.py query 로 조회).
+    record_filter 의 user/ip 는 세션 / 4625 실패 / v2 세션의 범위만 정함 (timeline, raw index, DB 의
+    event 는 --since/--until 안의 전부; logoff / 권한 / LSM event 를 세션에 붙이기 위해 버리지 않음).
+    Returns counts and output paths.
+    """
+    ensure_dir(out)
+    profiler = profiler or StageProfiler(enabled=False)
+    record_filter = record_filter or RecordFilter()
+    filter_params = filter_params or {}
+    # 파싱 결과는 --since/--until 에만 달라짐 (--user/--ip 는 결과 범위) -> checkpoint / cache 의 key
+    parse_params = {k: v for k, v in filter_params.items() if k not in ("user", "ip")}
+    checkpoint = Checkpoint(out, parse_params) if incremental else None
+    registry = FileRegistry(checkpoint.registry if checkpoint else None)
+    cache_entries = {}
+
+    inputs = {"Security": _paths(security), "LSM": _paths(lsm), "RCM": _paths(rcm),
+              "RDPClient": [p for p in _paths(rdpclient) if os.path.exists(p)]}
+    inputs = {log_type: paths for log_type, paths in inputs.items() if paths}
+    if checkpoint is not None and any(len(paths) > 1 for paths in inputs.values()):
+        # checkpoint 는 log type 당 파일 하나의 record 번호로 이어 읽음
+        raise ValueError("incremental mode takes one file per log type")
+
+    # 파일이 여러 개인 log type: 앞의 파일에 이미 있는 chunk 는 파싱 대상에서 뺌
+    # plans: {log_type: [(path, origin, skip_chunks)]}
+    plans = {log_type: plan_overlaps(paths, index_dir=cache) if len(paths) > 1 else [(paths[0], None, frozenset())]
+             for log_type, paths in inputs.items()}
+
+    def cache_params(skip_chunks):
+        return dict(parse_params, skip_chunks=sorted(skip_chunks)) if skip_chunks else parse_params
+
+    def load(evtx_path, log_type, skip_chunks):
+        file_id = registry.register(evtx_path)
+
+        def parse(**record_range):
+            return load_events(evtx_path, log_type, reader, workers, record_filter, file_id=file_id,
+                               progress=progress, index_dir=cache, skip_chunks=skip_chunks, **record_range)
+
+        if checkpoint is not None:
+            # 지난 실행 이후에 추가된 record 번호 범위만 파싱해서 저장된 event 뒤에 붙임
+            return checkpoint.load(evtx_path, log_type, parse), None
+        if cache:
+            return load_or_parse(cache, evtx_path, log_type, cache_params(skip_chunks), parse, file_id=file_id)
+        return parse(), None
+
+    def load_concurrently():
+        # cache 에 있는 로그는 바로 읽고, 나머지만 process 하나씩 맡겨서 동시에 파싱
+        loaded, misses, jobs = {}, {}, []
+        for log_type, plan in plans.items():
+            for evtx_path, _, skip_chunks in plan:
+                file_id = registry.register(evtx_path)
+                if cache:
+                    entry, key = cache_entry(cache, evtx_path, log_type, cache_params(skip_chunks))
+                    store = load_entry(entry, key, file_id)
+                    loaded[(log_type, file_id)] = (store, entry)
+                    if store is not None:
+                        continue
+                    misses[(log_type, file_id)] = (entry, key, evtx_path)
+                jobs.append((log_type, evtx_path, file_id, skip_chunks))
+
+        if jobs:
+            for job_key, store in load_logs_concurrently(jobs, reader, record_filter, index_dir=cache).items():
+                loaded[job_key] = (store, loaded.get(job_key, (None, None))[1])
+        for job_key, (entry, key, evtx_path) in misses.items():
+            save_entry(entry, key, loaded[job_key][0], evtx_path)
+        return loaded
+
+    def merge_files(log_type, loaded):
+        # loaded: [(path, origin, (EventStore, cache entry))] -> EventStore (cache_entries 도 채움)
+        if len(loaded) == 1:
+            store, entry = loaded[0][2]
+            if entry:
+                cache_entries[log_type] = entry
+            return store
+        store, dropped = dedup_stores([s for _, _, (s, _) in loaded],
+                                      {registry.register(path): origin for path, origin, _ in loaded})
+        print(f"[*] {log_type}: {len(loaded)}/{len(inputs[log_type])} files parsed, "
+              f"{dropped} duplicate events dropped")
+        if cache:
+            cache_entries[log_type] = save_merged(cache, log_type, [e for _, _, (_, e) in loaded], store)
+        return store
 
-def load_events(evtx_path: str, log_type: str):
-    events = []
-    for event_id, channel, ts, d, raw_xml in tqdm(iter_evtx_records(evtx_path), desc=f"Parsing {log_type}"):
-        if not event_id:
-            continue
+    # kept/dropped 비교용: 파일의 record 수 (chunk header 만 읽음)
+    scanned = ({log_type: sum(record_count(p) for p in paths) for log_type, paths in inputs.items()}
+               if profiler.enabled else {})
 
-        if log_type == "Security":
-            if event_id not in SECURITY_EVENT_IDS:
-                continue
-            events.append(parse_security_event(event_id, ts, d, raw_xml))
+    stores = {}
+    if concurrent_logs and checkpoint is None:
+        with profiler.stage("load:concurrent", records=sum(scanned.values()) if scanned else None) as st:
+            loaded = load_concurrently()
+            for log_type, plan in plans.items():
+                files = [(path, origin, loaded[(log_type, registry.register(path))]) for path, origin, _ in plan]
+                stores[log_type] = merge_files(log_type, files)
+            st["kept"] = sum(len(store) for store in stores.values())
+    else:
+        if concurrent_logs:
+            print("[*] --incremental reads only new records; loading logs one by one")
+        for log_type, plan in plans.items():
+            with profiler.stage(f"load:{log_type}", records=scanned.get(log_type)) as st:
+                files = [(path, origin, load(path, log_type, skip)) for path, origin, skip in plan]
+                stores[log_type] = merge_files(log_type, files)
+                st["kept"] = len(stores[log_type])
+    for log_type, store in stores.items():
+        profiler.log_counts(log_type, scanned.get(log_type), len(store))
 
-        elif log_type == "RCM":
-            if event_id not in RCM_EVENT_IDS:
-                continue
-            events.append(parse_rcm_event(event_id, ts, d, raw_xml))
+    security_events = stores.get("Security", EventStore("Security"))
+    lsm_events = stores.get("LSM", EventStore("LSM"))
+    rcm_events = stores.get("RCM", EventStore("RCM"))
+    rdpclient_events = stores.get("RDPClient", EventStore("RDPClient"))
 
-        elif log_type == "LSM":
-            if event_id not in LSM_EVENT_IDS:
-                continue
-            events.append(parse_lsm_event(event_id, ts, d, raw_xml))
+    n_events = len(security_events) + len(rcm_events) + len(lsm_events)
+    with profiler.stage("correlate_sessions", records=n_events) as st:
+        all_sessions = correlate_sessions(
+            security_events=security_events,
+            rcm_events=rcm_events,
+            lsm_events=lsm_events,
+            time_window_minutes=time_window
+        )
+        sessions = record_filter.scope_sessions(all_sessions)
+        st["sessions"] = len(sessions)
 
-        elif log_type == "RDPClient":
-            events.append(parse_rdpclient_event(event_id, ts, d, raw_xml))
+    # 4625 실패 분석은 --user/--ip 의 row 만
+    failure_events = record_filter.scope_store(security_events)
+    with profiler.stage("analyze_failures", records=len(failure_events)):
+        df_failures, df_fail_by_ip, df_fail_by_user_ip = analyze_failures(failure_events)
+    with profiler.stage("detect_failure_alerts", records=len(df_failures)) as st:
+        df_alerts = detect_failure_alerts(failure_events, **(failure_rules or {}))
+        st["alerts"] = len(df_alerts)
 
-    return events
+    with profiler.stage("write_sessions", records=len(sessions)):
+        sessions_csv, sessions_json = write_sessions(out, sessions, json_format)
+    with profiler.stage("write_failures", records=len(df_failures)):
+        failure_paths = write_failures(out, df_failures, df_fail_by_ip, df_fail_by_user_ip)
+        alerts_path = write_failure_alerts(out, df_alerts)
+        if alerts_path:
+            failure_paths["failure_alerts_csv"] = alerts_path
+    with profiler.stage("write_timeline", records=n_events):
+        timeline_path = write_timeline(out, security_events, rcm_events, lsm_events)
+    with profiler.stage("write_summary_report", records=len(sessions)):
+        report_path = write_summary_report(out, sessions, df_fail_by_ip, df_fail_by_user_ip, df_alerts)
+    with profiler.stage("write_raw_index", records=n_events + len(rdpclient_events)):
+        _, raw_index_path = write_raw_index(out, registry, security_events, rcm_events, lsm_events, rdpclient_events)
+
+    dataset_paths = None
+    if columnar:
+        with profiler.stage("write_datasets", records=n_events + len(sessions) + len(df_failures)):
+            dataset_paths = write_datasets(out, sessions, df_failures, security_events, rcm_events, lsm_events,
+                                           fmt=columnar)
+
+    db_path = None
+    if db:
+        with profiler.stage("write_event_db", records=n_events + len(rdpclient_events)) as st:
+            db_path, counts = write_event_db(out, [security_events, rcm_events, lsm_events, rdpclient_events],
+                                             sessions)
+            st.update(counts)
+
+    v2_paths = None
+    if v2:
+        with profiler.stage("build_sessions_v2", records=len(rcm_events) + len(lsm_events)) as st:
+            timeline = load_timeline([security_events, rcm_events, lsm_events])
+            sessions_df, sessions_list = build_sessions_from_timeline(timeline, **(session_rules or {}))
+            sessions_df = record_filter.scope_frame(sessions_df, "user", "src_ip")
+            sessions_list = record_filter.scope_sessions(sessions_list, "user", "src_ip")
+            if failure_events is not security_events:
+                timeline = load_timeline([failure_events])
+            failures_summary = build_failure_summary(timeline)
+            st["sessions"] = len(sessions_list)
+        if sessions_df.empty:
+            print("[!] No sessions inferred from timeline.")
+        else:
+            with profiler.stage("save_outputs_v2", records=len(sessions_list)):
+                v2_paths = save_outputs(out, sessions_df, sessions_list, failures_summary,
+                                        columnar=columnar, json_format=json_format)
+
+    manifest_path = write_manifest(out, cache_entries) if cache_entries else None
+
+    checkpoint_path = None
+    if checkpoint is not None:
+        closed = checkpoint.closed_since_last_run(sessions)
+        if closed:
+            print(f"[*] {len(closed)} session(s) open at the last run are now closed")
+        with profiler.stage("checkpoint_save"):
+            # 열린 logon id 는 --user/--ip 와 상관없이 전부 저장 (다음 실행의 범위가 달라도 그대로 씀)
+            checkpoint_path = checkpoint.save(registry, all_sessions)
+
+    profile_path = profiler.save(out)
+
+    return {
+        "sessions": len(sessions),
+        "failure_alerts": len(df_alerts),
+        "events": {store.log_type: len(store) for store in (security_events, lsm_events, rcm_events, rdpclient_events)},
+        "failure_paths": failure_paths,
+        "paths": {
+            "sessions_csv": sessions_csv,
+            "sessions_json": sessions_json,
+            "timeline_csv": timeline_path,
+            "summary_report": report_path,
+            "raw_index": raw_index_path,
+            "event_cache_manifest": manifest_path,
+            "checkpoint": checkpoint_path,
+            "profile": profile_path,
+            "datasets": dataset_paths,
+            "v2": v2_paths,
+            "event_db": db_path,
+        },
+    }
+
+
+def query_main(argv):
+    """
+    main.py query --db <out>/rdp_events.sqlite [--user] [--ip] [--since] [--until] ...
+    조건에 맞는 event (또는 --sessions 이면 세션) 를 시간순으로 stdout 에 출력함.
+    """
+    parser = argparse.ArgumentParser(prog="main.py query", description="Query the event DB written by main.py --db")
+    parser.add_argument("--db", default=os.path.join("output", DB_NAME), help="Path to rdp_events.sqlite")
+    parser.add_argument("--user", help="Username (case-insensitive, domain ignored)")
+    parser.add_argument("--ip", help="Client IP")
+    parser.add_argument("--since", help="At or after this time (UTC, ISO-8601)")
+    parser.add_argument("--until", help="At or before this time (UTC, ISO-8601)")
+    parser.add_argument("--logon-id", help="Security LogonId (events only)")
+    parser.add_argument("--source", choices=("Security", "RCM", "LSM", "RDPClient"), help="Log type (events only)")
+    parser.add_argument("--event-id", type=int, help="EventID (events only)")
+    parser.add_argument("--sessions", action="store_true", help="Return sessions (by session_start) instead of events")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--format", choices=("csv", "json", "ndjson"), default="csv")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found (write it with main.py --db)")
+
+    since, until = parse_time_bound(args.since), parse_time_bound(args.until)
+    t0 = time.perf_counter()
+    if args.sessions:
+        rows = query_sessions(args.db, args.user, args.ip, since, until, limit=args.limit)
+    else:
+        rows = query_events(args.db, args.user, args.ip, since, until, logon_id=args.logon_id,
+                            source=args.source, event_id=args.event_id, limit=args.limit)
+    elapsed = time.perf_counter() - t0
+
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.format == "ndjson":
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    elif rows:
+        # 세션의 lsm_events 같은 list 값은 JSON 문자열로
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else v
+                             for k, v in row.items()})
+    print(f"[*] {len(rows)} {'sessions' if args.sessions else 'events'} in {elapsed * 1000:.1f} ms", file=sys.stderr)
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Modular EVTX RDP Analyzer")
-    parser.add_argument("--security", required=True)
-    parser.add_argument("--lsm", required=True)
-    parser.add_argument("--rcm", required=True)
-    parser.add_argument("--rdpclient", required=False)
+    if len(sys.argv) > 1 and sys.argv[1] == "query":
+        query_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Modular EVTX RDP Analyzer (main.py query --help: search the event DB)")
+    # 같은 로그의 파일을 여러 개 줄 수 있음 (live + Archive-*.evtx / 수동 export): 겹치는 record 는 한 번만 셈
+    inputs_help = "EVTX files, globs (quoted) or directories of *.evtx; several files are merged by time"
+    parser.add_argument("--security", nargs="+", required=True, help=inputs_help)
+    parser.add_argument("--lsm", nargs="+", required=True, help=inputs_help)
+    parser.add_argument("--rcm", nargs="+", required=True, help=inputs_help)
+    parser.add_argument("--rdpclient", nargs="+", required=False, help=inputs_help)
     parser.add_argument("--out", default="output")
     parser.add_argument("--time-window", type=int, default=5)
+    parser.add_argument("--reader", choices=READERS, default="xml",
+                        help="xml: render+reparse XML per record, native: decode BinXML directly")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse chunk ranges of each EVTX file across N processes")
+    parser.add_argument("--since", help="Only keep events at or after this time (UTC, ISO-8601)")
+    parser.add_argument("--until", help="Only keep events at or before this time (UTC, ISO-8601)")
+    parser.add_argument("--user", help="Only report sessions / 4625 failures of this username "
+                                       "(case-insensitive, domain ignored); all events are still parsed and correlated")
+    parser.add_argument("--ip", help="Only report sessions / 4625 failures of this client IP; "
+                                     "all events are still parsed and correlated")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep a checkpoint in --out and only parse records appended since the last run")
+    parser.add_argument("--concurrent-logs", action="store_true",
+                        help="Parse the Security/LSM/RCM/RDPClient files at the same time in separate processes")
+    parser.add_argument("--cache", help="Directory of parsed-event caches; unchanged EVTX files are not decoded again")
+    parser.add_argument("--follow", action="store_true",
+                        help="Poll the EVTX files for new records and stream sessions/alerts to sessions_stream.jsonl")
+    parser.add_argument("--poll", type=float, default=10.0, help="--follow poll interval in seconds")
+    parser.add_argument("--from-end", action="store_true", help="--follow: skip the records already in the files")
+    parser.add_argument("--session-timeout", type=int, default=480,
+                        help="--follow: minutes after which a 4624 without 4634 is reported as timed out; "
+                             "a 4634 that arrives within another timeout period emits a closed record for it")
+    parser.add_argument("--profile", nargs="?", const="basic", choices=PROFILE_MODES,
+                        help="Write per-stage time/throughput/peak RSS to profile.json "
+                             "(cprofile / tracemalloc / all add .pstats dumps and allocation sites)")
+    parser.add_argument("--columnar", nargs="?", const="auto", choices=("auto",) + DATASET_FORMATS,
+                        help="Also write timeline/sessions/4625 as day/source partitioned Parquet "
+                             "(Arrow IPC / .col; auto = parquet if pyarrow is installed, else col)")
+    parser.add_argument("--burst-window", type=int, default=10,
+                        help="Minutes of the 4625 burst windows (per IP / per user)")
+    parser.add_argument("--burst-threshold", type=int, default=20,
+                        help="Failures from one IP within --burst-window that raise a burst_ip alert")
+    parser.add_argument("--user-threshold", type=int, default=20,
+                        help="Failures against one user within --burst-window that raise a burst_user alert")
+    parser.add_argument("--spray-window", type=int, default=60, help="Minutes of the password spray window")
+    parser.add_argument("--spray-users", type=int, default=5,
+                        help="Distinct usernames from one IP within --spray-window that raise a spray alert")
+    parser.add_argument("--v2", action="store_true",
+                        help="Also write the End_A/End_B session summary and cases (build_session_artifacts.py) "
+                             "from the loaded events, without the timeline CSV round trip")
+    parser.add_argument("--gap", type=int, default=30, help="--v2: gap minutes to split sessions (per user+ip)")
+    parser.add_argument("--endA_pad", type=int, default=10,
+                        help="--v2: End_A padding minutes after last 1149 if no next event")
+    parser.add_argument("--endB_pad", type=int, default=5, help="--v2: End_B padding minutes after last disconnect")
+    parser.add_argument("--json-format", choices=JSON_FORMATS, default="json",
+                        help="ndjson: write rdp_sessions.ndjson, one session per line, instead of rdp_sessions.json")
+    parser.add_argument("--db", action="store_true",
+                        help="Also load events and sessions into an indexed SQLite file (rdp_events.sqlite) "
+                             "for main.py query")
     args = parser.parse_args()
+    empty = [name for name in ("security", "lsm", "rcm") if not _paths(getattr(args, name))]
+    if empty:
+        parser.error(f"--{empty[0]}: no EVTX files found")
+    multi = [name for name in ("security", "lsm", "rcm", "rdpclient") if len(_paths(getattr(args, name))) > 1]
+    if multi and (args.incremental or args.follow):
+        parser.error(f"--incremental / --follow take one file per log type (got several for --{multi[0]})")
 
     ensure_dir(args.out)
 
-    security_events = load_events(args.security, "Security")
-    lsm_events = load_events(args.lsm, "LSM")
-    rcm_events = load_events(args.rcm, "RCM")
-
-    rdpclient_events = []
-    if args.rdpclient and os.path.exists(args.rdpclient):
-        rdpclient_events = load_events(args.rdpclient, "RDPClient")
-
-    sessions = correlate_sessions(
-        security_events=security_events,
-        rcm_events=rcm_events,
-        lsm_events=lsm_events,
-        time_window_minutes=args.time_window
+    record_filter = RecordFilter(
+        since=parse_time_bound(args.since),
+        until=parse_time_bound(args.until),
+        user=args.user,
+        ip=args.ip
     )
+    if args.follow:
+        inputs = [("Security", _paths(args.security)[0]), ("LSM", _paths(args.lsm)[0]), ("RCM", _paths(args.rcm)[0])]
+        correlator = StreamingCorrelator(args.time_window, session_timeout_minutes=args.session_timeout)
+        stream_path = follow_logs(inputs, args.out, correlator, args.reader, record_filter,
+                                  poll_seconds=args.poll, from_end=args.from_end)
+        print(f"[+] Session stream: {stream_path}")
+        return
 
-    df_failures, df_fail_by_ip, df_fail_by_user_ip = analyze_failures(security_events)
-
-    sessions_csv, sessions_json = write_sessions(args.out, sessions)
-    failure_paths = write_failures(args.out, df_failures, df_fail_by_ip, df_fail_by_user_ip)
-    timeline_path = write_timeline(args.out, security_events, rcm_events, lsm_events)
-    report_path = write_summary_report(args.out, sessions, df_fail_by_ip, df_fail_by_user_ip)
+    filter_params = {"since": args.since, "until": args.until, "user": args.user, "ip": args.ip}
+    profiler = StageProfiler("main.py", args.profile) if args.profile else None
+    result = run_analysis(
+        args.security, args.lsm, args.rcm, args.rdpclient, args.out,
+        time_window=args.time_window,
+        reader=args.reader,
+        workers=args.workers,
+        record_filter=record_filter,
+        filter_params=filter_params,
+        incremental=args.incremental,
+        cache=args.cache,
+        concurrent_logs=args.concurrent_logs,
+        profiler=profiler,
+        columnar=args.columnar,
+        json_format=args.json_format,
+        v2=args.v2,
+        session_rules={
+            "gap_minutes": args.gap,
+            "endA_pad_minutes": args.endA_pad,
+            "endB_pad_minutes": args.endB_pad,
+        },
+        db=args.db,
+        failure_rules={
+            "burst_window_minutes": args.burst_window,
+            "burst_threshold": args.burst_threshold,
+            "user_threshold": args.user_threshold,
+            "spray_window_minutes": args.spray_window,
+            "spray_users": args.spray_users,
+        }
+    )
+    paths = result["paths"]
+    if profiler is not None:
+        profiler.print_table()
 
     print("\n=== DONE ===")
-    print(f"[+] Sessions CSV: {sessions_csv}")
-    print(f"[+] Sessions JSON: {sessions_json}")
-    if failure_paths:
-        for k, v in failure_paths.items():
-            print(f"[+] {k}: {v}")
-    print(f"[+] Timeline CSV: {timeline_path}")
-    print(f"[+] Summary Report: {report_path}")
+    print(f"[+] Sessions CSV: {paths['sessions_csv']}")
+    print(f"[+] Sessions JSON: {paths['sessions_json']}")
+    for k, v in result["failure_paths"].items():
+        print(f"[+] {k}: {v}")
+    print(f"[+] Timeline CSV: {paths['timeline_csv']}")
+    print(f"[+] Summary Report: {paths['summary_report']}")
+    print(f"[+] Raw XML Index: {paths['raw_index']}")
+    if paths.get("event_cache_manifest"):
+        print(f"[+] Event Cache Manifest: {paths['event_cache_manifest']}")
+    if paths.get("checkpoint"):
+        print(f"[+] Checkpoint: {paths['checkpoint']}")
+    if paths.get("v2"):
+        summary_csv, cases_json, summary_col, summary_dataset = paths["v2"]
+        print(f"[+] Session Summary v2: {summary_csv}")
+        print(f"[+] Session Cases: {cases_json}")
+        print(f"[+] Session Summary v2 (typed): {summary_col}")
+        if summary_dataset:
+            print(f"[+] Session Summary v2 dataset: {summary_dataset}")
+    if paths.get("event_db"):
+        print(f"[+] Event DB: {paths['event_db']}")
+    if paths.get("datasets"):
+        for k, v in paths["datasets"].items():
+            print(f"[+] Dataset {k}: {v}")
+    if paths.get("profile"):
+        print(f"[+] Profile: {paths['profile']}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,336 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from main import load_events, _paths
+from rdp_analyzer.evtx_reader import READERS
+from rdp_analyzer.filters import RecordFilter, parse_time_bound
+from rdp_analyzer.parsers import PARSER_VERSION
+from rdp_analyzer.event_store import EventStore
+from rdp_analyzer.event_cache import file_identity
+from rdp_analyzer.raw_index import FileRegistry, write_raw_index
+from rdp_analyzer.correlator import correlate_sessions
+from rdp_analyzer.failures import analyze_failures
+from rdp_analyzer.detection import detect_failure_alerts
+from rdp_analyzer.columnar import write_frame, read_frame
+from rdp_analyzer.event_db import write_event_db
+from rdp_analyzer.dedup import plan_overlaps, dedup_stores
+from rdp_analyzer.outputs import (
+    write_sessions,
+    write_failures,
+    write_failure_alerts,
+    write_timeline,
+    write_summary_report,
+    JSON_FORMATS
+)
+from rdp_analyzer.pipeline import Stage, Pipeline
+from rdp_analyzer.profiler import StageProfiler, PROFILE_MODES
+from rdp_analyzer.utils import ensure_dir
+from build_session_artifacts import load_timeline, build_sessions_from_timeline, build_failure_summary, save_outputs
+from plot_sessions_by_user import load_df_typed, render_user
+
+# main.py + build_session_artifacts.py + plot_sessions_by_user.py 를 한 번에 실행하는 entry point.
+# 단계별 결과는 --cache-dir 에 (입력 + 파라미터 fingerprint) 로 남으므로
+# 예) --gap 만 바꾸면 sessions_v2 / plots 만, --time-window 만 바꾸면 correlate / report 만 다시 계산함.
+#
+#   parse:<LogType> -> correlate ----------> report
+#                   -> failures ----------/
+#                   -> timeline
+#                   -> raw_index
+#                   -> sessions_v2 -> plots
+#                   -> event_db (--db, + correlate)
+
+_stores = {}
+
+
+def _store(path):
+    # 같은 실행 안에서 parse 결과(.col)는 한 번만 읽음
+    if path not in _stores:
+        _stores[path] = EventStore.load(path)
+    return _stores[path]
+
+
+def _stores_of(inputs, *log_types):
+    return [_store(inputs[f"parse:{t}"]["events"]) if f"parse:{t}" in inputs else EventStore(t) for t in log_types]
+
+
+def _read_sessions(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".ndjson"):
+            return [json.loads(line) for line in f.readlines()[1:]]
+        return json.load(f)
+
+
+def _read_table(path):
+    df, _ = read_frame(path)
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.DatetimeTZDtype):
+            # detect_failure_alerts 와 같은 naive UTC (report 의 시간 표기)
+            df[name] = df[name].dt.tz_localize(None)
+    return df
+
+
+def parse_stage(log_type, evtx_paths, file_ids, reader, workers, record_filter, filter_params, index_dir):
+    # evtx_paths / file_ids: 같은 log type 의 파일들 (여러 개면 main.py 처럼 겹치는 record 를 한 번만 셈)
+    def run(stage_dir, inputs, params):
+        if len(evtx_paths) == 1:
+            plan = [(evtx_paths[0], None, frozenset())]
+        else:
+            plan = plan_overlaps(evtx_paths, index_dir)
+        ids = dict(zip(evtx_paths, file_ids))
+        stores = [load_events(path, log_type, reader, workers, record_filter, file_id=ids[path],
+                              index_dir=index_dir, skip_chunks=skip) for path, _, skip in plan]
+        store = stores[0]
+        if len(stores) > 1:
+            store, dropped = dedup_stores(stores, {ids[path]: origin for path, origin, _ in plan})
+            print(f"[*] {log_type}: {len(plan)}/{len(evtx_paths)} files parsed, {dropped} duplicate events dropped")
+        name = f"{log_type}_events.col"
+        evtx = [os.path.abspath(p) for p in evtx_paths]
+        store.save(os.path.join(stage_dir, name), meta={"evtx": evtx[0] if len(evtx) == 1 else evtx})
+        return {"events": name}
+
+    one = len(evtx_paths) == 1
+    identity = [file_identity(p) for p in evtx_paths]
+    return Stage(f"parse:{log_type}", run, publish=False, params={
+        "log_type": log_type,
+        "identity": identity[0] if one else identity,
+        "file_id": file_ids[0] if one else list(file_ids),
+        "parser_version": PARSER_VERSION,
+        "reader": reader,
+        "filter": filter_params,
+    })
+
+
+def _scope(params):
+    # --user / --ip: 결과(세션, 4625 row) 범위 (filters.RecordFilter)
+    return RecordFilter(**params["scope"])
+
+
+def correlate_stage(parse_deps, time_window, json_format, scope):
+    def run(stage_dir, inputs, params):
+        security, rcm, lsm = _stores_of(inputs, "Security", "RCM", "LSM")
+        sessions = correlate_sessions(security_events=security, rcm_events=rcm, lsm_events=lsm,
+                                      time_window_minutes=params["time_window"])
+        sessions = _scope(params).scope_sessions(sessions)
+        csv_path, json_path = write_sessions(stage_dir, sessions, params["json_format"])
+        return {"sessions_csv": os.path.basename(csv_path), "sessions_json": os.path.basename(json_path)}
+
+    return Stage("correlate", run, deps=parse_deps,
+                 params={"time_window": time_window, "json_format": json_format, "scope": scope})
+
+
+def failures_stage(parse_deps, failure_rules, scope):
+    def run(stage_dir, inputs, params):
+        (security,) = _stores_of(inputs, "Security")
+        security = _scope(params).scope_store(security)
+        df_failures, df_fail_by_ip, df_fail_by_user_ip = analyze_failures(security)
+        df_alerts = detect_failure_alerts(security, **params["rules"])
+
+        names = {k: os.path.basename(v)
+                 for k, v in write_failures(stage_dir, df_failures, df_fail_by_ip, df_fail_by_user_ip).items()}
+        alerts_path = write_failure_alerts(stage_dir, df_alerts)
+        if alerts_path:
+            names["failure_alerts_csv"] = os.path.basename(alerts_path)
+
+        # report 단계가 CSV 를 다시 파싱하지 않도록 typed 표도 남김 (publish 안 함)
+        for key, df in (("by_ip", df_fail_by_ip), ("by_user_ip", df_fail_by_user_ip), ("alerts", df_alerts)):
+            write_frame(os.path.join(stage_dir, f"{key}.col"), df)
+            names[key] = f"{key}.col"
+        return names
+
+    return Stage("failures", run, deps=parse_deps, params={"rules": failure_rules, "scope": scope},
+                 publish=("failures_csv", "fail_ip_csv", "fail_user_ip_csv", "failure_alerts_csv"))
+
+
+def timeline_stage(parse_deps):
+    def run(stage_dir, inputs, params):
+        security, rcm, lsm = _stores_of(inputs, "Security", "RCM", "LSM")
+        return {"timeline_csv": os.path.basename(write_timeline(stage_dir, security, rcm, lsm))}
+
+    # version 2: k-way merge 순서 (같은 시각이면 Security, RCM, LSM / record 순)
+    return Stage("timeline", run, deps=parse_deps, version=2)
+
+
+def report_stage():
+    def run(stage_dir, inputs, params):
+        sessions = _read_sessions(inputs["correlate"]["sessions_json"])
+        failures = inputs["failures"]
+        path = write_summary_report(stage_dir, sessions, _read_table(failures["by_ip"]),
+                                    _read_table(failures["by_user_ip"]), _read_table(failures["alerts"]))
+        return {"summary_report": os.path.basename(path)}
+
+    return Stage("report", run, deps=("correlate", "failures"))
+
+
+def raw_index_stage(parse_deps, registry):
+    def run(stage_dir, inputs, params):
+        stores = _stores_of(inputs, "Security", "RCM", "LSM", "RDPClient")
+        files_path, index_path = write_raw_index(stage_dir, registry, *stores)
+        return {"raw_files": os.path.basename(files_path), "raw_index": os.path.basename(index_path)}
+
+    # raw_xml_files.json 에 들어가는 경로도 fingerprint 에 포함
+    return Stage("raw_index", run, deps=parse_deps,
+                 params={"files": {k: v["path"] for k, v in registry.files.items()}})
+
+
+def event_db_stage(parse_deps):
+    def run(stage_dir, inputs, params):
+        stores = _stores_of(inputs, "Security", "RCM", "LSM", "RDPClient")
+        path, _ = write_event_db(stage_dir, stores, _read_sessions(inputs["correlate"]["sessions_json"]))
+        return {"event_db": os.path.basename(path)}
+
+    return Stage("event_db", run, deps=parse_deps + ("correlate",))
+
+
+def sessions_v2_stage(parse_deps, gap, endA_pad, endB_pad, json_format, scope):
+    def run(stage_dir, inputs, params):
+        security, rcm, lsm = _stores_of(inputs, "Security", "RCM", "LSM")
+        timeline = load_timeline([security, rcm, lsm])
+        sessions_df, sessions_list = build_sessions_from_timeline(
+            timeline,
+            gap_minutes=params["gap"],
+            endA_pad_minutes=params["endA_pad"],
+            endB_pad_minutes=params["endB_pad"]
+        )
+        record_filter = _scope(params)
+        sessions_df = record_filter.scope_frame(sessions_df, "user", "src_ip")
+        sessions_list = record_filter.scope_sessions(sessions_list, "user", "src_ip")
+        if record_filter.has_scope:
+            timeline = load_timeline([record_filter.scope_store(security)])
+        if sessions_df.empty:
+            print("[!] No sessions inferred from timeline.")
+            return {}
+        summary_csv, cases_json, summary_col, _ = save_outputs(
+            stage_dir, sessions_df, sessions_list, build_failure_summary(timeline), json_format=params["json_format"])
+        return {"summary_csv": os.path.basename(summary_csv), "cases_json": os.path.basename(cases_json),
+                "summary_col": os.path.basename(summary_col)}
+
+    return Stage("sessions_v2", run, deps=parse_deps,
+                 params={"gap": gap, "endA_pad": endA_pad, "endB_pad": endB_pad, "json_format": json_format,
+                         "scope": scope})
+
+
+def plots_stage(workers):
+    def run(stage_dir, inputs, params):
+        summary_col = inputs["sessions_v2"].get("summary_col")
+        if summary_col is None:
+            return {}
+        plot_dir = os.path.join(stage_dir, "plots")
+        ensure_dir(plot_dir)
+        df = load_df_typed(summary_col)
+        tasks = [(user, df_user, plot_dir) for user, df_user in df.groupby("user", sort=True)]
+        # workers 는 결과에 영향이 없으므로 fingerprint 에 넣지 않음
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                for _ in pool.map(render_user, tasks):
+                    pass
+        else:
+            for task in tasks:
+                render_user(task)
+        return {"plots": "plots"}
+
+    return Stage("plots", run, deps=("sessions_v2",))
+
+
+def build_pipeline(args, profiler=None):
+    # --user / --ip 는 파싱 조건이 아니라 결과 범위 (correlate / failures / sessions_v2 의 params)
+    record_filter = RecordFilter(since=parse_time_bound(args.since), until=parse_time_bound(args.until))
+    filter_params = {"since": args.since, "until": args.until}
+    scope = {"user": args.user, "ip": args.ip}
+    failure_rules = {
+        "burst_window_minutes": args.burst_window,
+        "burst_threshold": args.burst_threshold,
+        "user_threshold": args.user_threshold,
+        "spray_window_minutes": args.spray_window,
+        "spray_users": args.spray_users,
+    }
+
+    pipe = Pipeline(args.cache_dir, profiler=profiler, force=args.force)
+
+    # file_id 는 main.py 와 같은 등록 순서 (Security, LSM, RCM, RDPClient)
+    inputs = [(_paths(args.security), "Security"), (_paths(args.lsm), "LSM"), (_paths(args.rcm), "RCM")]
+    rdpclient = [p for p in _paths(args.rdpclient) if os.path.exists(p)]
+    if rdpclient:
+        inputs.append((rdpclient, "RDPClient"))
+    registry = FileRegistry()
+    parse_deps = {}
+    for paths, log_type in inputs:
+        file_ids = [registry.register(p) for p in paths]
+        stage = pipe.add(parse_stage(log_type, paths, file_ids, args.reader, args.workers,
+                                     record_filter, filter_params, args.cache_dir))
+        parse_deps[log_type] = stage.name
+    core = tuple(parse_deps[t] for t in ("Security", "RCM", "LSM"))
+
+    pipe.add(correlate_stage(core, args.time_window, args.json_format, scope))
+    pipe.add(failures_stage((parse_deps["Security"],), failure_rules, scope))
+    pipe.add(timeline_stage(core))
+    pipe.add(report_stage())
+    pipe.add(raw_index_stage(tuple(parse_deps.values()), registry))
+    if args.db:
+        pipe.add(event_db_stage(tuple(parse_deps.values())))
+    pipe.add(sessions_v2_stage(core, args.gap, args.endA_pad, args.endB_pad, args.json_format, scope))
+    if not args.no_plots:
+        pipe.add(plots_stage(args.workers))
+    return pipe
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run parsing, correlation, failures, timeline, v2 sessions and plots as cached stages")
+    parser.add_argument("--security", nargs="+", required=True)
+    parser.add_argument("--lsm", nargs="+", required=True)
+    parser.add_argument("--rcm", nargs="+", required=True)
+    parser.add_argument("--rdpclient", nargs="+", required=False)
+    parser.add_argument("--out", default="output")
+    parser.add_argument("--cache-dir", default="pipeline_cache",
+                        help="Stage results by fingerprint; unchanged stages are reused from here")
+    parser.add_argument("--force", action="store_true", help="Recompute every stage")
+    parser.add_argument("--time-window", type=int, default=5)
+    parser.add_argument("--gap", type=int, default=30, help="Gap minutes to split v2 sessions (per user+ip)")
+    parser.add_argument("--endA_pad", type=int, default=10, help="End_A padding minutes after last 1149 if no next event")
+    parser.add_argument("--endB_pad", type=int, default=5, help="End_B padding minutes after last disconnect")
+    parser.add_argument("--reader", choices=READERS, default="xml")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for EVTX parsing and plot rendering (not part of the fingerprints)")
+    parser.add_argument("--since", help="Only keep events at or after this time (UTC, ISO-8601)")
+    parser.add_argument("--until", help="Only keep events at or before this time (UTC, ISO-8601)")
+    parser.add_argument("--user", help="Only report sessions / 4625 failures of this username "
+                                       "(case-insensitive, domain ignored); all events are still parsed and correlated")
+    parser.add_argument("--ip", help="Only report sessions / 4625 failures of this client IP; "
+                                     "all events are still parsed and correlated")
+    parser.add_argument("--burst-window", type=int, default=10)
+    parser.add_argument("--burst-threshold", type=int, default=20)
+    parser.add_argument("--user-threshold", type=int, default=20)
+    parser.add_argument("--spray-window", type=int, default=60)
+    parser.add_argument("--spray-users", type=int, default=5)
+    parser.add_argument("--json-format", choices=JSON_FORMATS, default="json")
+    parser.add_argument("--db", action="store_true",
+                        help="Also build rdp_events.sqlite (indexed events + sessions) for main.py query")
+    parser.add_argument("--no-plots", action="store_true", help="Skip the per-user tables and calendar plots")
+    parser.add_argument("--profile", nargs="?", const="basic", choices=PROFILE_MODES,
+                        help="Write per-stage time/peak RSS to <out>/profile.json (cached stages included)")
+    args = parser.parse_args()
+
+    profiler = StageProfiler("pipeline_main.py", args.profile) if args.profile else None
+    pipe = build_pipeline(args, profiler)
+    results = pipe.run()
+    published = pipe.publish(args.out, results)
+
+    ran = [name for name, res in results.items() if not res["cached"]]
+    print("\n=== DONE ===")
+    print(f"[*] recomputed: {', '.join(ran) if ran else '(none)'}")
+    print(f"[+] Outputs: {args.out}")
+    print(f"[+] Pipeline: {published['pipeline']}")
+    if profiler is not None:
+        profiler.print_table()
+        print(f"[+] Profile: {profiler.save(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,37 @@
 # My Python version: 3.10.12
 # IDE: VS code
 
+import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")   # 파일로만 저장 (worker process 에서도 GUI 없이)
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
+
+from rdp_analyzer.columnar import read_frame
+from rdp_analyzer.dataset import read_dataset
+from rdp_analyzer.filters import parse_time_bound
+
+# 표 / 그림에 쓰는 column (--dataset 은 이 column 만 읽음)
+USER_TABLE_COLUMNS = [
+    "session_id",
+    "user",
+    "src_ip",
+    "auth_count_1149",
+    "start",
+    "end_A_next1149_or_pad",
+    "end_B_last_disconnect_or_none",
+    "duration_A_sec",
+    "duration_B_sec",
+    "disconnect_count",
+    "reconnect_count",
+    "confidence",
+]
 
 
 def load_df(csv_path):
@@ -20,25 +48,43 @@ def load_df(csv_path):
     return df.sort_values("start").reset_index(drop=True)
 
 
+def load_df_typed(col_path):
+    """
+    build_session_artifacts.py 가 같이 저장한 rdp_session_summary_v2.col 을 읽음.
+    datetime column 이 이미 UTC datetime 이므로 문자열 파싱이 없음.
+    """
+    df, _ = read_frame(col_path)
+
+    # normalize user
+    df["user"] = df["user"].fillna("UNKNOWN").astype(str)
+
+    return df.sort_values("start").reset_index(drop=True)
+
+
+def load_df_dataset(root, since=None, until=None):
+    """
+    build_session_artifacts.py --columnar 가 남긴 datasets/session_summary 를 읽음.
+    USER_TABLE_COLUMNS 만 읽고, since/until 이 있으면 그 밖의 day partition 은 열지 않음.
+    """
+    since, until = parse_time_bound(since), parse_time_bound(until)
+    day = (since.strftime("%Y-%m-%d") if since else None, until.strftime("%Y-%m-%d") if until else None)
+    df = read_dataset(root, columns=USER_TABLE_COLUMNS, where={"day": day if any(day) else None})
+    if since is not None:
+        df = df[df["start"] >= pd.Timestamp(since, tz="UTC")]
+    if until is not None:
+        df = df[df["start"] <= pd.Timestamp(until, tz="UTC")]
+
+    # normalize user
+    df["user"] = df["user"].fillna("UNKNOWN").astype(str)
+
+    return df.sort_values("start").reset_index(drop=True)
+
+
 def export_user_table(df_user, out_csv):
     """
     사용자별 세션 표를 저장한다.
     """
-    cols = [
-        "session_id",
-        "user",
-        "src_ip",
-        "auth_count_1149",
-        "start",
-        "end_A_next1149_or_pad",
-        "end_B_last_disconnect_or_none",
-        "duration_A_sec",
-        "duration_B_sec",
-        "disconnect_count",
-        "reconnect_count",
-        "confidence",
-    ]
-    out = df_user[cols].copy()
+    out = df_user[USER_TABLE_COLUMNS].copy()
 
     # ISO string으로 변환
     for c in ["start", "end_A_next1149_or_pad", "end_B_last_disconnect_or_none"]:
@@ -48,6 +94,14 @@ def export_user_table(df_user, out_csv):
     print(f"[+] saved table: {out_csv}")
 
 
+def _cycle_colors(idx):
+    """
+    i 번째 artist 가 기본 color cycle 에서 받는 색 (C0, C1, ...).
+    """
+    colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+    return [colors[i % len(colors)] for i in idx]
+
+
 def plot_user_timeline(df_user, out_png, title_prefix=""):
     """
     사용자별 세션 타임라인:
@@ -66,23 +120,29 @@ def plot_user_timeline(df_user, out_png, title_prefix=""):
 
     fig, ax = plt.subplots(figsize=(16, max(4, len(df_user) * 0.35)))
 
-    for i, row in df_user.iterrows():
-        start = row["start"]
-        endA = row["end_A_next1149_or_pad"]
-        endB = row["end_B_last_disconnect_or_none"]
-
-        if pd.isna(start) or pd.isna(endA):
-            continue
-
-        ax.plot([start, endA], [i, i], linewidth=4)
-
-        ax.scatter([endA], [i], marker="o", s=50)
-
-        if pd.notna(endB):
-            ax.scatter([endB], [i], marker="x", s=90)
-
-        ip = str(row["src_ip"])
-        ax.text(start, i + 0.15, ip, fontsize=8, alpha=0.9)
+    # 선분 / marker 를 artist 하나씩이 아니라 collection 하나로 그림
+    ok = (df_user["start"].notna() & df_user["end_A_next1149_or_pad"].notna()).to_numpy()
+    y = np.flatnonzero(ok)
+    start = mdates.date2num(df_user["start"][ok])
+    endA = mdates.date2num(df_user["end_A_next1149_or_pad"][ok])
+    endB_s = df_user["end_B_last_disconnect_or_none"][ok]
+    has_b = endB_s.notna().to_numpy()
+    endB = mdates.date2num(endB_s[has_b])
+
+    # 세션마다 ax.plot / ax.scatter 를 부를 때와 같은 색 순서 (plot, scatter 는 색 cycle 이 따로)
+    line_colors = _cycle_colors(np.arange(len(y)))
+    marker_idx = np.cumsum(np.concatenate(([0], 1 + has_b[:-1]))) if len(y) else np.array([], dtype=int)
+    endA_colors = _cycle_colors(marker_idx)
+    endB_colors = _cycle_colors(marker_idx[has_b] + 1)
+
+    ax.add_collection(LineCollection(np.stack([np.column_stack([start, y]), np.column_stack([endA, y])], axis=1),
+                                     colors=line_colors, linewidths=4, capstyle="projecting"))
+    ax.scatter(endA, y, marker="o", s=50, c=endA_colors)
+    ax.scatter(endB, y[has_b], marker="x", s=90, c=endB_colors)
+    for x, i, ip in zip(start, y, df_user["src_ip"][ok].astype(str)):
+        ax.text(x, i + 0.15, ip, fontsize=8, alpha=0.9)
+    ax.xaxis_date()
+    ax.autoscale_view()
 
     ax.set_yticks(range(len(df_user)))
     ax.set_yticklabels(df_user["session_id"].tolist())
@@ -91,12 +151,15 @@ def plot_user_timeline(df_user, out_png, title_prefix=""):
     ax.set_title(f"{title_prefix} RDP Sessions (Start → End_A, End_B marked)")
     fig.autofmt_xdate()
 
-    ax.scatter([], [], marker="o", label="End_A (next 1149 or padding)")
-    ax.scatter([], [], marker="x", label="End_B (disconnect-based)")
+    n_markers = len(y) + int(has_b.sum())
+    legend_colors = _cycle_colors(np.arange(n_markers, n_markers + 2))
+    ax.scatter([], [], marker="o", c=legend_colors[:1], label="End_A (next 1149 or padding)")
+    ax.scatter([], [], marker="x", c=legend_colors[1:], label="End_B (disconnect-based)")
     ax.legend(loc="upper right")
 
     plt.tight_layout()
     plt.savefig(out_png, dpi=200)
+    plt.close(fig)
     print(f"[+] saved plot: {out_png}")
 
 
@@ -123,11 +186,17 @@ def plot_user_calendar_like(df_user, out_png, title_prefix=""):
 
     fig, ax = plt.subplots(figsize=(14, max(4, len(days) * 0.45)))
 
-    for _, r in df.iterrows():
-        y = day_to_y[r["day"]]
-        ax.plot([r["start_hour"], r["endA_hour"]], [y, y], linewidth=4)
-        ax.scatter([r["start_hour"]], [y], marker="|", s=200) 
-        ax.scatter([r["endA_hour"]], [y], marker="|", s=200)  
+    y = df["day"].map(day_to_y).to_numpy(dtype=float)
+    start_h = df["start_hour"].to_numpy()
+    endA_h = df["endA_hour"].to_numpy()
+    k = np.arange(len(df))
+
+    # 선분은 LineCollection 하나, 시작 / 끝 marker("|") 는 scatter 하나
+    ax.add_collection(LineCollection(np.stack([np.column_stack([start_h, y]), np.column_stack([endA_h, y])], axis=1),
+                                     colors=_cycle_colors(k), linewidths=4, capstyle="projecting"))
+    ax.scatter(np.column_stack([start_h, endA_h]).ravel(), np.repeat(y, 2), marker="|", s=200,
+               c=_cycle_colors(np.arange(2 * len(df))))
+    ax.autoscale_view()
 
     ax.set_xlim(0, 24)
     ax.set_xticks(range(0, 25, 2))
@@ -139,31 +208,59 @@ def plot_user_calendar_like(df_user, out_png, title_prefix=""):
 
     plt.tight_layout()
     plt.savefig(out_png, dpi=200)
+    plt.close(fig)
     print(f"[+] saved plot: {out_png}")
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--csv", required=True, help="Path to rdp_session_summary_v2.csv")
-    parser.add_argument("--outdir", default="output", help="Output directory")
-    args = parser.parse_args()
-
-    df = load_df(args.csv)
+def render_user(task):
+    """
+    Worker: 사용자 한 명의 표 + 캘린더 그림.
+    """
+    user, df_user, outdir = task
 
-    # 사용자 리스트
-    users = sorted(df["user"].unique())
-    print("[*] users:", users)
+    # 표 저장
+    out_table = f"{outdir}/{user}_sessions_table.csv"
+    export_user_table(df_user, out_table)
 
-    for user in users:
-        df_user = df[df["user"] == user].copy()
+    # 날짜-시간 캘린더 스타일
+    out_calendar = f"{outdir}/{user}_sessions_calendar.png"
+    plot_user_calendar_like(df_user, out_calendar, title_prefix=user)
 
-        # 표 저장
-        out_table = f"{args.outdir}/{user}_sessions_table.csv"
-        export_user_table(df_user, out_table)
 
-        # 날짜-시간 캘린더 스타일
-        out_calendar = f"{args.outdir}/{user}_sessions_calendar.png"
-        plot_user_calendar_like(df_user, out_calendar, title_prefix=user)
+def main():
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Path to rdp_session_summary_v2.csv")
+    source.add_argument("--sessions", help="Path to rdp_session_summary_v2.col (typed, written next to the CSV)")
+    source.add_argument("--dataset", help="Path to datasets/session_summary (build_session_artifacts.py --columnar)")
+    parser.add_argument("--outdir", default="output", help="Output directory")
+    parser.add_argument("--since", help="--dataset: only sessions starting at or after this time (UTC, ISO-8601)")
+    parser.add_argument("--until", help="--dataset: only sessions starting at or before this time (UTC, ISO-8601)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Render the users' figures across N processes")
+    args = parser.parse_args()
+    if (args.since or args.until) and not args.dataset:
+        parser.error("--since/--until need --dataset")
+
+    if args.dataset:
+        df = load_df_dataset(args.dataset, args.since, args.until)
+    elif args.sessions:
+        df = load_df_typed(args.sessions)
+    else:
+        df = load_df(args.csv)
+
+    # 사용자 리스트 (groupby 한 번으로 나눔)
+    groups = list(df.groupby("user", sort=True))
+    print("[*] users:", [user for user, _ in groups])
+
+    tasks = [(user, df_user, args.outdir) for user, df_user in groups]
+    if args.workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(tasks))) as pool:
+            for _ in pool.map(render_user, tasks, chunksize=max(1, len(tasks) // (args.workers * 4))):
+                pass
+    else:
+        for task in tasks:
+            render_user(task)
 
     print("\n=== DONE ===")
 
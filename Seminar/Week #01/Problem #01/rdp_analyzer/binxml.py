@@ -0,0 +1,358 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import re
+import Evtx.Nodes as e_nodes
+from Evtx.Views import escape_value
+
+from .utils import safe_dt, filetime_to_dt
+
+# XML 문자열을 만들지 않고 BinXML 토큰/치환값을 바로 읽어 레코드를 구조화 함.
+
+EVENT_NS = "http://schemas.microsoft.com/win/2004/08/events/event"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# python-evtx가 XML 렌더링 시 제거하는 문자 (Views.RESTRICTED_CHARS 와 동일)
+_RESTRICTED_CHARS = re.compile('[\x01-\x08\x0B\x0C\x0E-\x1F\x7F-\x84\x86-\x9F]')
+_ATTR_WS = str.maketrans("\t\n", "  ")
+
+
+def _xml_text(s):
+    """
+    XML 파서가 텍스트 노드에 적용하는 정규화(제한 문자 제거, 개행 정규화)를 흉내냄.
+    """
+    if not s:
+        return s
+    s = _RESTRICTED_CHARS.sub("", s)
+    if "\r" in s:
+        s = s.replace("\r\n", "\n").replace("\r", "\n")
+    return s
+
+
+def _xml_attr(s):
+    s = _xml_text(s)
+    if s and ("\t" in s or "\n" in s):
+        s = s.translate(_ATTR_WS)
+    return s
+
+
+class _Elem:
+    """
+    Compiled template element.
+    attrs: [(name, part)], content: [str | int(sub index) | _Elem]
+    """
+    __slots__ = ("name", "attrs", "content")
+
+    def __init__(self, name):
+        self.name = name
+        self.attrs = []
+        self.content = []
+
+
+def _compile_part(node):
+    if isinstance(node, e_nodes.ValueNode):
+        return node.children()[0].string()
+    if isinstance(node, (e_nodes.NormalSubstitutionNode, e_nodes.ConditionalSubstitutionNode)):
+        return node.index()
+    if isinstance(node, e_nodes.CDataSectionNode):
+        # CDATA 안에서는 escape가 풀리지 않으므로 escape 된 값 그대로 텍스트가 됨
+        return escape_value(node.cdata())
+    if isinstance(node, e_nodes.EntityReferenceNode):
+        return node.entity_reference()
+    if isinstance(node, e_nodes.ProcessingInstructionTargetNode):
+        return node.processing_instruction_target()
+    if isinstance(node, e_nodes.ProcessingInstructionDataNode):
+        return node.string()
+    return None
+
+
+def _compile_nodes(nodes, out):
+    for node in nodes:
+        if isinstance(node, e_nodes.OpenStartElementNode):
+            elem = _Elem(node.tag_name())
+            children = node.children()
+            for child in children:
+                if isinstance(child, e_nodes.AttributeNode):
+                    elem.attrs.append((child.attribute_name().string(), _compile_part(child.attribute_value())))
+            _compile_nodes([c for c in children if not isinstance(c, e_nodes.AttributeNode)], elem.content)
+            out.append(elem)
+        else:
+            part = _compile_part(node)
+            if part is not None:
+                out.append(part)
+    return out
+
+
+def compile_template(template_node):
+    """
+    Template(BinXML) 를 한 번만 파싱해서 치환 인덱스가 들어간 트리로 바꿈.
+    """
+    return _compile_nodes(template_node.children(), [])
+
+
+class _Substitutions:
+    """
+    Lazily decoded substitution array of one root node.
+    Only the values that are actually looked at get decoded.
+    """
+    __slots__ = ("_root", "_decls", "_nodes")
+
+    def __init__(self, root):
+        self._root = root
+        ofs = root.tag_and_children_length()
+        count = root.unpack_dword(ofs)
+        ofs += 4
+        sizes = []
+        for _ in range(count):
+            sizes.append((root.unpack_word(ofs), root.unpack_byte(ofs + 2)))
+            ofs += 4
+        decls = []
+        for size, type_ in sizes:
+            decls.append((ofs, size, type_))
+            ofs += size
+        self._decls = decls
+        self._nodes = {}
+
+    def type(self, index):
+        return self._decls[index][2]
+
+    def node(self, index):
+        node = self._nodes.get(index)
+        if node is None:
+            ofs, size, type_ = self._decls[index]
+            root = self._root
+            node = e_nodes.get_variant_value(root._buf, root.offset() + ofs, root._chunk, root, type_, length=size)
+            self._nodes[index] = node
+        return node
+
+    def string(self, index):
+        if self._decls[index][2] == e_nodes.NODE_TYPES.BXML:
+            return ""
+        return self.node(index).string()
+
+
+class TemplateCache:
+    """
+    Compiled templates of one chunk, keyed by chunk-relative template offset.
+    """
+
+    def __init__(self):
+        self._chunk = None
+        self._templates = {}
+
+    def scope(self, root):
+        chunk = root._chunk
+        if chunk is not self._chunk:
+            self._chunk = chunk
+            self._templates = {}
+
+        template_offset = root.template_instance().template_offset()
+        compiled = self._templates.get(template_offset)
+        if compiled is None:
+            compiled = compile_template(root.template())
+            self._templates[template_offset] = compiled
+        return compiled, _Substitutions(root)
+
+
+def _text_of(parts, subs):
+    """
+    lxml의 elem.text 와 같이 첫 자식 element 이전의 텍스트만 이어붙임.
+    """
+    acc = []
+    for part in parts:
+        if part.__class__ is str:
+            acc.append(part)
+        elif part.__class__ is int:
+            if subs.type(part) == e_nodes.NODE_TYPES.BXML:
+                break
+            acc.append(subs.string(part))
+        else:
+            break
+    text = _xml_text("".join(acc))
+    return text or None
+
+
+def _attr_value(part, subs):
+    if part is None:
+        return ""
+    if part.__class__ is int:
+        return _xml_attr(subs.string(part))
+    return _xml_attr(part)
+
+
+def _qualify(name, nsmap, default_ns):
+    prefix, sep, local = name.rpartition(":")
+    if not sep:
+        return local, default_ns
+    return local, nsmap.get(prefix)
+
+
+class _Node:
+    """
+    Element bound to its substitution scope, i.e. the part of lxml's view
+    that the extraction code needs (tag, ns, attrib, text, children).
+    """
+    __slots__ = ("elem", "subs", "cache", "tag", "ns", "nsmap", "default_ns", "_attrib")
+
+    def __init__(self, elem, subs, cache, nsmap, default_ns):
+        self.elem = elem
+        self.subs = subs
+        self.cache = cache
+        self._attrib = None
+
+        for name, part in elem.attrs:
+            if name == "xmlns":
+                default_ns = _attr_value(part, subs)
+            elif name.startswith("xmlns:"):
+                nsmap = dict(nsmap)
+                nsmap[name[6:]] = _attr_value(part, subs)
+        self.nsmap = nsmap
+        self.default_ns = default_ns
+        self.tag, self.ns = _qualify(elem.name, nsmap, default_ns)
+
+    @property
+    def attrib(self):
+        if self._attrib is None:
+            attrib = {}
+            for name, part in self.elem.attrs:
+                if name == "xmlns" or name.startswith("xmlns:"):
+                    continue
+                if ":" in name:
+                    local, ns = _qualify(name, self.nsmap, None)
+                    name = f"{{{ns}}}{local}" if ns else local
+                attrib[name] = _attr_value(part, self.subs)
+            self._attrib = attrib
+        return self._attrib
+
+    def attr_datetime(self, name):
+        """
+        Attribute as datetime. FILETIME/SYSTEMTIME 치환값이면 문자열을 거치지 않고 바로 변환함.
+        """
+        for attr_name, part in self.elem.attrs:
+            if attr_name != name:
+                continue
+            if part.__class__ is int:
+                type_ = self.subs.type(part)
+                if type_ == e_nodes.NODE_TYPES.FILETIME:
+                    return filetime_to_dt(self.subs.node(part).unpack_qword(0))
+                if type_ == e_nodes.NODE_TYPES.SYSTEMTIME:
+                    return self.subs.node(part).systemtime()
+            return safe_dt(_attr_value(part, self.subs))
+        return None
+
+    @property
+    def text(self):
+        return _text_of(self.elem.content, self.subs)
+
+    def children(self):
+        return _iter_elements(self.elem.content, self.subs, self.cache, self.nsmap, self.default_ns)
+
+    def find(self, tag, ns=EVENT_NS):
+        for child in self.children():
+            if child.tag == tag and child.ns == ns:
+                return child
+        return None
+
+    def iter(self):
+        yield self
+        for child in self.children():
+            yield from child.iter()
+
+
+def _iter_elements(content, subs, cache, nsmap, default_ns):
+    for part in content:
+        if part.__class__ is _Elem:
+            yield _Node(part, subs, cache, nsmap, default_ns)
+        elif part.__class__ is int and subs.type(part) == e_nodes.NODE_TYPES.BXML:
+            # 치환값 안에 또 다른 BinXML(UserData 등)이 들어있는 경우
+            nested_root = subs.node(part).root()
+            nested, nested_subs = cache.scope(nested_root)
+            yield from _iter_elements(nested, nested_subs, cache, nsmap, default_ns)
+
+
+def record_root(record, cache):
+    """
+    Return the top-level element of a record, or None if it has none.
+    """
+    compiled, subs = cache.scope(record.root())
+    for node in _iter_elements(compiled, subs, cache, {"xml": XML_NS}, None):
+        return node
+    return None
+
+
+def peek_event_id(record, cache):
+    """
+    EventID 만 읽음 (EventID 치환값 하나만 decode). 없으면 None.
+    """
+    root = record_root(record, cache)
+    if root is None:
+        return None
+    sys_node = root.find("System")
+    if sys_node is None:
+        return None
+    eid_node = sys_node.find("EventID")
+    return int(eid_node.text) if eid_node is not None else None
+
+
+def decode_record(record, cache, record_filter=None):
+    """
+    Return (event_id, channel, ts, data_dict) for one record, or None when
+    the record has no System element (same rule as the XML path) or when
+    record_filter rejects it. EventID and TimeCreated are checked before
+    EventData/UserData is decoded.
+    """
+    root = record_root(record, cache)
+    if root is None:
+        return None
+
+    sys_node = root.find("System")
+    if sys_node is None:
+        return None
+
+    eid_node = sys_node.find("EventID")
+    event_id = int(eid_node.text) if eid_node is not None else None
+    if record_filter is not None and not record_filter.accepts_event_id(event_id):
+        return None
+
+    channel_node = sys_node.find("Channel")
+    channel = channel_node.text if channel_node is not None else None
+
+    time_node = sys_node.find("TimeCreated")
+    ts = time_node.attr_datetime("SystemTime") if time_node is not None else None
+    if record_filter is not None and not record_filter.accepts_time(ts):
+        return None
+
+    return event_id, channel, ts, decode_data(root)
+
+
+def decode_data(root):
+    data_dict = {}
+
+    ed = root.find("EventData")
+    if ed is not None:
+        for d in ed.children():
+            if d.tag != "Data" or d.ns != EVENT_NS:
+                continue
+            name = d.attrib.get("Name")
+            if name:
+                data_dict[name] = d.text
+
+    ud = root.find("UserData")
+    if ud is not None:
+        for elem in ud.iter():
+            if elem is ud:
+                continue
+            tag = elem.tag
+            text = elem.text
+            if text and text.strip():
+                if tag in data_dict:
+                    data_dict[f"UserData_{tag}"] = text
+                else:
+                    data_dict[tag] = text
+
+            for k, v in elem.attrib.items():
+                attr_key = f"{tag}_{k}"
+                if attr_key not in data_dict:
+                    data_dict[attr_key] = v
+
+    return data_dict
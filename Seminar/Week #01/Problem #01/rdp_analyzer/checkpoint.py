@@ -0,0 +1,206 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import zlib
+
+from Evtx.Evtx import Evtx
+
+from .event_store import EventStore
+from .parsers import PARSER_VERSION
+from .columnar import read_meta
+from .utils import ensure_dir
+
+# 같은 EVTX 를 주기적으로 다시 분석할 때, 지난 실행 이후에 추가된 레코드만 읽기 위한 checkpoint.
+# 파일마다 마지막으로 처리한 chunk / record 번호와 그 chunk 의 checksum 을 저장하고,
+# 지금까지 파싱한 EventStore 는 log type 별 .col 파일(EventStore.save, event_cache 와 같은 형식)로 저장해 둠.
+
+CHECKPOINT_NAME = "checkpoint.json"
+CHECKPOINT_EVENTS_DIR = "checkpoint_events"
+CHECKPOINT_VERSION = 2      # 2: pickle -> .col
+
+CHUNK_DATA_START = 0x200
+
+
+def _chunk_crc(evtx_path, chunk_offset, data_end):
+    """
+    CRC32 of the chunk's record area [0x200, data_end) (chunk-relative offsets).
+    """
+    with open(evtx_path, "rb") as f:
+        f.seek(chunk_offset + CHUNK_DATA_START)
+        data = f.read(data_end - CHUNK_DATA_START)
+    if len(data) != data_end - CHUNK_DATA_START:
+        return None
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+
+def scan_position(evtx_path):
+    """
+    Current end of the log: the chunk that holds the highest record number.
+    Only chunk headers and the record headers of that one chunk are read.
+    Returns None for a log without records.
+    """
+    best = None
+    with Evtx(evtx_path) as log:
+        for index, chunk in enumerate(log.get_file_header().chunks()):
+            if not chunk.check_magic() or chunk.next_record_offset() <= CHUNK_DATA_START:
+                continue
+            if best is None or chunk.log_last_record_number() > best[1].log_last_record_number():
+                best = (index, chunk)
+
+        if best is None:
+            return None
+        index, chunk = best
+        last_num = max((r.record_num() for r in chunk.records()), default=None)
+        if last_num is None:
+            return None
+        pos = {
+            "chunk_index": index,
+            "chunk_offset": chunk.offset(),
+            "record_num": last_num,
+            "data_end": chunk.next_record_offset(),
+        }
+
+    pos["checksum"] = _chunk_crc(evtx_path, pos["chunk_offset"], pos["data_end"])
+    return pos
+
+
+def position_unchanged(evtx_path, pos):
+    """
+    True if the records that were processed up to pos are still in place
+    (same chunk bytes). A cleared, rotated or wrapped log fails this check.
+    """
+    try:
+        return _chunk_crc(evtx_path, pos["chunk_offset"], pos["data_end"]) == pos["checksum"]
+    except OSError:
+        return False
+
+
+class Checkpoint:
+    """
+    Checkpoint store in the output directory.
+
+    - checkpoint.json                  : per log type -> file path + last position, open logon ids
+    - checkpoint_events/<log_type>.col : EventStore per log type (everything parsed so far)
+
+    params are the options that change which events are parsed (--since / --until;
+    --user / --ip only scope the outputs and are not part of it). If they differ
+    from the saved ones (or the parser version changed) the saved state is not reused.
+    """
+
+    def __init__(self, out_dir, params):
+        self.out_dir = out_dir
+        self.params = dict(params, version=CHECKPOINT_VERSION, parser_version=PARSER_VERSION)
+        self.files = {}
+        self.registry = {}
+        self.open_logon_ids = []
+        self.stores = {}
+        self._loaded = set()
+
+        path = os.path.join(out_dir, CHECKPOINT_NAME)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if not isinstance(saved, dict):
+                raise ValueError(f"{path}: not a checkpoint object")
+        except (OSError, ValueError):
+            # 잘렸거나 손으로 고친 checkpoint.json (JSONDecodeError 도 ValueError)
+            print("[!] Checkpoint file unreadable; doing a full parse")
+            return
+        if saved.get("params") != self.params:
+            print("[*] Checkpoint was made with different options; doing a full parse")
+            return
+
+        try:
+            stores = {log_type: self._load_store(log_type) for log_type in saved.get("files", {})}
+        except (OSError, ValueError, KeyError):
+            print("[!] Checkpoint events missing or unreadable; doing a full parse")
+            return
+
+        self.stores = stores
+        self.files = saved.get("files", {})
+        self.registry = {int(k): v for k, v in saved.get("registry", {}).items()}
+        self.open_logon_ids = saved.get("open_logon_ids", [])
+
+    def _events_path(self, log_type):
+        return os.path.join(self.out_dir, CHECKPOINT_EVENTS_DIR, f"{log_type}.col")
+
+    def _load_store(self, log_type):
+        path = self._events_path(log_type)
+        if read_meta(path)["meta"].get("parser_version") != PARSER_VERSION:
+            raise ValueError(f"{path} was written by another parser version")
+        return EventStore.load(path)
+
+    def load(self, evtx_path, log_type, loader):
+        """
+        Saved events of log_type + the records appended since the checkpoint.
+        loader(min_record_num=, max_record_num=) parses one record range into
+        an EventStore. Falls back to a full parse if the file is not the same
+        one or its already-processed records changed.
+        """
+        path = os.path.abspath(evtx_path)
+        self._loaded.add(log_type)
+        pos = scan_position(path)
+        if pos is None:
+            self.files.pop(log_type, None)
+            self.stores[log_type] = EventStore(log_type)
+            return self.stores[log_type]
+
+        prev = self.files.get(log_type)
+        saved = self.stores.get(log_type)
+        resume = (
+            saved is not None and prev is not None and prev["path"] == path
+            and prev["record_num"] <= pos["record_num"] and position_unchanged(path, prev)
+        )
+
+        if resume:
+            if pos["record_num"] > prev["record_num"]:
+                new = loader(min_record_num=prev["record_num"] + 1, max_record_num=pos["record_num"])
+                saved.merge(new)
+            else:
+                new = EventStore(log_type)
+            print(f"[*] {log_type}: {len(new)} new events after record {prev['record_num']}")
+            store = saved
+        else:
+            if prev is not None:
+                print(f"[*] {log_type}: checkpoint does not match {path}; doing a full parse")
+            store = loader(max_record_num=pos["record_num"])
+
+        self.files[log_type] = dict(pos, path=path)
+        self.stores[log_type] = store
+        return store
+
+    def closed_since_last_run(self, sessions):
+        """
+        Sessions that were open (4624 without 4634) at the last run and have an end now.
+        """
+        was_open = set(self.open_logon_ids)
+        return [s for s in sessions if s.get("logon_id") in was_open and s.get("session_end")]
+
+    def save(self, registry, sessions):
+        self.open_logon_ids = sorted({
+            s["logon_id"] for s in sessions if s.get("logon_id") and not s.get("session_end")
+        })
+
+        # 이번 실행에서 입력으로 주지 않은 log type 은 저장하지 않음
+        self.files = {k: v for k, v in self.files.items() if k in self._loaded}
+        stores = {k: v for k, v in self.stores.items() if k in self._loaded}
+
+        ensure_dir(os.path.join(self.out_dir, CHECKPOINT_EVENTS_DIR))
+        for log_type, store in stores.items():
+            store.save(self._events_path(log_type),
+                       {"parser_version": PARSER_VERSION, "checkpoint_version": CHECKPOINT_VERSION})
+
+        path = os.path.join(self.out_dir, CHECKPOINT_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "params": self.params,
+                "files": self.files,
+                "registry": {str(k): v for k, v in registry.files.items()},
+                "open_logon_ids": self.open_logon_ids,
+            }, f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+        return path
@@ -0,0 +1,125 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import struct
+import hashlib
+from datetime import datetime, timedelta
+
+from Evtx.Evtx import Evtx
+
+from .utils import ensure_dir
+
+# --since/--until 가 있을 때 시간 범위 밖의 chunk 는 record 를 하나도 디코딩하지 않고 건너뛰기 위한 index.
+# chunk 마다 header 의 record 번호 범위 + 첫 / 마지막 record header 의 기록 시각(FILETIME)만 읽음
+# (chunk 당 작은 read 3 번 -> 1 GB 파일이어도 몇 MB).
+# record 는 chunk 안에서 기록 순서대로 붙으므로 첫 / 마지막 record 시각이 그 chunk 의 시간 범위.
+# EVTX 는 순환 buffer 라 chunk 순서와 시간 순서가 다를 수 있으므로 chunk 마다 따로 비교함.
+
+CHUNK_INDEX_VERSION = 1     # 시간은 FILETIME(1601 기준 100ns) 그대로 저장
+CHUNK_INDEX_DIR = "chunk_index"
+CHUNK_HEADER_SIZE = 0x200
+
+# header 기록 시각과 TimeCreated(필터 기준)의 차이 여유 (보통 같지만 약간 늦게 기록될 수 있음)
+CHUNK_TIME_SLACK = timedelta(minutes=5)
+
+_RECORD_HEAD = struct.Struct("<IIQQ")    # magic, size, record_num, FILETIME
+_RECORD_MAGIC = 0x00002a2a
+_FILETIME_EPOCH = datetime(1601, 1, 1)
+_TICK = timedelta(microseconds=1)
+
+_memo = {}
+
+
+def _record_time(buf, ofs):
+    if ofs + _RECORD_HEAD.size > len(buf):
+        return None
+    magic, size, _, filetime = _RECORD_HEAD.unpack_from(buf, ofs)
+    if magic != _RECORD_MAGIC or size == 0:
+        return None
+    return filetime
+
+
+def _filetime(dt):
+    # naive UTC datetime -> FILETIME
+    return (dt - _FILETIME_EPOCH) // _TICK * 10
+
+
+def build_chunk_index(evtx_path):
+    """
+    [[chunk offset, first record num, last record num, min FILETIME, max FILETIME], ...] in file order.
+    빈 chunk / 읽을 수 없는 chunk 는 시간이 None (건너뛰지 않음).
+    """
+    chunks = []
+    with Evtx(evtx_path) as log:
+        buf = log._buf
+        for chunk in log.get_file_header().chunks():
+            ofs = chunk.offset()
+            entry = [ofs, None, None, None, None]
+            if chunk.check_magic() and chunk.next_record_offset() > CHUNK_HEADER_SIZE:
+                entry[1] = chunk.log_first_record_number()
+                entry[2] = chunk.log_last_record_number()
+                first = _record_time(buf, ofs + CHUNK_HEADER_SIZE)
+                last = _record_time(buf, ofs + chunk.last_record_offset())
+                if first is not None and last is not None:
+                    entry[3], entry[4] = min(first, last), max(first, last)
+            chunks.append(entry)
+    return chunks
+
+
+def _cache_path(index_dir, path):
+    digest = hashlib.blake2b(path.encode("utf-8"), digest_size=12).hexdigest()
+    return os.path.join(index_dir, CHUNK_INDEX_DIR, f"{os.path.basename(path)}-{digest}.json")
+
+
+def load_chunk_index(evtx_path, index_dir=None):
+    """
+    build_chunk_index 결과를 파일 크기 + mtime 기준으로 재사용함.
+    index_dir 를 주면 <index_dir>/chunk_index/ 에 JSON 으로도 저장함 (다음 실행에서 재사용).
+    """
+    path = os.path.abspath(evtx_path)
+    st = os.stat(path)
+    identity = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "version": CHUNK_INDEX_VERSION}
+
+    key = (path, st.st_size, st.st_mtime_ns)
+    if key in _memo:
+        return _memo[key]
+
+    cache_path = _cache_path(index_dir, path) if index_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("identity") == identity:
+                _memo[key] = data["chunks"]
+                return data["chunks"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    chunks = build_chunk_index(path)
+    if cache_path:
+        ensure_dir(os.path.dirname(cache_path))
+        tmp = cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "identity": identity, "chunks": chunks}, f)
+        os.replace(tmp, cache_path)
+    _memo[key] = chunks
+    return chunks
+
+
+def select_chunks(evtx_path, since=None, until=None, index_dir=None, slack=CHUNK_TIME_SLACK):
+    """
+    Indexes (file order) of the chunks that may hold records between since
+    and until (naive UTC datetimes; None = open). Chunks without a readable
+    time span are always kept.
+    """
+    chunks = load_chunk_index(evtx_path, index_dir)
+    lo = _filetime(since - slack) if since is not None else None
+    hi = _filetime(until + slack) if until is not None else None
+    keep = []
+    for i, (_, _, _, t_min, t_max) in enumerate(chunks):
+        if t_min is not None and ((lo is not None and t_max < lo) or (hi is not None and t_min > hi)):
+            continue
+        keep.append(i)
+    return keep
@@ -0,0 +1,209 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import sys
+import json
+import struct
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# 파싱 결과를 CSV(텍스트) 대신 column 단위 binary 로 저장/로드함.
+# 파일 구조: MAGIC | header 길이(uint64) | JSON header | column bytes ...
+# header 에 column 별 typecode / offset / 길이와 문자열 pool 이 들어있음.
+
+MAGIC = b"RDPCOL01"
+_LEN = struct.Struct("<Q")
+
+# DataFrame column 종류 -> array typecode
+_FRAME_KINDS = {"datetime": "q", "int": "q", "float": "d", "bool": "b", "str": "i", "json": "i"}
+
+
+def _header(arrays, strings, meta):
+    columns = []
+    offset = 0
+    for name, arr in arrays.items():
+        nbytes = len(arr) * arr.itemsize
+        columns.append({"name": name, "typecode": arr.typecode, "offset": offset, "nbytes": nbytes})
+        offset += nbytes
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "meta": meta or {},
+        "strings": strings or {},
+        "columns": columns,
+    }, ensure_ascii=False).encode("utf-8")
+    return MAGIC + _LEN.pack(len(header)) + header
+
+
+def _split(data, source="<bytes>"):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"not a columnar file: {source}")
+    start = len(MAGIC) + _LEN.size
+    (header_len,) = _LEN.unpack(data[len(MAGIC):start])
+    header = json.loads(bytes(data[start:start + header_len]).decode("utf-8"))
+    return header, start + header_len
+
+
+def write_columns(path, arrays, strings=None, meta=None):
+    """
+    arrays : {name: array.array}
+    strings: {name: [str, ...]}  (string pools, JSON 으로 header 에 저장)
+    meta   : JSON 으로 저장할 부가 정보
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_header(arrays, strings, meta))
+        for arr in arrays.values():
+            arr.tofile(f)
+    os.replace(tmp, path)
+    return path
+
+
+def pack_columns(arrays, strings=None, meta=None):
+    """
+    write_columns 와 같은 형식을 파일 대신 bytes 로 (process 간 전달용).
+    """
+    return _header(arrays, strings, meta) + b"".join(arr.tobytes() for arr in arrays.values())
+
+
+def unpack_columns(data, source="<bytes>"):
+    """
+    Returns (meta, arrays, strings) from pack_columns / file bytes.
+    """
+    header, data_start = _split(data, source)
+    view = memoryview(data)[data_start:]
+
+    swap = header["byteorder"] != sys.byteorder
+    arrays = {}
+    for col in header["columns"]:
+        arr = array(col["typecode"])
+        arr.frombytes(view[col["offset"]:col["offset"] + col["nbytes"]])
+        if swap:
+            arr.byteswap()
+        arrays[col["name"]] = arr
+    return header["meta"], arrays, header["strings"]
+
+
+def read_meta(path):
+    """
+    Header only (meta, strings, column layout) without reading column data.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"not a columnar file: {path}")
+        (header_len,) = _LEN.unpack(f.read(_LEN.size))
+        return json.loads(f.read(header_len).decode("utf-8"))
+
+
+def read_columns(path, names=None):
+    """
+    Returns (meta, arrays, strings) as written by write_columns.
+    names: 읽을 column 이름 -> 나머지 column 의 bytes 는 읽지 않음 (seek 로 건너뜀).
+    """
+    if names is None:
+        with open(path, "rb") as f:
+            return unpack_columns(f.read(), path)
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"not a columnar file: {path}")
+        (header_len,) = _LEN.unpack(f.read(_LEN.size))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+        data_start = len(MAGIC) + _LEN.size + header_len
+
+        swap = header["byteorder"] != sys.byteorder
+        wanted = set(names)
+        arrays = {}
+        for col in header["columns"]:
+            if col["name"] not in wanted:
+                continue
+            f.seek(data_start + col["offset"])
+            arr = array(col["typecode"])
+            arr.frombytes(f.read(col["nbytes"]))
+            if swap:
+                arr.byteswap()
+            arrays[col["name"]] = arr
+    strings = {k: v for k, v in header["strings"].items() if k in wanted}
+    return header["meta"], arrays, strings
+
+
+def _frame_kind(s):
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return "datetime"
+    if pd.api.types.is_bool_dtype(s):
+        return "bool"
+    if pd.api.types.is_integer_dtype(s):
+        return "int"
+    if pd.api.types.is_float_dtype(s):
+        return "float"
+    if all(v is None or isinstance(v, str) for v in s):
+        return "str"
+    return "json"
+
+
+def write_frame(path, df, meta=None):
+    """
+    DataFrame -> columnar file. datetime column 은 UTC ns(int64, NaT = int64 min),
+    문자열은 pool + code, 그 외 object(list/dict 등)는 JSON 문자열로 저장함.
+    """
+    arrays = {}
+    strings = {}
+    kinds = {}
+    for name in df.columns:
+        s = df[name]
+        kind = _frame_kind(s)
+        kinds[name] = kind
+        arr = array(_FRAME_KINDS[kind])
+
+        if kind == "datetime":
+            if s.dt.tz is not None:
+                s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+            arr.frombytes(s.values.astype("datetime64[ns]").view("int64").tobytes())
+        elif kind in ("int", "float", "bool"):
+            arr.frombytes(np.ascontiguousarray(s.values, dtype={"q": np.int64, "d": np.float64, "b": np.int8}[arr.typecode]).tobytes())
+        else:
+            pool, codes = [], {}
+            for v in s:
+                if v is None:
+                    arr.append(-1)
+                    continue
+                if kind == "json":
+                    v = json.dumps(v, ensure_ascii=False, default=str)
+                code = codes.get(v)
+                if code is None:
+                    code = codes[v] = len(pool)
+                    pool.append(v)
+                arr.append(code)
+            strings[name] = pool
+
+        arrays[name] = arr
+
+    return write_columns(path, arrays, strings, dict(meta or {}, kinds=kinds))
+
+
+def read_frame(path, columns=None):
+    """
+    columnar file (write_frame) -> (DataFrame, meta). datetime column 은 UTC tz-aware 로 복원.
+    columns 를 주면 그 column 만 읽음.
+    """
+    meta, arrays, strings = read_columns(path, columns)
+    kinds = meta.get("kinds", {})
+    data = {}
+    for name, arr in arrays.items():
+        kind = kinds.get(name)
+        if kind == "datetime":
+            data[name] = pd.to_datetime(np.frombuffer(arr, dtype=np.int64), unit="ns", utc=True)
+        elif kind == "bool":
+            data[name] = np.frombuffer(arr, dtype=np.int8).astype(bool)
+        elif kind in ("int", "float"):
+            data[name] = np.frombuffer(arr, dtype=np.int64 if kind == "int" else np.float64).copy()
+        else:
+            pool = strings.get(name, [])
+            if kind == "json":
+                pool = [json.loads(v) for v in pool]
+            data[name] = pd.Series([None if c < 0 else pool[c] for c in arr], dtype=object)
+    order = [c for c in columns if c in arrays] if columns is not None else list(arrays)
+    return pd.DataFrame(data, columns=order), meta
@@ -1,6 +1,23 @@
 # My Python version: 3.10.12
 # IDE: VS code
 
-SECURITY_EVENT_IDS = [4624, 4625, 4634, 4672]
-LSM_EVENT_IDS = [21, 22, 23, 24, 25]
-RCM_EVENT_IDS = [1149]
\ No newline at end of file
+SECURITY_EVENT_IDS = frozenset({4624, 4625, 4634, 4672})
+LSM_EVENT_IDS = frozenset({21, 22, 23, 24, 25})
+RCM_EVENT_IDS = frozenset({1149})
+
+# log type 별 유지할 EventID (None 이면 전부 유지)
+LOG_TYPE_EVENT_IDS = {
+    "Security": SECURITY_EVENT_IDS,
+    "LSM": LSM_EVENT_IDS,
+    "RCM": RCM_EVENT_IDS,
+    "RDPClient": None,
+}
+
+# 파일 이름(소문자)에 들어있는 문자열로 log type 을 판별함 (fleet mode 호스트 폴더 스캔용).
+# TerminalServices 로그 이름에는 "security" 가 없으므로 Security 는 마지막에 검사함.
+LOG_FILE_PATTERNS = (
+    ("LSM", "localsessionmanager"),
+    ("RCM", "remoteconnectionmanager"),
+    ("RDPClient", "rdpclient"),
+    ("Security", "security"),
+)
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import hashlib
 
+from .join import TimeIndex, user_norm
+
 
 def _make_session_id(prefix, username, ip, ts):
     """
@@ -14,6 +16,114 @@ def _make_session_id(prefix, username, ip, ts):
     return hashlib.md5(base.encode("utf-8")).hexdigest()[:12]
 
 
+def _pick_rcm_match(candidates, start_ts, username, ip, win_sec):
+    """
+    1149 후보(시간순) 중 user/ip 일치 + 시간 근접 점수가 가장 높은 것.
+    동점이면 먼저 나온(시간순) 후보 유지 -> 기존 stable sort 결과와 같음
+    """
+    user_key = user_norm(username)
+    best, best_score = None, None
+    for e in candidates:
+        s = 0
+        e_user = user_norm(e["username"])
+        if user_key and e_user and user_key == e_user:
+            s += 2
+        if ip and e["ip"] and ip == e["ip"]:
+            s += 2
+        s += max(0, 1 - abs((e["timestamp"] - start_ts).total_seconds()) / win_sec)
+        if best_score is None or s > best_score:
+            best, best_score = e, s
+    return best
+
+
+def _lsm_rows(lsm_list):
+    return [
+        {
+            "timestamp": x["timestamp"].isoformat() if x["timestamp"] else None,
+            "event_id": x["event_id"],
+            "session_id": x.get("session_id"),
+            "ip": x.get("ip")
+        }
+        for x in lsm_list
+    ]
+
+
+def _security_session_row(ev, end_ts, rcm_match, lsm_list, admin_priv):
+    """
+    Security 4624(LogonType=10) 하나 -> 세션 row (batch / streaming 공통)
+    """
+    start_ts = ev["timestamp"]
+
+    duration = None
+    if start_ts and end_ts:
+        duration = int((end_ts - start_ts).total_seconds())
+        if duration < 0:
+            duration = None
+
+    disconnect_count = sum(1 for x in lsm_list if x["event_id"] == 24)
+    reconnect_count = sum(1 for x in lsm_list if x["event_id"] == 25)
+
+    session_ids = [x["session_id"] for x in lsm_list if x.get("session_id")]
+    session_id = session_ids[0] if session_ids else None
+
+    return {
+        "session_start": start_ts.isoformat() if start_ts else None,
+        "session_end": end_ts.isoformat() if end_ts else None,
+        "duration_sec": duration,
+        "username": ev["username"],
+        "domain": ev["domain"],
+        "client_ip": ev["ip"],
+        "workstation": ev["workstation"],
+        "session_id": session_id,
+        "evidence_basis": "Security4624(LogonType=10)",
+        "logon_id": ev["logon_id"],
+        "admin_priv_4672": admin_priv,
+
+        "auth_event_time_1149": rcm_match["timestamp"].isoformat() if rcm_match and rcm_match["timestamp"] else None,
+        "auth_client_ip_1149": rcm_match["ip"] if rcm_match else None,
+        "auth_client_name_1149": rcm_match["client_name"] if rcm_match else None,
+
+        "disconnect_count": disconnect_count,
+        "reconnect_count": reconnect_count,
+        "lsm_events": _lsm_rows(lsm_list)
+    }
+
+
+def _fallback_session_row(s, end_guess, lsm_list):
+    """
+    RCM 1149 묶음(fallback) 하나 -> 세션 row (batch / streaming 공통)
+    """
+    start_ts = s["session_start_ts"]
+
+    disconnect_count = sum(1 for x in lsm_list if x["event_id"] == 24)
+    reconnect_count = sum(1 for x in lsm_list if x["event_id"] == 25)
+
+    return {
+        "session_start": start_ts.isoformat(),
+        "session_end": end_guess.isoformat() if end_guess else None,
+        "duration_sec": int((end_guess - start_ts).total_seconds()) if end_guess else None,
+
+        "username": s["username"],
+        "domain": None,
+        "client_ip": s["client_ip"],
+        "workstation": None,
+        "session_id": s["session_id"],
+        "evidence_basis": "RCM1149(Fallback: Security4624Type10 not found)",
+        "logon_id": None,
+        "admin_priv_4672": False,
+
+        "auth_event_time_1149": s["auth_events"][0]["timestamp"].isoformat(),
+        "auth_client_ip_1149": s["client_ip"],
+        "auth_client_name_1149": s["auth_events"][0].get("client_name"),
+
+        "disconnect_count": disconnect_count,
+        "reconnect_count": reconnect_count,
+        "lsm_events": _lsm_rows(lsm_list),
+
+        "auth_events_count": len(s["auth_events"]),
+    }
+
+
 def correlate_sessions(security_events, rcm_events, lsm_events, time_window_minutes=5):
     """
     1) 우선순위 1: Security 4624(LogonType=10) 기반 세션 생성
@@ -39,48 +149,51 @@ def correlate_sessions(security_events, rcm_events, lsm_events, time_window_minu
     rcm_sorted = sorted([e for e in rcm_events if e["event_id"] == 1149], key=lambda x: x["timestamp"] or datetime.min)
     lsm_sorted = sorted(lsm_events, key=lambda x: x["timestamp"] or datetime.min)
 
+    # 정렬된 timestamp 에 bisect 로 window 를 잡고, user/ip 별 partition 으로 후보를 줄임
+    rcm_index = TimeIndex(rcm_sorted)
+    rcm_index.add_partition("user", lambda e: user_norm(e["username"]))
+    rcm_index.add_partition("ip", lambda e: e["ip"] or None)
+
+    lsm_index = TimeIndex(lsm_sorted)
+    lsm_index.add_partition("user", lambda e: user_norm(e.get("username")))
+    lsm_index.add_partition("no_user", lambda e: None if e.get("username") else True)
+
+    win = timedelta(minutes=time_window_minutes)
+    win_sec = win.total_seconds()
+
     def find_best_rcm_match(start_ts, username, ip):
         if not start_ts:
             return None
-        win = timedelta(minutes=time_window_minutes)
-        candidates = []
-        for e in rcm_sorted:
-            if not e["timestamp"]:
-                continue
-            if abs(e["timestamp"] - start_ts) <= win:
-                candidates.append(e)
-
-        if not candidates:
-            return None
+        lo, hi = start_ts - win, start_ts + win
+        user_key = user_norm(username)
 
-        def score(e):
-            s = 0
-            if username and e["username"] and str(username).lower() == str(e["username"]).lower():
-                s += 2
-            if ip and e["ip"] and ip == e["ip"]:
-                s += 2
-            s += max(0, 1 - abs((e["timestamp"] - start_ts).total_seconds()) / win.total_seconds())
-            return s
+        # user 또는 ip 가 일치하는 후보는 점수가 2 이상이라, 하나라도 있으면 그 안에서만 고르면 됨
+        positions = set()
+        if user_key:
+            positions.update(rcm_index.window_in("user", user_key, lo, hi))
+        if ip:
+            positions.update(rcm_index.window_in("ip", ip, lo, hi))
+        candidates = sorted(positions) if positions else rcm_index.window(lo, hi)
 
-        candidates.sort(key=score, reverse=True)
-        return candidates[0]
+        return _pick_rcm_match((rcm_index.events[pos] for pos in candidates), start_ts, username, ip, win_sec)
 
     def collect_lsm_for_window(tmin, tmax, username=None, ip=None):
-        out = []
-        for e in lsm_sorted:
-            if not e["timestamp"]:
-                continue
-            if e["timestamp"] < tmin or e["timestamp"] > tmax:
-                continue
-
-            if username and e.get("username"):
-                if str(username).lower() != str(e["username"]).lower():
-                    continue
+        user_key = user_norm(username)
+        if user_key:
+            # username 이 없는 LSM 이벤트는 모든 사용자 window 에 포함됨 (기존 규칙)
+            positions = sorted(
+                lsm_index.window_in("user", user_key, tmin, tmax) +
+                lsm_index.window_in("no_user", True, tmin, tmax)
+            )
+        else:
+            positions = lsm_index.window(tmin, tmax)
 
+        out = []
+        for pos in positions:
+            e = lsm_index.events[pos]
             if ip and e.get("ip"):
                 if ip != e["ip"]:
                     continue
-
             out.append(e)
         return out
 
@@ -96,19 +209,11 @@ def correlate_sessions(security_events, rcm_events, lsm_events, time_window_minu
 
         start_ts = ev["timestamp"]
         username = ev["username"]
-        domain = ev["domain"]
         ip = ev["ip"]
-        workstation = ev["workstation"]
         logon_id = ev["logon_id"]
 
         end_ts = logoff_by_logonid.get(logon_id)
 
-        duration = None
-        if start_ts and end_ts:
-            duration = int((end_ts - start_ts).total_seconds())
-            if duration < 0:
-                duration = None
-
         rcm_match = find_best_rcm_match(start_ts, username, ip)
 
         # LSM attach
@@ -121,41 +226,7 @@ def correlate_sessions(security_events, rcm_events, lsm_events, time_window_minu
 
         lsm_list = collect_lsm_for_window(tmin, tmax, username=username)
 
-        disconnect_count = sum(1 for x in lsm_list if x["event_id"] == 24)
-        reconnect_count = sum(1 for x in lsm_list if x["event_id"] == 25)
-
-        session_ids = [x["session_id"] for x in lsm_list if x.get("session_id")]
-        session_id = session_ids[0] if session_ids else None
-
-        sessions.append({
-            "session_start": start_ts.isoformat() if start_ts else None,
-            "session_end": end_ts.isoformat() if end_ts else None,
-            "duration_sec": duration,
-            "username": username,
-            "domain": domain,
-            "client_ip": ip,
-            "workstation": workstation,
-            "session_id": session_id,
-            "evidence_basis": "Security4624(LogonType=10)",
-            "logon_id": logon_id,
-            "admin_priv_4672": logon_id in adminpriv_by_logonid,
-
-            "auth_event_time_1149": rcm_match["timestamp"].isoformat() if rcm_match and rcm_match["timestamp"] else None,
-            "auth_client_ip_1149": rcm_match["ip"] if rcm_match else None,
-            "auth_client_name_1149": rcm_match["client_name"] if rcm_match else None,
-
-            "disconnect_count": disconnect_count,
-            "reconnect_count": reconnect_count,
-            "lsm_events": [
-                {
-                    "timestamp": x["timestamp"].isoformat() if x["timestamp"] else None,
-                    "event_id": x["event_id"],
-                    "session_id": x.get("session_id"),
-                    "ip": x.get("ip")
-                }
-                for x in lsm_list
-            ]
-        })
+        sessions.append(_security_session_row(ev, end_ts, rcm_match, lsm_list, logon_id in adminpriv_by_logonid))
 
     # 만약 Security 기반 세션이 있으면 그대로 반환
     sessions.sort(key=lambda x: x["session_start"] or "")
@@ -245,41 +316,7 @@ def correlate_sessions(security_events, rcm_events, lsm_events, time_window_minu
             username=s["username"]  
         )
 
-        disconnect_count = sum(1 for x in lsm_list if x["event_id"] == 24)
-        reconnect_count = sum(1 for x in lsm_list if x["event_id"] == 25)
-
-        fallback_row = {
-            "session_start": start_ts.isoformat(),
-            "session_end": end_guess.isoformat() if end_guess else None,
-            "duration_sec": int((end_guess - start_ts).total_seconds()) if end_guess else None,
-
-            "username": s["username"],
-            "domain": None,
-            "client_ip": s["client_ip"],
-            "workstation": None,
-            "session_id": s["session_id"],
-            "evidence_basis": "RCM1149(Fallback: Security4624Type10 not found)",
-            "logon_id": None,
-            "admin_priv_4672": False,
-
-            "auth_event_time_1149": s["auth_events"][0]["timestamp"].isoformat(),
-            "auth_client_ip_1149": s["client_ip"],
-            "auth_client_name_1149": s["auth_events"][0].get("client_name"),
-
-            "disconnect_count": disconnect_count,
-            "reconnect_count": reconnect_count,
-            "lsm_events": [
-                {
-                    "timestamp": x["timestamp"].isoformat() if x["timestamp"] else None,
-                    "event_id": x["event_id"],
-                    "session_id": x.get("session_id"),
-                    "ip": x.get("ip")
-                }
-                for x in lsm_list
-            ],
-
-            "auth_events_count": len(s["auth_events"]),
-        }
+        fallback_row = _fallback_session_row(s, end_guess, lsm_list)
 
         sessions.append(fallback_row)
 
@@ -0,0 +1,190 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import shutil
+
+import pandas as pd
+
+from .columnar import write_frame, read_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# 결과 표를 CSV 외에 column 단위 파일로도 저장함 (day / source 로 나눈 hive 스타일 폴더).
+#   <root>/day=2025-12-02/source=RCM/part-0.parquet
+#   <root>/_dataset.json  : format, partition column, part 목록(행 수)
+# 읽을 때는 _dataset.json 만 보고 필요 없는 day/source 폴더는 열지 않고(partition pruning),
+# 파일 안에서도 요청한 column 만 읽음(column pruning).
+# pyarrow 가 있으면 Parquet(기본) / Arrow IPC, 없으면 columnar.py 형식(.col)으로 씀.
+
+DATASET_META_NAME = "_dataset.json"
+DATASET_FORMATS = ("parquet", "arrow", "col")
+NULL_PARTITION = "__null__"
+
+_EXT = {"parquet": ".parquet", "arrow": ".arrow", "col": ".col"}
+
+# 반복되는 문자열 column -> dictionary encoding
+DICT_COLUMNS = ("source", "username", "domain", "ip", "client_ip", "user", "src_ip", "evidence_basis")
+
+
+def default_format():
+    return "parquet" if pa is not None else "col"
+
+
+def resolve_format(fmt):
+    """
+    "auto" -> parquet (pyarrow) / col. parquet/arrow 를 요청했는데 pyarrow 가 없으면 col 로 대체.
+    """
+    if fmt in (None, "auto"):
+        return default_format()
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"unknown dataset format: {fmt}")
+    if fmt != "col" and pa is None:
+        print(f"[!] pyarrow is not installed; writing the {fmt} dataset as .col files")
+        return "col"
+    return fmt
+
+
+def _day_values(ts):
+    ts = pd.to_datetime(ts, utc=True)
+    return ts.dt.strftime("%Y-%m-%d").fillna(NULL_PARTITION)
+
+
+def _write_part(path, df, fmt):
+    if fmt == "col":
+        write_frame(path, df)
+        return
+
+    df = df.copy()
+    for name in df.columns:
+        # list/dict 값(lsm_events 등)은 .col 과 같이 JSON 문자열로
+        if df[name].dtype == object and df[name].map(lambda v: isinstance(v, (list, dict))).any():
+            df[name] = df[name].map(lambda v: v if v is None else json.dumps(v, ensure_ascii=False, default=str))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for name in DICT_COLUMNS:
+        idx = table.schema.get_field_index(name)
+        if idx >= 0 and pa.types.is_string(table.schema.field(idx).type):
+            table = table.set_column(idx, name, pc.dictionary_encode(table.column(idx)))
+    if fmt == "parquet":
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def write_dataset(root, df, time_column="timestamp", partition_by=("day", "source"), fmt="auto"):
+    """
+    df 를 partition 별 파일로 씀. "day" 는 time_column 의 UTC 날짜, 그 외는 df 의 column 값.
+    기존 root 는 통째로 교체됨. Returns root.
+    """
+    fmt = resolve_format(fmt)
+    df = df.reset_index(drop=True)
+    tmp = root.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    keys = {}
+    for name in partition_by:
+        if name == "day":
+            keys[name] = _day_values(df[time_column]) if len(df) else pd.Series([], dtype=object)
+        else:
+            keys[name] = df[name].astype(object).where(df[name].notna(), NULL_PARTITION).astype(str)
+
+    parts = []
+    if len(df):
+        key_frame = pd.DataFrame(keys, index=df.index)
+        for values, idx in key_frame.groupby(list(partition_by), sort=True).groups.items():
+            values = values if isinstance(values, tuple) else (values,)
+            part = dict(zip(partition_by, values))
+            rel = os.path.join(*[f"{k}={v}" for k, v in part.items()], "part-0" + _EXT[fmt])
+            os.makedirs(os.path.join(tmp, os.path.dirname(rel)), exist_ok=True)
+            chunk = df.loc[idx].reset_index(drop=True)
+            _write_part(os.path.join(tmp, rel), chunk, fmt)
+            parts.append({"path": rel.replace(os.sep, "/"), "rows": int(len(chunk)), "partition": part})
+
+    with open(os.path.join(tmp, DATASET_META_NAME), "w", encoding="utf-8") as f:
+        json.dump({
+            "format": fmt,
+            "time_column": time_column,
+            "partition_by": list(partition_by),
+            "columns": [str(c) for c in df.columns],
+            "rows": int(len(df)),
+            "parts": parts,
+        }, f, indent=2, ensure_ascii=False)
+
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp, root)
+    return root
+
+
+def read_dataset_meta(root):
+    with open(os.path.join(root, DATASET_META_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _keep_part(partition, where):
+    for name, cond in (where or {}).items():
+        value = partition.get(name)
+        if value is None or cond is None:
+            continue
+        if isinstance(cond, tuple):
+            lo, hi = cond
+            if value == NULL_PARTITION:
+                return False
+            if (lo is not None and value < lo) or (hi is not None and value > hi):
+                return False
+        elif value not in cond:
+            return False
+    return True
+
+
+def _read_part(path, fmt, columns):
+    if fmt == "col":
+        df, _ = read_frame(path, columns)
+        return df
+
+    if fmt == "parquet":
+        table = pq.read_table(path, columns=columns)
+    else:
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+    df = table.to_pandas()
+    for name in df.columns:
+        # dictionary column 은 Categorical 로 나옴 -> CSV / .col 경로와 같은 object(None) 로
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            s = df[name].astype(object)
+            df[name] = s.where(s.notna(), None)
+    return df
+
+
+def read_dataset(root, columns=None, where=None):
+    """
+    Read a dataset written by write_dataset.
+
+    columns: 읽을 column 목록 (None = 전부)
+    where  : {partition: set(values) | (lo, hi)} e.g. {"day": ("2025-12-01", "2025-12-03"), "source": {"RCM"}}
+    Returns a DataFrame (parts concatenated in partition order) with the
+    dataset's column order; datetime columns are UTC tz-aware.
+    """
+    meta = read_dataset_meta(root)
+    if columns is not None:
+        columns = [c for c in meta["columns"] if c in set(columns)]
+    else:
+        columns = meta["columns"]
+
+    frames = [
+        _read_part(os.path.join(root, part["path"]), meta["format"], columns)
+        for part in meta["parts"] if _keep_part(part["partition"], where)
+    ]
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
@@ -0,0 +1,205 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import struct
+from bisect import bisect_right
+from contextlib import ExitStack
+
+from Evtx.Evtx import Evtx
+from lxml import etree
+
+from .chunk_index import load_chunk_index, CHUNK_HEADER_SIZE
+from .event_store import EventStore
+from .merge import merge_stores
+
+# 같은 로그의 live 파일 + Archive-*.evtx + 수동 export 를 같이 넣어도 record 를 한 번만 세도록 함.
+#   1) 파싱 전 (plan_overlaps): 앞에서 받은 파일이 이미 덮는 chunk 는 디코딩하지 않음.
+#      chunk index 의 EventRecordID 범위로 후보를 찾고, chunk 의 첫 / 마지막 record 의
+#      (번호, 기록 시각)이 앞 파일의 같은 번호 record 와 같은지 record header 만 읽어서 확인함.
+#      chunk 가 전부 덮이는 파일은 통째로 건너뜀.
+#   2) 파싱 후 (dedup_stores): chunk 경계가 어긋나 일부만 겹친 record 는
+#      (computer, EventRecordID, timestamp) 가 같으면 처음 것만 남김 (파일별 흐름을 시간순 k-way merge 하면서 비교).
+# 파일은 log type 별로 따로 처리하므로 channel 은 파일 단위 origin(channel, computer)으로 비교함.
+
+_RECORD_HEAD = struct.Struct("<IIQQ")    # magic, size, record_num, FILETIME
+_RECORD_MAGIC = 0x00002a2a
+_NS = {"e": "http://schemas.microsoft.com/win/2004/08/events/event"}
+
+
+def file_origin(evtx_path):
+    """
+    (Channel, Computer) of the first record; (None, path) if it cannot be read,
+    so such a file never matches another one.
+    """
+    try:
+        with Evtx(evtx_path) as log:
+            for chunk in log.chunks():
+                for record in chunk.records():
+                    sys_node = etree.fromstring(record.xml().encode("utf-8")).find("e:System", _NS)
+                    channel = sys_node.findtext("e:Channel", namespaces=_NS)
+                    computer = sys_node.findtext("e:Computer", namespaces=_NS)
+                    return channel, (computer or "").lower()
+    except Exception:
+        pass
+    return None, os.path.abspath(evtx_path)
+
+
+def _edge_records(buf, chunk_offset):
+    """
+    ((num, FILETIME) of the first record, (num, FILETIME) of the last record) of a chunk, or None.
+    """
+    (last_ofs,) = struct.unpack_from("<I", buf, chunk_offset + 0x2C)
+    edges = []
+    for ofs in (chunk_offset + CHUNK_HEADER_SIZE, chunk_offset + last_ofs):
+        if ofs + _RECORD_HEAD.size > len(buf):
+            return None
+        magic, _, num, filetime = _RECORD_HEAD.unpack_from(buf, ofs)
+        if magic != _RECORD_MAGIC:
+            return None
+        edges.append((num, filetime))
+    return tuple(edges)
+
+
+def _chunk_records(buf, chunk_offset):
+    """
+    {record num: FILETIME} of one chunk, from the record headers only.
+    """
+    out = {}
+    (next_ofs,) = struct.unpack_from("<I", buf, chunk_offset + 0x30)
+    pos, end = chunk_offset + CHUNK_HEADER_SIZE, chunk_offset + min(next_ofs, 0x10000)
+    while pos + _RECORD_HEAD.size <= end:
+        magic, size, num, filetime = _RECORD_HEAD.unpack_from(buf, pos)
+        if magic != _RECORD_MAGIC or size < _RECORD_HEAD.size:
+            break
+        out[num] = filetime
+        pos += size
+    return out
+
+
+class _Coverage:
+    """
+    EventRecordID 범위 -> (파일, chunk) 목록. 같은 origin 의 앞 파일들이 파싱하는 chunk 만 들어감.
+    """
+
+    def __init__(self):
+        self.chunks = []        # (first, last, file key, chunk offset), first 순 정렬
+        self.firsts = []
+        self._records = {}
+
+    def add(self, first, last, key, offset):
+        i = bisect_right(self.firsts, first)
+        self.firsts.insert(i, first)
+        self.chunks.insert(i, (first, last, key, offset))
+
+    def _find(self, bufs, num):
+        """
+        (chunk position, FILETIME) of record num, or (None, None).
+        """
+        i = bisect_right(self.firsts, num)
+        while i > 0:
+            i -= 1
+            first, last, key, offset = self.chunks[i]
+            if first <= num <= last:
+                cached = self._records.get((key, offset))
+                if cached is None:
+                    cached = self._records[(key, offset)] = _chunk_records(bufs[key], offset)
+                if num in cached:
+                    return i, cached[num]
+            if first + 0x10000 < num:
+                # chunk 하나(64 KiB)에 그보다 많은 record 는 없으므로 더 앞은 볼 필요 없음
+                break
+        return None, None
+
+    def covers(self, bufs, edges):
+        """
+        True if the first and last record of a chunk exist here with the same
+        FILETIME and every record number between them is covered.
+        """
+        (first, first_time), (last, last_time) = edges
+        i, t = self._find(bufs, first)
+        if i is None or t != first_time or self._find(bufs, last)[1] != last_time:
+            return False
+        reach = self.chunks[i][1]
+        j = i + 1
+        while reach < last and j < len(self.chunks) and self.chunks[j][0] <= reach + 1:
+            reach = max(reach, self.chunks[j][1])
+            j += 1
+        return reach >= last
+
+
+def plan_overlaps(paths, index_dir=None):
+    """
+    paths: files of one log type, in priority order (먼저 온 파일의 record 를 남김).
+    Returns [(path, origin, skip_chunks)] for the files that still need
+    parsing; skip_chunks is a frozenset of chunk numbers (file order) already
+    covered by an earlier file. Files that are covered completely are left out.
+    """
+    coverage = {}
+    bufs = {}
+    plans = []
+    with ExitStack() as stack:
+        for path in paths:
+            origin = file_origin(path)
+            cov = coverage.setdefault(origin, _Coverage())
+            log = stack.enter_context(Evtx(path))
+            key = os.path.abspath(path)
+            bufs[key] = buf = log._buf
+
+            skip, parsed = set(), []
+            chunks = load_chunk_index(path, index_dir)
+            for i, (offset, first, last, _, _) in enumerate(chunks):
+                if first is None:
+                    continue
+                edges = _edge_records(buf, offset) if cov.chunks else None
+                if edges is not None and cov.covers(bufs, edges):
+                    skip.add(i)
+                else:
+                    parsed.append((first, last, key, offset))
+            for entry in parsed:
+                cov.add(*entry)
+
+            non_empty = sum(1 for c in chunks if c[1] is not None)
+            if non_empty and len(skip) == non_empty:
+                print(f"[*] {os.path.basename(path)}: all records already in an earlier input; skipped")
+                continue
+            if skip:
+                print(f"[*] {os.path.basename(path)}: {len(skip)}/{non_empty} chunks already in an earlier input")
+            plans.append((path, origin, frozenset(skip)))
+    return plans
+
+
+def dedup_stores(stores, origins):
+    """
+    stores: EventStores of one log type (one per file); origins: {file_id: origin}.
+    Merges them in time order (k-way merge of the per-file streams, ties keep
+    the file order) and drops rows whose (origin, EventRecordID, timestamp)
+    was already seen (first occurrence wins).
+    Returns (EventStore, dropped rows).
+    """
+    merged = EventStore(stores[0].log_type)
+    remaps = [merged.code_map(store) for store in stores]
+
+    # 남길 row 를 merge 순서대로 바로 merged 에 옮김 (같은 store 의 연속 row 는 한 구간으로)
+    run, dropped = None, 0          # run: [store 위치, start, stop]
+    run_key, seen = None, set()
+    # 같은 record 는 timestamp 가 같으므로 같은 시각의 row 들 안에서만 비교하면 됨
+    for key, i, row, _ in merge_stores(stores):
+        if key != run_key:
+            run_key, seen = key, set()
+        num = stores[i].record_num[row]
+        if num >= 0:        # record 번호가 없는 row 는 비교하지 않음
+            ident = (origins.get(stores[i].file_id[row]), num)
+            if ident in seen:
+                dropped += 1
+                continue
+            seen.add(ident)
+        if run is not None and run[0] == i and run[2] == row:
+            run[2] += 1
+            continue
+        if run is not None:
+            merged.extend_rows(stores[run[0]], run[1], run[2], remaps[run[0]])
+        run = [i, row, row + 1]
+    if run is not None:
+        merged.extend_rows(stores[run[0]], run[1], run[2], remaps[run[0]])
+    return merged, dropped
@@ -0,0 +1,233 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .filters import user_key
+from .event_store import us_to_dt
+
+# 4625(LogonType=10) 실패를 시간 window 로 세서 brute-force / password spray 구간을 찾음.
+#   burst_ip  : 한 IP 에서 window 안에 실패 N 건 이상
+#   burst_user: 한 사용자에 대해 (IP 무관) window 안에 실패 N 건 이상
+#   spray     : 한 IP 에서 window 안에 서로 다른 사용자 N 명 이상
+# key 별로 window 안의 timestamp 만 deque 로 들고 있으므로 이벤트당 O(1), 메모리는 window 크기만큼.
+
+ALERT_COLUMNS = ["rule", "client_ip", "username", "start", "end", "failures", "distinct",
+                 "peak_in_window", "window_sec", "threshold"]
+
+_US = 1_000_000
+
+
+class _Alert:
+    __slots__ = ("start", "end", "failures", "others", "peak", "tail")
+
+    def __init__(self, start, failures, others, peak):
+        self.start = start
+        self.end = start
+        self.failures = failures
+        self.others = others
+        self.peak = peak
+        self.tail = []      # end 이후 threshold 아래에서 들어온 상대 값 (다시 넘으면 포함)
+
+
+class _Key:
+    """
+    window 상태 하나: 최근 timestamp(us) 와 같이 들어온 상대 값(사용자 또는 IP) + 열린 alert.
+    """
+    __slots__ = ("times", "others", "counts", "alert")
+
+    def __init__(self, distinct):
+        self.times = deque()
+        self.others = deque()
+        self.counts = {} if distinct else None   # spray: window 안 사용자별 건수
+        self.alert = None
+
+
+class _Rule:
+    def __init__(self, name, window_sec, threshold, distinct=False):
+        self.name = name
+        self.window_sec = window_sec
+        self.window_us = int(window_sec * _US)
+        self.threshold = threshold
+        self.distinct = distinct
+        self.keys = {}
+
+    def feed(self, key, ts, other, out):
+        state = self.keys.get(key)
+        if state is None:
+            state = self.keys[key] = _Key(self.distinct)
+
+        times, others, counts = state.times, state.others, state.counts
+        lo = ts - self.window_us
+        while times and times[0] < lo:
+            times.popleft()
+            old = others.popleft()
+            if counts is not None:
+                n = counts[old] - 1
+                if n:
+                    counts[old] = n
+                else:
+                    del counts[old]
+        times.append(ts)
+        others.append(other)
+        if counts is not None:
+            counts[other] = counts.get(other, 0) + 1
+
+        value = len(counts) if counts is not None else len(times)
+        alert = state.alert
+        if alert is not None and ts - alert.end > self.window_us:
+            out.append(self._record(key, alert))
+            alert = state.alert = None
+        if value >= self.threshold:
+            if alert is None:
+                alert = state.alert = _Alert(times[0], len(times), {o for o in others if o is not None}, value)
+            else:
+                alert.tail.append(other)
+                alert.failures += len(alert.tail)
+                alert.others.update(o for o in alert.tail if o is not None)
+                alert.tail = []
+                if value > alert.peak:
+                    alert.peak = value
+            alert.end = ts
+        elif alert is not None:
+            alert.tail.append(other)
+
+    def expire(self, now, out):
+        """
+        now - window 이후로 이벤트가 없는 key 는 alert 를 닫고 버림 (메모리 유지).
+        """
+        lo = now - self.window_us
+        for key in [k for k, s in self.keys.items() if s.times[-1] < lo]:
+            state = self.keys.pop(key)
+            if state.alert is not None:
+                out.append(self._record(key, state.alert))
+
+    def flush(self, out):
+        for key, state in self.keys.items():
+            if state.alert is not None:
+                out.append(self._record(key, state.alert))
+        self.keys.clear()
+
+    def _record(self, key, alert):
+        ip, user = (key, None) if self.name != "burst_user" else (None, key)
+        return {
+            "rule": self.name,
+            "client_ip": ip,
+            "username": user,
+            "start": alert.start,
+            "end": alert.end,
+            "failures": alert.failures,
+            "distinct": len(alert.others),
+            "peak_in_window": alert.peak,
+            "window_sec": self.window_sec,
+            "threshold": self.threshold,
+        }
+
+
+class FailureDetector:
+    """
+    Sliding-window detector over 4625 failures.
+
+        det = FailureDetector(burst_window_minutes=10, burst_threshold=20)
+        for ts_us, user, ip in failures:        # time order
+            alerts.extend(det.feed(ts_us, user, ip))
+        alerts.extend(det.flush())
+
+    An alert opens when the window reaches the threshold (start = oldest
+    event in that window); end is the last event at which the condition
+    held. It is reported once a whole window has passed after end without
+    the condition holding again (so one attack does not split into
+    overlapping alerts), or at flush(). "failures" counts the events from
+    start to end, "distinct" the users (burst_ip / spray) or IPs
+    (burst_user) seen in them.
+    Timestamps are int microseconds (EventStore.ts); users should already
+    be normalized (filters.user_key).
+    """
+
+    def __init__(self, burst_window_minutes=10, burst_threshold=20, user_threshold=20,
+                 spray_window_minutes=60, spray_users=5):
+        burst_sec = burst_window_minutes * 60
+        spray_sec = spray_window_minutes * 60
+        self.rules = [
+            _Rule("burst_ip", burst_sec, burst_threshold),
+            _Rule("burst_user", burst_sec, user_threshold),
+            _Rule("spray", spray_sec, spray_users, distinct=True),
+        ]
+        self._sweep_us = int(max(burst_sec, spray_sec) * _US)
+        self._next_sweep = None
+
+    def feed(self, ts, user, ip):
+        """
+        One failure. Returns the alerts that closed (list of dicts, times in us).
+        """
+        out = []
+        burst_ip, burst_user, spray = self.rules
+        if ip is not None:
+            burst_ip.feed(ip, ts, user, out)
+            if user is not None:
+                spray.feed(ip, ts, user, out)
+        if user is not None:
+            burst_user.feed(user, ts, ip, out)
+
+        if self._next_sweep is None:
+            self._next_sweep = ts + self._sweep_us
+        elif ts >= self._next_sweep:
+            for rule in self.rules:
+                rule.expire(ts, out)
+            self._next_sweep = ts + self._sweep_us
+        return out
+
+    def flush(self):
+        out = []
+        for rule in self.rules:
+            rule.flush(out)
+        return out
+
+
+def _failure_columns(security_events):
+    """
+    EventStore -> 시간순 (ts_us, user code, ip code) numpy 배열 + code 별 정규화 사용자 / IP.
+    4625 + LogonType 10 필터와 정렬은 column 단위로 처리함.
+    """
+    n = len(security_events)
+    ts = np.frombuffer(security_events.ts, dtype=np.int64, count=n)
+    mask = np.frombuffer(security_events.event_id, dtype=np.int32, count=n) == 4625
+
+    values = security_events.strings.values
+    lt_codes = np.frombuffer(security_events.codes["logon_type"], dtype=np.int32, count=n)
+    type10 = [i for i, v in enumerate(values) if str(v).strip() == "10"]
+    mask &= np.isin(lt_codes, type10)
+
+    idx = np.flatnonzero(mask)
+    idx = idx[np.argsort(ts[idx], kind="stable")]
+    users = np.frombuffer(security_events.codes["username"], dtype=np.int32, count=n)[idx]
+    ips = np.frombuffer(security_events.codes["ip"], dtype=np.int32, count=n)[idx]
+
+    # code -> 정규화 값 (NULL_CODE = -1 은 마지막 원소 None)
+    user_values = [user_key(v) for v in values] + [None]
+    ip_values = list(values) + [None]
+    return ts[idx], users, ips, user_values, ip_values
+
+
+def detect_failure_alerts(security_events, **rules):
+    """
+    Run FailureDetector over the 4625(LogonType=10) events of a Security
+    EventStore. rules: FailureDetector arguments.
+    Returns a DataFrame (ALERT_COLUMNS) sorted by start, times as naive UTC datetimes.
+    """
+    ts, users, ips, user_values, ip_values = _failure_columns(security_events)
+    det = FailureDetector(**rules)
+    alerts = []
+    for t, u, i in zip(ts.tolist(), users.tolist(), ips.tolist()):
+        alerts.extend(det.feed(t, user_values[u], ip_values[i]))
+    alerts.extend(det.flush())
+
+    df = pd.DataFrame(alerts, columns=ALERT_COLUMNS)
+    if df.empty:
+        return df
+    df["start"] = df["start"].map(us_to_dt)
+    df["end"] = df["end"].map(us_to_dt)
+    return df.sort_values(["start", "rule"], kind="stable").reset_index(drop=True)
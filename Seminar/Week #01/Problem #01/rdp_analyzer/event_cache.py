@@ -0,0 +1,143 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import hashlib
+from array import array
+
+from Evtx.Evtx import Evtx
+
+from .parsers import PARSER_VERSION
+from .event_store import EventStore
+from .columnar import read_meta
+from .utils import ensure_dir
+
+# 파싱한 EventStore 를 입력 파일 단위로 디스크에 저장해 두고, 같은 파일이면 EVTX 디코딩을 건너뜀.
+# key = 파일 정체성(크기, mtime, 내용 hash) + PARSER_VERSION + log type + 필터 조건
+
+CACHE_MANIFEST_NAME = "events_cache.json"
+CHUNK_HEADER_SIZE = 0x200
+FILE_HEADER_SIZE = 0x1000
+
+
+def content_hash(evtx_path):
+    """
+    blake2b over the file header and every chunk header. Chunk headers carry
+    the record number range and the CRC32 of the record data, so this changes
+    whenever records change, without reading the records themselves.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with Evtx(evtx_path) as log:
+        header = log.get_file_header()
+        h.update(log._buf[:FILE_HEADER_SIZE])
+        for chunk in header.chunks():
+            ofs = chunk.offset()
+            h.update(log._buf[ofs:ofs + CHUNK_HEADER_SIZE])
+    return h.hexdigest()
+
+
+def file_identity(evtx_path):
+    st = os.stat(evtx_path)
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "hash": content_hash(evtx_path),
+    }
+
+
+def cache_key(identity, log_type, params):
+    key = {"identity": identity, "parser_version": PARSER_VERSION, "log_type": log_type, "params": params}
+    return hashlib.blake2b(json.dumps(key, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest(), key
+
+
+def cache_entry(cache_dir, evtx_path, log_type, params):
+    """
+    Returns (entry path, key) for one input file.
+    """
+    ensure_dir(cache_dir)
+    digest, key = cache_key(file_identity(evtx_path), log_type, params)
+    return os.path.join(cache_dir, f"{log_type}-{digest}.col"), key
+
+
+def load_entry(path, key, file_id=None):
+    """
+    Cached EventStore or None on a miss. file_id of the cached rows is replaced
+    by the caller's file_id (ids are per-run FileRegistry numbers).
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        if read_meta(path)["meta"].get("key") != key:
+            return None
+        store = EventStore.load(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    print(f"[*] {store.log_type}: loaded {len(store)} events from cache")
+    if file_id is not None:
+        store.file_id = array("i", [file_id]) * len(store)
+    return store
+
+
+def save_entry(path, key, store, evtx_path):
+    store.save(path, {"key": key, "source_path": os.path.abspath(evtx_path)})
+    print(f"[*] {store.log_type}: cached {len(store)} events -> {path}")
+    return path
+
+
+def load_or_parse(cache_dir, evtx_path, log_type, params, parse, file_id=None):
+    """
+    Return (EventStore, cache entry path). parse() is only called on a cache miss;
+    its result is written to cache_dir.
+    """
+    path, key = cache_entry(cache_dir, evtx_path, log_type, params)
+    store = load_entry(path, key, file_id)
+    if store is None:
+        store = parse()
+        save_entry(path, key, store, evtx_path)
+    return store, path
+
+
+def save_merged(cache_dir, log_type, entries, store):
+    """
+    같은 log type 의 파일 여러 개(dedup 후 합친 store)를 entry 하나로 저장함 (manifest 는 log type 당 하나).
+    entries: 파일별 cache entry 경로 (순서 포함) -> 이 조합이 같으면 다시 쓰지 않음.
+    """
+    key = {"merged": [os.path.basename(p) for p in entries]}
+    digest = hashlib.blake2b(json.dumps(key).encode("utf-8"), digest_size=16).hexdigest()
+    path = os.path.join(cache_dir, f"{log_type}-merged-{digest}.col")
+    try:
+        if read_meta(path)["meta"].get("key") == key:
+            return path
+    except (OSError, ValueError, KeyError):
+        pass
+    store.save(path, {"key": key})
+    return path
+
+
+def write_manifest(out_dir, entries):
+    """
+    entries: {log_type: cache entry path}. build_session_artifacts.py --events 가 읽음.
+    """
+    path = os.path.join(out_dir, CACHE_MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"parser_version": PARSER_VERSION,
+                   "entries": {k: os.path.abspath(v) for k, v in entries.items()}}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_manifest(manifest_path, log_types=None):
+    """
+    events_cache.json -> {log_type: EventStore}
+    """
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("parser_version") != PARSER_VERSION:
+        raise ValueError(f"{manifest_path} was written by another parser version; re-run main.py --cache")
+
+    stores = {}
+    for log_type, path in manifest["entries"].items():
+        if log_types is None or log_type in log_types:
+            stores[log_type] = EventStore.load(path)
+    return stores
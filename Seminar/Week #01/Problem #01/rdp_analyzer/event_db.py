@@ -0,0 +1,221 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import sqlite3
+from itertools import islice
+from datetime import datetime
+
+import numpy as np
+
+from .event_store import NULL_TS, NULL_CODE, dt_to_us, us_to_dt
+from .filters import user_key
+
+# 조사할 때 "사용자 X / IP Y 의 T1~T2 이벤트" 를 timeline CSV grep 대신 index 로 바로 찾도록
+# 파싱한 event 와 세션을 SQLite 파일 하나(WAL mode)에 넣어 둠.
+#   events  : log 4종을 한 표로 (ts = UTC microseconds, 없는 field 는 NULL)
+#   sessions: correlate_sessions 결과 (주요 column + 전체 dict 는 data JSON)
+# 사용자는 filters.user_key 로 정규화한 user_key column 으로 찾음 (대소문자 / domain 무시).
+
+DB_NAME = "rdp_events.sqlite"
+BATCH_ROWS = 50_000
+
+EVENT_COLUMNS = ("ts", "source", "event_id", "username", "user_key", "domain", "ip", "workstation",
+                 "logon_type", "logon_id", "status", "substatus", "session_id", "client_name", "target",
+                 "file_id", "chunk_offset", "record_num")
+SESSION_COLUMNS = ("session_start", "session_end", "duration_sec", "username", "user_key", "domain",
+                   "client_ip", "logon_id", "session_id", "evidence_basis", "data")
+
+_SCHEMA = [
+    "CREATE TABLE events (ts INTEGER, source TEXT, event_id INTEGER, username TEXT, user_key TEXT, domain TEXT, "
+    "ip TEXT, workstation TEXT, logon_type TEXT, logon_id TEXT, status TEXT, substatus TEXT, session_id TEXT, "
+    "client_name TEXT, target TEXT, file_id INTEGER, chunk_offset INTEGER, record_num INTEGER)",
+    "CREATE TABLE sessions (session_start INTEGER, session_end INTEGER, duration_sec INTEGER, username TEXT, "
+    "user_key TEXT, domain TEXT, client_ip TEXT, logon_id TEXT, session_id TEXT, evidence_basis TEXT, data TEXT)",
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+# index 는 insert 가 끝난 뒤에 만듦 (한 번에 정렬하는 것이 row 마다 갱신하는 것보다 빠름)
+_INDEXES = [
+    "CREATE INDEX events_user_ts ON events (user_key, ts)",
+    "CREATE INDEX events_ip_ts ON events (ip, ts)",
+    "CREATE INDEX events_logon_id ON events (logon_id)",
+    "CREATE INDEX events_source_eid_ts ON events (source, event_id, ts)",
+    "CREATE INDEX events_ts ON events (ts)",
+    "CREATE INDEX sessions_user_start ON sessions (user_key, session_start)",
+    "CREATE INDEX sessions_ip_start ON sessions (client_ip, session_start)",
+    "CREATE INDEX sessions_start ON sessions (session_start)",
+]
+
+
+def _insert(conn, table, columns, rows):
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    n = 0
+    while True:
+        batch = list(islice(rows, BATCH_ROWS))
+        if not batch:
+            return n
+        conn.executemany(sql, batch)
+        n += len(batch)
+
+
+def _nullable(arr, null):
+    """
+    numpy int window -> object array of Python int (sqlite3 가 받는 type), null 인 칸은 None.
+    """
+    out = arr.astype(object)
+    out[null] = None
+    return out
+
+
+def _event_window(store, start, stop, values, keys):
+    """
+    {column: object array} of rows start:stop, decoded only for that window.
+    """
+    ts = np.frombuffer(store.ts, dtype=np.int64)[start:stop]
+    file_id = np.frombuffer(store.file_id, dtype=np.int32)[start:stop]
+    chunk_offset = np.frombuffer(store.chunk_offset, dtype=np.int64)[start:stop]
+    record_num = np.frombuffer(store.record_num, dtype=np.int64)[start:stop]
+    columns = {
+        "ts": _nullable(ts, ts == NULL_TS),
+        "source": [store.log_type] * (stop - start),
+        "event_id": np.frombuffer(store.event_id, dtype=np.int32)[start:stop].astype(object),
+        "user_key": keys[np.frombuffer(store.codes["username"], dtype=np.int32)[start:stop]],
+        "file_id": _nullable(file_id, file_id == NULL_CODE),
+        "chunk_offset": _nullable(chunk_offset, chunk_offset < 0),
+        "record_num": _nullable(record_num, record_num < 0),
+    }
+    for name in store.string_fields:
+        columns[name] = values[np.frombuffer(store.codes[name], dtype=np.int32)[start:stop]]
+    return columns
+
+
+def _event_rows(store):
+    """
+    EventStore -> (column 이름, row tuple iterator). 그 log 에 있는 field 만 넣음 (나머지는 NULL).
+    문자열은 code 별로 한 번만 풀고, user_key 도 pool 의 값마다 한 번만 계산함.
+    row 는 BATCH_ROWS 구간씩 풀어서 내보냄 (전체 길이의 column list 를 만들지 않음).
+    """
+    # NULL_CODE(-1) 은 마지막 원소 None 을 가리킴
+    values = np.array(store.strings.values + [None], dtype=object)
+    keys = np.array([user_key(v) for v in values], dtype=object)
+    names = [name for name in EVENT_COLUMNS
+             if name in ("ts", "source", "event_id", "user_key", "file_id", "chunk_offset", "record_num")
+             or name in store.string_fields]
+
+    def rows():
+        for start in range(0, len(store), BATCH_ROWS):
+            columns = _event_window(store, start, min(start + BATCH_ROWS, len(store)), values, keys)
+            yield from zip(*(columns[name] for name in names))
+
+    return names, rows()
+
+
+def _iso_us(value):
+    return None if not value else dt_to_us(datetime.fromisoformat(value))
+
+
+def _session_rows(sessions):
+    for s in sessions:
+        yield (_iso_us(s.get("session_start")), _iso_us(s.get("session_end")), s.get("duration_sec"),
+               s.get("username"), user_key(s.get("username")), s.get("domain"), s.get("client_ip"),
+               s.get("logon_id"), None if s.get("session_id") is None else str(s.get("session_id")),
+               s.get("evidence_basis"), json.dumps(s, ensure_ascii=False, default=str))
+
+
+def write_event_db(out_dir, stores, sessions=None):
+    """
+    stores(EventStore 목록) + sessions -> <out_dir>/rdp_events.sqlite.
+    임시 파일에 다 쓴 뒤 교체하므로 이전 DB 를 보고 있던 query 는 끝까지 옛 내용을 봄.
+    Returns (path, {"events": n, "sessions": n}).
+    """
+    path = os.path.join(out_dir, DB_NAME)
+    tmp = path + ".tmp"
+    for p in (tmp, tmp + "-wal", tmp + "-shm"):
+        if os.path.exists(p):
+            os.remove(p)
+
+    conn = sqlite3.connect(tmp)
+    # 새로 만드는 임시 파일이므로 적재 중에는 journal / fsync 없이 씀 (실패하면 교체하지 않음).
+    # 다 쓴 뒤 WAL 로 바꿔 두면 이후 query 는 다른 process 가 쓰는 중에도 읽을 수 있음.
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")       # 256 MB (index 정렬)
+    conn.execute("PRAGMA temp_store=MEMORY")
+    counts = {"events": 0, "sessions": 0}
+    try:
+        with conn:
+            for sql in _SCHEMA:
+                conn.execute(sql)
+            for store in stores:
+                counts["events"] += _insert(conn, "events", *_event_rows(store))
+            counts["sessions"] = _insert(conn, "sessions", SESSION_COLUMNS, _session_rows(sessions or []))
+            for sql in _INDEXES:
+                conn.execute(sql)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("created", datetime.now().isoformat()),
+                ("events", str(counts["events"])),
+                ("sessions", str(counts["sessions"])),
+            ])
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+    os.replace(tmp, path)
+    return path, counts
+
+
+def _where(user=None, ip=None, since=None, until=None, time_col="ts", ip_col="ip", **equals):
+    clauses, args = [], []
+    if user:
+        clauses.append("user_key = ?")
+        args.append(user_key(user))
+    if ip:
+        clauses.append(f"{ip_col} = ?")
+        args.append(ip)
+    if since is not None:
+        clauses.append(f"{time_col} >= ?")
+        args.append(dt_to_us(since))
+    if until is not None:
+        clauses.append(f"{time_col} <= ?")
+        args.append(dt_to_us(until))
+    for name, value in equals.items():
+        if value is not None:
+            clauses.append(f"{name} = ?")
+            args.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+def _iso(us):
+    return None if us is None else us_to_dt(us).isoformat()
+
+
+def query_events(db_path, user=None, ip=None, since=None, until=None, logon_id=None, source=None,
+                 event_id=None, limit=None):
+    """
+    Events matching every given condition, in time order, as dicts (timestamp as ISO string).
+    since/until: naive UTC datetime (filters.parse_time_bound).
+    """
+    where, args = _where(user, ip, since, until, logon_id=logon_id, source=source, event_id=event_id)
+    sql = f"SELECT * FROM events{where} ORDER BY ts" + (f" LIMIT {int(limit)}" if limit else "")
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cur = conn.execute(sql, args)
+        names = [d[0] for d in cur.description][1:]     # ts 다음 column 들 (ts -> timestamp ISO)
+        return [{"timestamp": _iso(row[0]), **dict(zip(names, row[1:]))} for row in cur]
+    finally:
+        conn.close()
+
+
+def query_sessions(db_path, user=None, ip=None, since=None, until=None, limit=None):
+    """
+    Sessions (the rdp_sessions.json dicts) whose session_start is within since/until.
+    """
+    where, args = _where(user, ip, since, until, time_col="session_start", ip_col="client_ip")
+    sql = f"SELECT data FROM sessions{where} ORDER BY session_start" + (f" LIMIT {int(limit)}" if limit else "")
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return [json.loads(data) for (data,) in conn.execute(sql, args)]
+    finally:
+        conn.close()
@@ -0,0 +1,285 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+from array import array
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .parsers import EVENT_FIELDS
+from .raw_index import RawRef
+from .columnar import write_columns, read_columns, pack_columns, unpack_columns
+
+# event dict 리스트 대신 column 단위(array)로 저장해서 메모리를 줄임.
+# username/domain/ip 같은 반복 문자열은 StringPool 에 한 번만 저장하고 int code 로 참조함.
+
+EPOCH = datetime(1970, 1, 1)
+ONE_US = timedelta(microseconds=1)
+NULL_TS = -(2 ** 63)       # = pandas NaT (iNaT)
+NULL_CODE = -1
+
+# to_frame 의 datetime64[ns] 로 표현 가능한 범위 (us). filetime_to_dt 의 datetime.min (FILETIME 0 / 잘못된 값)
+# 같은 값은 저장은 그대로 하고 (timeline CSV 는 이전과 같음) DataFrame 에서만 NaT 로 둠.
+_FRAME_MIN_US = pd.Timestamp.min.value // 1000 + 1
+_FRAME_MAX_US = pd.Timestamp.max.value // 1000
+
+# column 으로 따로 저장하는 field (나머지는 전부 문자열 column)
+_SPECIAL_FIELDS = ("timestamp", "source", "event_id", "raw_ref")
+
+
+def dt_to_us(dt):
+    """
+    datetime -> int64 microseconds since epoch (naive UTC 기준), None -> NULL_TS
+    """
+    if dt is None:
+        return NULL_TS
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None) - dt.utcoffset()
+    return (dt - EPOCH) // ONE_US
+
+
+def us_to_dt(us):
+    if us == NULL_TS:
+        return None
+    return EPOCH + timedelta(microseconds=us)
+
+
+class StringPool:
+    """
+    Dictionary encoding: each distinct string is stored once.
+    """
+
+    def __init__(self, values=None):
+        self.values = list(values or [])
+        self._codes = {v: i for i, v in enumerate(self.values)}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        if value is None:
+            return NULL_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def value(self, code):
+        return None if code == NULL_CODE else self.values[code]
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values):
+        self.__init__(values)
+
+
+class EventStore:
+    """
+    Struct-of-arrays store for the events of one log type.
+
+    - timestamp : int64 microseconds (array 'q')
+    - event_id  : array 'i'
+    - strings   : dictionary-encoded codes (array 'i') into one StringPool
+    - raw_ref   : file_id / chunk_offset / record_num arrays
+
+    Iterating yields the same dicts the parsers produce, one at a time, so
+    code written against event lists keeps working; iter_columns() decodes
+    only the requested columns.
+    """
+
+    def __init__(self, log_type):
+        self.log_type = log_type
+        self.fields = EVENT_FIELDS[log_type]
+        self.string_fields = tuple(f for f in self.fields if f not in _SPECIAL_FIELDS)
+        self.strings = StringPool()
+
+        self.ts = array("q")
+        self.event_id = array("i")
+        self.codes = {f: array("i") for f in self.string_fields}
+        self.file_id = array("i")
+        self.chunk_offset = array("q")
+        self.record_num = array("q")
+
+    def __len__(self):
+        return len(self.ts)
+
+    def append(self, ev):
+        self.ts.append(dt_to_us(ev["timestamp"]))
+        self.event_id.append(ev["event_id"])
+
+        code = self.strings.code
+        for f in self.string_fields:
+            self.codes[f].append(code(ev.get(f)))
+
+        ref = ev.get("raw_ref")
+        if ref is None or ref.file_id is None:
+            self.file_id.append(NULL_CODE)
+        else:
+            self.file_id.append(ref.file_id)
+        self.chunk_offset.append(ref.chunk_offset if ref is not None else -1)
+        self.record_num.append(ref.record_num if ref is not None else -1)
+
+    def extend(self, events):
+        for ev in events:
+            self.append(ev)
+        return self
+
+    def merge(self, other):
+        """
+        Append all rows of another store of the same log type (e.g. a worker
+        batch), re-mapping its string codes into this store's pool.
+        """
+        remap = [self.strings.code(v) for v in other.strings.values]
+        self.ts.extend(other.ts)
+        self.event_id.extend(other.event_id)
+        for f in self.string_fields:
+            col = self.codes[f]
+            col.extend(NULL_CODE if c == NULL_CODE else remap[c] for c in other.codes[f])
+        self.file_id.extend(other.file_id)
+        self.chunk_offset.extend(other.chunk_offset)
+        self.record_num.extend(other.record_num)
+        return self
+
+    def code_map(self, other):
+        """
+        numpy array: string code of another store -> code in this store's pool.
+        The last entry is NULL_CODE, so indexing with NULL_CODE (-1) keeps it.
+        """
+        remap = [self.strings.code(v) for v in other.strings.values]
+        return np.asarray(remap + [NULL_CODE], dtype=np.int32)
+
+    def extend_rows(self, other, start, stop, remap):
+        """
+        Append rows start:stop of another store (remap = self.code_map(other)).
+        dedup 에서 merge 순서대로 남길 row 구간만 바로 옮길 때 씀 (전체 merge + take 없이).
+        """
+        def copy(dst, src):
+            dst.frombytes(np.frombuffer(src, dtype=src.typecode)[start:stop].tobytes())
+
+        copy(self.ts, other.ts)
+        copy(self.event_id, other.event_id)
+        for f in self.string_fields:
+            codes = np.frombuffer(other.codes[f], dtype=np.int32)[start:stop]
+            self.codes[f].frombytes(remap[codes].tobytes())
+        copy(self.file_id, other.file_id)
+        copy(self.chunk_offset, other.chunk_offset)
+        copy(self.record_num, other.record_num)
+        return self
+
+    def take(self, idx):
+        """
+        New store with only the rows at idx (int positions, in that order).
+        String codes are kept as they are (the pool is copied).
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        out = EventStore(self.log_type)
+        out.strings = StringPool(self.strings.values)
+
+        def pick(arr):
+            taken = array(arr.typecode)
+            taken.frombytes(np.frombuffer(arr, dtype=arr.typecode)[idx].tobytes())
+            return taken
+
+        out.ts = pick(self.ts)
+        out.event_id = pick(self.event_id)
+        out.codes = {f: pick(self.codes[f]) for f in self.string_fields}
+        out.file_id = pick(self.file_id)
+        out.chunk_offset = pick(self.chunk_offset)
+        out.record_num = pick(self.record_num)
+        return out
+
+    def _column(self, name):
+        if name == "timestamp":
+            return map(us_to_dt, self.ts)
+        if name == "source":
+            return (self.log_type for _ in range(len(self)))
+        if name == "event_id":
+            return iter(self.event_id)
+        if name == "raw_ref":
+            return (
+                None if off < 0 else RawRef(None if fid == NULL_CODE else fid, off, num)
+                for fid, off, num in zip(self.file_id, self.chunk_offset, self.record_num)
+            )
+        values = self.strings.values
+        return (None if c == NULL_CODE else values[c] for c in self.codes[name])
+
+    def iter_columns(self, *names):
+        """
+        Yield tuples with only the requested columns decoded.
+        """
+        return zip(*(self._column(n) for n in names))
+
+    def to_frame(self, *names):
+        """
+        DataFrame of the requested columns, built from the arrays without
+        per-row Python objects. timestamp -> datetime64[ns, UTC] (None / out of range -> NaT).
+        """
+        names = names or self.fields
+        data = {}
+        pool = None
+        for name in names:
+            if name == "timestamp":
+                ts = np.frombuffer(self.ts, dtype=np.int64)
+                ts = np.where((ts >= _FRAME_MIN_US) & (ts <= _FRAME_MAX_US), ts, NULL_TS)
+                data[name] = pd.to_datetime(ts, unit="us", utc=True)
+            elif name == "source":
+                data[name] = self.log_type
+            elif name == "event_id":
+                data[name] = np.frombuffer(self.event_id, dtype=np.int32).astype(np.int64)
+            elif name == "raw_ref":
+                data[name] = list(self._column(name))
+            else:
+                if pool is None:
+                    # code -1 (None) 은 마지막 원소를 가리키게 됨
+                    pool = np.array(self.strings.values + [None], dtype=object)
+                data[name] = pool[np.frombuffer(self.codes[name], dtype=np.int32)]
+        return pd.DataFrame(data, columns=list(names), index=pd.RangeIndex(len(self)))
+
+    def __iter__(self):
+        fields = self.fields
+        for row in self.iter_columns(*fields):
+            yield dict(zip(fields, row))
+
+    def _arrays(self):
+        arrays = {"ts": self.ts, "event_id": self.event_id, "file_id": self.file_id,
+                  "chunk_offset": self.chunk_offset, "record_num": self.record_num}
+        for f in self.string_fields:
+            arrays[f"code:{f}"] = self.codes[f]
+        return arrays
+
+    @classmethod
+    def _from_arrays(cls, meta, arrays, strings):
+        store = cls(meta["log_type"])
+        store.strings = StringPool(strings["strings"])
+        store.ts = arrays["ts"]
+        store.event_id = arrays["event_id"]
+        store.file_id = arrays["file_id"]
+        store.chunk_offset = arrays["chunk_offset"]
+        store.record_num = arrays["record_num"]
+        store.codes = {f: arrays[f"code:{f}"] for f in store.string_fields}
+        return store
+
+    def save(self, path, meta=None):
+        """
+        Write the store as a columnar file (arrays as raw bytes + the string pool).
+        """
+        return write_columns(path, self._arrays(), {"strings": self.strings.values},
+                             dict(meta or {}, log_type=self.log_type))
+
+    @classmethod
+    def load(cls, path):
+        return cls._from_arrays(*read_columns(path))
+
+    def to_bytes(self):
+        """
+        Same layout as save(), in memory (worker -> parent 전달용).
+        """
+        return pack_columns(self._arrays(), {"strings": self.strings.values}, {"log_type": self.log_type})
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls._from_arrays(*unpack_columns(data))
@@ -1,19 +1,109 @@
 # My Python version: 3.10.12
 # IDE: VS code
 
+from itertools import islice
 from Evtx.Evtx import Evtx
 from lxml import etree
 from .utils import safe_dt
+from .binxml import TemplateCache, decode_record, peek_event_id
+from .chunk_index import select_chunks
 
 # EVTX를 분석 가능한 형태로 구조화 함.
 
-def iter_evtx_records(evtx_path: str):
+READERS = ("xml", "native")
+
+def chunk_count(evtx_path: str):
+    """
+    Number of 64 KiB chunks that iter_evtx_records would walk.
+    """
+    with Evtx(evtx_path) as log:
+        return sum(1 for _ in log.get_file_header().chunks())
+
+
+def record_count(evtx_path: str):
+    """
+    Number of records in the file, from the chunk headers only (record 를 읽지 않음).
+    """
+    n = 0
+    with Evtx(evtx_path) as log:
+        for chunk in log.get_file_header().chunks():
+            if not chunk.check_magic() or chunk.next_record_offset() <= 0x200:
+                continue
+            n += max(chunk.log_last_record_number() - chunk.log_first_record_number() + 1, 0)
+    return n
+
+
+def _iter_records(log, first_chunk=0, last_chunk=None, min_record_num=None, max_record_num=None, keep=None,
+                  skip=None):
+    # chunk 단위로 독립적이므로 [first_chunk, last_chunk) 범위만 읽을 수 있음
+    # keep: 읽을 chunk 번호 (chunk_index.select_chunks, 시간 범위 밖 chunk 는 건너뜀)
+    # skip: 읽지 않을 chunk 번호 (dedup.plan_overlaps, 앞의 입력 파일에 이미 있는 chunk)
+    chunks = islice(log.get_file_header().chunks(), first_chunk, last_chunk)
+    for i, chunk in enumerate(chunks, first_chunk):
+        if (keep is not None and i not in keep) or (skip and i in skip):
+            continue
+        # record 번호 범위가 주어지면 chunk header 만 보고 통째로 건너뜀
+        if min_record_num is not None and chunk.log_last_record_number() < min_record_num:
+            continue
+        if max_record_num is not None and chunk.log_first_record_number() > max_record_num:
+            continue
+        for record in chunk.records():
+            if min_record_num is not None or max_record_num is not None:
+                num = record.record_num()
+                if min_record_num is not None and num < min_record_num:
+                    continue
+                if max_record_num is not None and num > max_record_num:
+                    continue
+            yield record
+
+
+def _peek_event_id(record, cache):
+    try:
+        return peek_event_id(record, cache)
+    except Exception:
+        # BinXML 에서 못 읽으면 XML 렌더링 후 판단하도록 넘김
+        return None
+
+
+def _time_chunks(evtx_path, record_filter, index_dir):
+    if record_filter is None or not record_filter.has_time:
+        return None
+    return frozenset(select_chunks(evtx_path, record_filter.since, record_filter.until, index_dir))
+
+
+def iter_evtx_records(evtx_path: str, reader: str = "xml", first_chunk: int = 0, last_chunk: int = None,
+                      record_filter=None, min_record_num: int = None, max_record_num: int = None,
+                      index_dir: str = None, skip_chunks=None):
     """
-    Yield (event_id, channel, timestamp, eventdata_dict, raw_xml,string)
+    Yield (event_id, channel, timestamp, eventdata_dict, record_ref)
+    record_ref = (chunk_offset, record_num) -> render_record_xml 로 원본 XML 을 다시 만들 수 있음.
+
+    reader="xml"    : record.xml() 렌더링 후 lxml로 다시 파싱
+    reader="native" : BinXML 토큰/치환값을 바로 읽음
+    first_chunk/last_chunk 로 읽을 chunk 범위를 제한할 수 있음.
+    min_record_num/max_record_num 은 record header 번호 범위 (checkpoint 이후 추가된 레코드만 읽을 때).
+    record_filter(RecordFilter) 의 EventID/시간 조건은 EventData 를 만들기 전에 검사함.
+    시간 조건이 있으면 chunk 시간 index 로 범위 밖 chunk 는 통째로 건너뜀
+    (index_dir: chunk index 를 저장/재사용할 폴더, 없으면 매번 chunk header 로 만듦).
+    skip_chunks: 읽지 않을 chunk 번호 (겹치는 입력 파일에서 이미 읽은 chunk).
     """
+    keep = _time_chunks(evtx_path, record_filter, index_dir)
+    if reader == "native":
+        yield from _iter_native_records(evtx_path, first_chunk, last_chunk, record_filter,
+                                        min_record_num, max_record_num, keep, skip_chunks)
+        return
+
+    # xml 모드에서도 EventID 는 BinXML 에서 먼저 읽어서 필요 없는 레코드는 렌더링하지 않음
+    peek_cache = TemplateCache() if record_filter is not None and record_filter.event_ids is not None else None
 
     with Evtx(evtx_path) as log:
-        for record in log.records():
+        for record in _iter_records(log, first_chunk, last_chunk, min_record_num, max_record_num, keep,
+                                    skip_chunks):
+            if peek_cache is not None:
+                peeked = _peek_event_id(record, peek_cache)
+                if peeked is not None and not record_filter.accepts_event_id(peeked):
+                    continue
+
             xml_str = record.xml()
             try:
                 root = etree.fromstring(xml_str.encode("utf-8"))
@@ -26,13 +116,16 @@ def iter_evtx_records(evtx_path: str):
                 continue
             eid_node = sys_node.find("e:EventID", namespaces=ns)
             event_id = int(eid_node.text) if eid_node is not None else None
+            if record_filter is not None and not record_filter.accepts_event_id(event_id):
+                continue
 
             channel_node = sys_node.find("e:Channel", namespaces=ns)
             channel = channel_node.text if channel_node is not None else None
 
             time_node = sys_node.find("e:TimeCreated", namespaces=ns)
             ts = safe_dt(time_node.attrib.get("SystemTime")) if time_node is not None else None
-
+            if record_filter is not None and not record_filter.accepts_time(ts):
+                continue
 
             data_dict = {}
 
@@ -61,4 +154,30 @@ def iter_evtx_records(evtx_path: str):
                         if attr_key not in data_dict:
                             data_dict[attr_key] = v
 
-            yield event_id, channel, ts, data_dict, xml_str
\ No newline at end of file
+            yield event_id, channel, ts, data_dict, (record._chunk.offset(), record.record_num())
+
+
+def _iter_native_records(evtx_path: str, first_chunk=0, last_chunk=None, record_filter=None,
+                         min_record_num=None, max_record_num=None, keep=None, skip=None):
+    cache = TemplateCache()
+    with Evtx(evtx_path) as log:
+        for record in _iter_records(log, first_chunk, last_chunk, min_record_num, max_record_num, keep, skip):
+            decoded = decode_record(record, cache, record_filter)
+            if decoded is None:
+                continue
+            event_id, channel, ts, data_dict = decoded
+            yield event_id, channel, ts, data_dict, (record._chunk.offset(), record.record_num())
+
+
+def render_record_xml(evtx_path: str, chunk_offset: int, record_num: int):
+    """
+    record_ref 로 레코드 하나의 원본 XML 을 다시 렌더링함. 없으면 None.
+    """
+    with Evtx(evtx_path) as log:
+        for chunk in log.chunks():
+            if chunk.offset() != chunk_offset:
+                continue
+            for record in chunk.records():
+                if record.record_num() == record_num:
+                    return record.xml()
+    return None
@@ -7,20 +7,20 @@ import pandas as pd
 
 def analyze_failures(security_events):
     attempts = []
-    for ev in security_events:
-        if ev["event_id"] != 4625:
+    columns = ("event_id", "logon_type", "timestamp", "username", "domain", "ip", "status", "substatus")
+    for event_id, lt, ts, username, domain, ip, status, substatus in security_events.iter_columns(*columns):
+        if event_id != 4625:
             continue
-        lt = ev.get("logon_type")
         if not lt or str(lt).strip() != "10":
             continue
 
         attempts.append({
-            "timestamp": ev["timestamp"].isoformat() if ev["timestamp"] else None,
-            "username": ev["username"],
-            "domain": ev["domain"],
-            "client_ip": ev["ip"],
-            "status": ev["status"],
-            "substatus": ev["substatus"],
+            "timestamp": ts.isoformat() if ts else None,
+            "username": username,
+            "domain": domain,
+            "client_ip": ip,
+            "status": status,
+            "substatus": substatus,
         })
 
     df = pd.DataFrame(attempts)
@@ -0,0 +1,111 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+from datetime import timezone
+
+from .utils import safe_dt
+
+# reader 단계에서 최대한 빨리 버릴 수 있도록 조건을 한 곳에 모음.
+# --user / --ip 는 event 를 버리지 않고 결과(세션, 4625 실패 row)의 범위만 정함:
+# 4634 / 4672 / LSM 23·24 처럼 IP 나 사용자가 없는 event 도 logon_id / SessionID 로 세션에 붙어야 하므로.
+
+
+def parse_time_bound(value):
+    """
+    --since/--until 문자열 -> naive UTC datetime (EVTX SystemTime 과 같은 기준)
+    """
+    if not value:
+        return None
+    dt = safe_dt(value)
+    if dt is None:
+        raise ValueError(f"invalid time: {value}")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def user_key(username):
+    """
+    'DOMAIN\\user', 'user@domain', 'User' 를 같은 사용자로 비교하기 위한 key
+    """
+    if not username:
+        return None
+    u = str(username).strip().lower()
+    u = u.rsplit("\\", 1)[-1]
+    u = u.split("@", 1)[0]
+    return u or None
+
+
+class RecordFilter:
+    """
+    Predicates pushed down into iter_evtx_records.
+
+    event_ids/since/until are checked by the reader (EventID first, then
+    TimeCreated, before EventData is decoded). user/ip do not drop events;
+    they scope the outputs (scope_sessions / scope_frame / scope_store).
+    """
+
+    def __init__(self, event_ids=None, since=None, until=None, user=None, ip=None):
+        self.event_ids = frozenset(event_ids) if event_ids is not None else None
+        self.since = since
+        self.until = until
+        self.user = user_key(user)
+        self.ip = ip.strip() if ip else None
+
+    def for_event_ids(self, event_ids):
+        """
+        Same filter, restricted to the given event IDs (None = keep all).
+        """
+        return RecordFilter(event_ids, self.since, self.until, self.user, self.ip)
+
+    @property
+    def has_time(self):
+        return self.since is not None or self.until is not None
+
+    def accepts_event_id(self, event_id):
+        return self.event_ids is None or event_id in self.event_ids
+
+    def accepts_time(self, ts):
+        if not self.has_time:
+            return True
+        if ts is None:
+            return False
+        if self.since is not None and ts < self.since:
+            return False
+        if self.until is not None and ts > self.until:
+            return False
+        return True
+
+    @property
+    def has_scope(self):
+        return self.user is not None or self.ip is not None
+
+    def accepts_row(self, username, ip):
+        if self.user is not None and user_key(username) != self.user:
+            return False
+        if self.ip is not None and ip != self.ip:
+            return False
+        return True
+
+    def scope_sessions(self, sessions, user_field="username", ip_field="client_ip"):
+        """
+        Sessions (dicts) of the --user / --ip, all of them if neither is set.
+        """
+        if not self.has_scope:
+            return sessions
+        return [s for s in sessions if self.accepts_row(s.get(user_field), s.get(ip_field))]
+
+    def scope_frame(self, df, user_col="username", ip_col="client_ip"):
+        if not self.has_scope or df.empty:
+            return df
+        mask = [self.accepts_row(u, ip) for u, ip in zip(df[user_col], df[ip_col])]
+        return df[mask].reset_index(drop=True)
+
+    def scope_store(self, store):
+        """
+        Store with only the rows of the --user / --ip (4625 분석용; 세션 correlation 에는 쓰지 않음).
+        """
+        if not self.has_scope:
+            return store
+        return store.take([i for i, (u, ip) in enumerate(store.iter_columns("username", "ip"))
+                           if self.accepts_row(u, ip)])
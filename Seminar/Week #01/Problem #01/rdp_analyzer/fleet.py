@@ -0,0 +1,179 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import csv
+import json
+import heapq
+
+import pandas as pd
+
+from .config import LOG_FILE_PATTERNS
+
+# fleet mode: 호스트별 로그 폴더를 찾고, 진행 상태를 저장하고, 호스트별 결과를 fleet 표로 합침.
+
+FLEET_STATE_NAME = "fleet_state.json"
+HOSTS_DIR_NAME = "hosts"
+
+
+def log_type_of(filename):
+    name = filename.lower()
+    if not name.endswith(".evtx"):
+        return None
+    for log_type, pattern in LOG_FILE_PATTERNS:
+        if pattern in name:
+            return log_type
+    return None
+
+
+def discover_hosts(root):
+    """
+    root/<host>/... 아래의 .evtx 를 log type 별로 분류함.
+    Returns {host: {log_type: [path, ...]}}; hosts without any known log are skipped.
+    A log type with several files (live + Archive-*.evtx 등) keeps all of them, largest first:
+    run_analysis 가 겹치는 chunk / record 를 빼고 시간순으로 합침.
+    """
+    hosts = {}
+    for host in sorted(os.listdir(root)):
+        host_dir = os.path.join(root, host)
+        if not os.path.isdir(host_dir):
+            continue
+
+        found = {}
+        for dirpath, _, filenames in os.walk(host_dir):
+            for fn in sorted(filenames):
+                log_type = log_type_of(fn)
+                if log_type:
+                    found.setdefault(log_type, []).append(os.path.join(dirpath, fn))
+
+        files = {}
+        for log_type, paths in found.items():
+            # 먼저 온 파일의 record 를 남기므로 가장 큰 파일부터 (앞 파일이 덮는 chunk 는 파싱 안 함)
+            files[log_type] = sorted(paths, key=lambda p: os.path.getsize(p), reverse=True)
+        if files:
+            hosts[host] = files
+    return hosts
+
+
+def input_signature(files):
+    """
+    {log_type: [path, ...]} -> {path: [size, mtime]} (resume 시 입력이 바뀌었는지 확인용)
+    """
+    sig = {}
+    for paths in files.values():
+        for path in paths:
+            st = os.stat(path)
+            sig[path] = [st.st_size, st.st_mtime]
+    return sig
+
+
+class FleetState:
+    """
+    fleet_state.json: host -> status ("done" / "failed"), counts, input signature.
+    Saved after every finished host so a crashed run can resume.
+    """
+
+    def __init__(self, out_dir):
+        self.path = os.path.join(out_dir, FLEET_STATE_NAME)
+        self.hosts = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.hosts = json.load(f).get("hosts", {})
+
+    def is_done(self, host, files):
+        entry = self.hosts.get(host)
+        return bool(entry) and entry.get("status") == "done" and entry.get("inputs") == input_signature(files)
+
+    def update(self, host, entry):
+        self.hosts[host] = entry
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"hosts": self.hosts}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def _read_host_csv(path, host):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    try:
+        df = pd.read_csv(path, encoding="utf-8-sig")
+    except pd.errors.EmptyDataError:
+        return None
+    df.insert(0, "host", host)
+    return df
+
+
+def _merge_csv(out_path, host_dirs, filename, sort_col=None):
+    frames = []
+    for host, d in host_dirs.items():
+        df = _read_host_csv(os.path.join(d, filename), host)
+        if df is not None:
+            frames.append(df)
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    if sort_col:
+        df = df.sort_values(sort_col, kind="stable")
+    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    return out_path
+
+
+def _iter_timeline(path, host):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            yield [host] + row
+
+
+def merge_timelines(out_path, host_dirs, filename="timeline_all_events.csv"):
+    """
+    호스트별 timeline 은 이미 시간순이므로 heapq.merge 로 한 줄씩 합침 (전체를 메모리에 올리지 않음).
+    """
+    streams = []
+    header = None
+    for host, d in host_dirs.items():
+        path = os.path.join(d, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            first = next(csv.reader(f), None)
+        if first is None:
+            continue
+        header = header or first
+        streams.append(_iter_timeline(path, host))
+    if header is None:
+        return None
+
+    # timestamp 가 빈 행은 pandas sort_values 처럼 맨 뒤로
+    key = lambda row: (row[1] == "", row[1])
+    with open(out_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["host"] + header)
+        writer.writerows(heapq.merge(*streams, key=key))
+    return out_path
+
+
+def merge_fleet_tables(out_dir, host_dirs):
+    """
+    host_dirs: {host: per-host output dir} -> fleet-wide tables with a "host" column.
+    """
+    paths = {
+        "fleet_sessions": _merge_csv(os.path.join(out_dir, "fleet_sessions.csv"), host_dirs,
+                                     "rdp_sessions.csv", sort_col="session_start"),
+        "fleet_failures": _merge_csv(os.path.join(out_dir, "fleet_failures_4625.csv"), host_dirs,
+                                     "rdp_failures_4625.csv", sort_col="timestamp"),
+        "fleet_failure_alerts": _merge_csv(os.path.join(out_dir, "fleet_failure_alerts.csv"), host_dirs,
+                                           "rdp_failure_alerts.csv", sort_col="start"),
+        "fleet_timeline": merge_timelines(os.path.join(out_dir, "fleet_timeline.csv"), host_dirs),
+    }
+
+    failures_path = paths["fleet_failures"]
+    if failures_path:
+        df = pd.read_csv(failures_path, encoding="utf-8-sig")
+        by_ip = df.groupby(["client_ip"]).agg(fail_count=("host", "size"), hosts=("host", "nunique")) \
+            .reset_index().sort_values("fail_count", ascending=False)
+        paths["fleet_fail_ips"] = os.path.join(out_dir, "fleet_failure_top_ips.csv")
+        by_ip.to_csv(paths["fleet_fail_ips"], index=False, encoding="utf-8-sig")
+
+    return {k: v for k, v in paths.items() if v}
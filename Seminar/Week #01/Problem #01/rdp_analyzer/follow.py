@@ -0,0 +1,94 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import time
+from datetime import datetime, timezone
+
+from .config import LOG_TYPE_EVENT_IDS
+from .evtx_reader import iter_evtx_records
+from .filters import RecordFilter
+from .parsers import parse_records
+from .checkpoint import scan_position
+
+# --follow: EVTX 파일을 주기적으로 다시 열어서 새로 추가된 레코드만 StreamingCorrelator 에 넣음.
+
+STREAM_NAME = "sessions_stream.jsonl"
+
+
+def _load_range(evtx_path, log_type, reader, record_filter, min_record_num, max_record_num):
+    record_filter = (record_filter or RecordFilter()).for_event_ids(LOG_TYPE_EVENT_IDS[log_type])
+    records = iter_evtx_records(evtx_path, reader=reader, record_filter=record_filter,
+                                min_record_num=min_record_num, max_record_num=max_record_num)
+    return list(parse_records(records, log_type, record_filter))
+
+
+def format_alert(r):
+    state = r["state"]
+    who = f"{r.get('username')} from {r.get('client_ip')}"
+    if state == "started":
+        return f"[ALERT] RDP logon {who} at {r['session_start']} (logon_id={r.get('logon_id')})"
+    if state == "fallback":
+        return f"[ALERT] RDP auth (RCM 1149) {who} {r['session_start']} -> {r['session_end']} (estimated)"
+    if state == "closed":
+        return f"[+] RDP session closed: {who} {r['session_start']} -> {r['session_end']} ({r['duration_sec']}s)"
+    return f"[!] RDP session {state}: {who} since {r['session_start']} (logon_id={r.get('logon_id')})"
+
+
+def follow_logs(inputs, out_dir, correlator, reader="xml", record_filter=None, poll_seconds=10.0,
+                from_end=False, max_polls=None):
+    """
+    inputs: [(log_type, evtx_path)]. Every poll reads the records appended since
+    the previous poll (record number range), feeds them to correlator in time
+    order and appends the emitted records to sessions_stream.jsonl.
+    Stops on Ctrl+C (or after max_polls) and flushes the remaining sessions.
+    record_filter 의 user/ip 는 내보내는 세션만 고름 (event 는 전부 correlator 에 넣음).
+    """
+    scope = record_filter or RecordFilter()
+    last = {}
+    for log_type, path in inputs:
+        pos = scan_position(path) if from_end else None
+        last[(log_type, path)] = pos["record_num"] if pos else 0
+
+    stream_path = os.path.join(out_dir, STREAM_NAME)
+    polls = 0
+
+    def emit(records, f):
+        for r in scope.scope_sessions(records):
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            print(format_alert(r))
+        f.flush()
+
+    with open(stream_path, "a", encoding="utf-8") as f:
+        try:
+            while max_polls is None or polls < max_polls:
+                polls += 1
+                batch = []
+                for log_type, path in inputs:
+                    key = (log_type, path)
+                    pos = scan_position(path)
+                    if pos is None:
+                        continue
+                    if pos["record_num"] < last[key]:
+                        # 로그가 지워졌거나 새 파일로 바뀜 -> 처음부터
+                        print(f"[*] {path}: record numbers went back, reading from the start")
+                        last[key] = 0
+                    if pos["record_num"] > last[key]:
+                        batch.extend(_load_range(path, log_type, reader, record_filter,
+                                                 last[key] + 1, pos["record_num"]))
+                        last[key] = pos["record_num"]
+
+                # 여러 로그의 새 이벤트를 시간순으로 섞어서 넣음
+                batch.sort(key=lambda e: e["timestamp"] or datetime.min)
+                emit(correlator.feed_many(batch), f)
+                emit(correlator.advance(datetime.now(timezone.utc).replace(tzinfo=None)), f)
+
+                if max_polls is None or polls < max_polls:
+                    time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            print("\n[*] Stopping follow mode")
+
+        emit(correlator.flush(), f)
+
+    return stream_path
@@ -0,0 +1,54 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+from bisect import bisect_left, bisect_right
+
+# 시간 window join 을 위해 timestamp 정렬 + key 별 partition 을 미리 만들어 둠.
+# (session 마다 전체 event 를 훑던 선형 탐색을 bisect 로 대체)
+
+
+def user_norm(username):
+    """
+    correlator 가 쓰는 사용자 비교 key (대소문자 무시). 빈 값이면 None.
+    """
+    return str(username).lower() if username else None
+
+
+class TimeIndex:
+    """
+    Events with a timestamp, in their original (time-sorted) order.
+
+    window(lo, hi) returns the positions with lo <= ts <= hi; partitions
+    built with add_partition() answer the same question for one key value
+    only. Positions always refer to self.events, so results from several
+    partitions can be merged back into the original order.
+    """
+
+    def __init__(self, sorted_events):
+        self.events = [e for e in sorted_events if e["timestamp"]]
+        self.ts = [e["timestamp"] for e in self.events]
+        self._partitions = {}
+
+    def add_partition(self, name, key_func):
+        groups = {}
+        for pos, e in enumerate(self.events):
+            key = key_func(e)
+            if key is None:
+                continue
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = ([], [])
+            group[0].append(self.ts[pos])
+            group[1].append(pos)
+        self._partitions[name] = groups
+        return self
+
+    def window(self, lo, hi):
+        return range(bisect_left(self.ts, lo), bisect_right(self.ts, hi))
+
+    def window_in(self, name, key, lo, hi):
+        group = self._partitions[name].get(key)
+        if group is None:
+            return []
+        keys, positions = group
+        return positions[bisect_left(keys, lo):bisect_right(keys, hi)]
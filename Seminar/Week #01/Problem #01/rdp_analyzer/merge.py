@@ -0,0 +1,86 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import glob
+import heapq
+import os
+from itertools import repeat
+
+import numpy as np
+
+from .event_store import NULL_TS
+
+# 파일(또는 log)마다 시간순인 event 흐름을 heapq.merge 로 합침 (k-way merge).
+# 전부 이어 붙인 뒤 다시 정렬하지 않고, heap 에는 흐름마다 맨 앞 row 하나만 있음
+# -> 메모리는 파일 수가 아니라 흐름 하나의 크기만큼만 더 듦.
+# 같은 시각이면 앞에 준 흐름이 먼저 (heapq.merge 는 stable) -> 이어 붙여서 stable sort 한 것과 같은 순서.
+
+_NULL_LAST = np.iinfo(np.int64).max       # timestamp 없는 row 는 맨 뒤 (pandas sort_values 의 NaN 위치)
+
+
+def expand_inputs(values, pattern="*.evtx"):
+    """
+    파일 / glob / 폴더 목록 -> EVTX 경로 list (주어진 순서 유지, 중복 제거).
+    폴더는 그 안의 *.evtx 를, glob 은 맞는 파일을 이름순으로 넣음.
+    """
+    paths = []
+    for value in values or []:
+        if os.path.isdir(value):
+            found = sorted(glob.glob(os.path.join(glob.escape(value), pattern)))
+        elif glob.has_magic(value) and not os.path.exists(value):
+            found = sorted(glob.glob(value))
+        else:
+            found = [value]
+        paths.extend(p for p in found if p not in paths)
+    return paths
+
+
+def sort_keys(store):
+    """
+    int64 sort key per row (timestamp, None -> last).
+    """
+    ts = np.frombuffer(store.ts, dtype=np.int64)
+    return np.where(ts == NULL_TS, _NULL_LAST, ts)
+
+
+def time_order(store, keys=None):
+    """
+    Row positions of a store in time order (stable), or None if it is already in order.
+    EVTX 는 순환 buffer 라 파일 하나 안에서도 chunk 순서와 시간 순서가 다를 수 있음.
+    """
+    keys = sort_keys(store) if keys is None else keys
+    if len(keys) < 2 or bool(np.all(keys[1:] >= keys[:-1])):
+        return None
+    return np.argsort(keys, kind="stable")
+
+
+def ordered_rows(store, *names, stream=0):
+    """
+    Yield (sort key, stream, store row, (decoded columns...)) in time order.
+    (key, stream, row) 는 흐름끼리 겹치지 않으므로 tuple 비교만으로 merge 순서가 정해짐.
+    """
+    keys = sort_keys(store)
+    order = time_order(store, keys)
+    if order is None:
+        rows, ordered = range(len(store)), store
+    else:
+        # 정렬된 사본은 column 을 디코딩할 때만 만듦
+        keys, rows = keys[order], order.tolist()
+        ordered = store.take(order) if names else None
+    cols = ordered.iter_columns(*names) if names else repeat(())
+    return zip(keys.tolist(), repeat(stream), rows, cols)
+
+
+def merge_ordered(streams):
+    """
+    Lazy k-way merge of ordered_rows() streams (stream = position in the list).
+    같은 key 면 앞에 준 흐름이 먼저, 같은 흐름 안에서는 row 순서대로.
+    """
+    return heapq.merge(*streams)
+
+
+def merge_stores(stores, *names):
+    """
+    Yield (sort key, store position, store row, (decoded columns...)) of several stores in time order.
+    """
+    return merge_ordered([ordered_rows(store, *names, stream=i) for i, store in enumerate(stores)])
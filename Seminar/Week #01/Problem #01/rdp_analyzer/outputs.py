@@ -6,12 +6,47 @@ import json
 import pandas as pd
 from collections import defaultdict
 
-def write_sessions(out_dir, sessions):
+from .dataset import write_dataset, resolve_format
+from .merge import ordered_rows, merge_ordered
+
+DATASETS_DIR = "datasets"
+
+# 세션 row 의 시각 column (ISO 문자열, naive UTC)
+SESSION_TIME_COLUMNS = ("session_start", "session_end", "auth_event_time_1149")
+TIMELINE_COLUMNS = ["timestamp", "source", "event_id", "username", "ip", "logon_id"]
+TIMELINE_BATCH = 100_000
+
+# json: 전체 list 를 pretty-print 한 문서, ndjson: 한 줄에 record 하나 (첫 줄은 {"header": {...}})
+JSON_FORMATS = ("json", "ndjson")
+
+
+def write_ndjson(path, records, header=None):
+    """
+    records(iterable) 를 하나씩 한 줄 JSON 으로 씀 -> 전체 문서를 메모리에 만들지 않음.
+    header 가 있으면 첫 줄에 {"header": header} 로 씀 (반복되는 notes 등).
+    Returns the number of records written (header 제외).
+    """
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if header is not None:
+            f.write(json.dumps({"header": header}, ensure_ascii=False, default=str) + "\n")
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+            n += 1
+    return n
+
+
+def write_sessions(out_dir, sessions, json_format="json"):
     df_sessions = pd.DataFrame(sessions)
     csv_path = os.path.join(out_dir, "rdp_sessions.csv")
-    json_path = os.path.join(out_dir, "rdp_sessions.json")
-
     df_sessions.to_csv(csv_path, index=False, encoding="utf-8-sig")
+
+    if json_format == "ndjson":
+        json_path = os.path.join(out_dir, "rdp_sessions.ndjson")
+        write_ndjson(json_path, sessions, header={"kind": "rdp_sessions", "sessions": len(sessions)})
+        return csv_path, json_path
+
+    json_path = os.path.join(out_dir, "rdp_sessions.json")
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(sessions, f, indent=2, ensure_ascii=False)
 
@@ -33,46 +68,46 @@ def write_failures(out_dir, df_failures, df_fail_by_ip, df_fail_by_user_ip):
 
     return paths
 
+def write_failure_alerts(out_dir, df_alerts):
+    """
+    brute-force / spray 구간 (detection.detect_failure_alerts) -> rdp_failure_alerts.csv. 없으면 None.
+    """
+    if df_alerts is None or df_alerts.empty:
+        return None
+    path = os.path.join(out_dir, "rdp_failure_alerts.csv")
+    out = df_alerts.copy()
+    for c in ("start", "end"):
+        out[c] = out[c].map(lambda x: x.isoformat() if x else None)
+    out.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
 def write_timeline(out_dir, security_events, rcm_events, lsm_events):
-    timeline_rows = []
-
-    for e in security_events:
-        timeline_rows.append({
-            "timestamp": e["timestamp"].isoformat() if e["timestamp"] else None,
-            "source": e["source"],
-            "event_id": e["event_id"],
-            "username": e["username"],
-            "ip": e["ip"],
-            "logon_id": e["logon_id"]
-        })
-
-    for e in rcm_events:
-        timeline_rows.append({
-            "timestamp": e["timestamp"].isoformat() if e["timestamp"] else None,
-            "source": e["source"],
-            "event_id": e["event_id"],
-            "username": e["username"],
-            "ip": e["ip"],
-            "logon_id": None
-        })
-
-    for e in lsm_events:
-        timeline_rows.append({
-            "timestamp": e["timestamp"].isoformat() if e["timestamp"] else None,
-            "source": e["source"],
-            "event_id": e["event_id"],
-            "username": e["username"],
-            "ip": e["ip"],
-            "logon_id": None
-        })
-
-    df_timeline = pd.DataFrame(timeline_rows).sort_values("timestamp")
+    """
+    세 log 의 시간순 흐름을 k-way merge 하면서 TIMELINE_BATCH row 씩 CSV 에 씀
+    (전체 row 를 모아서 다시 정렬하지 않음). 같은 시각이면 Security, RCM, LSM 순.
+    """
     path = os.path.join(out_dir, "timeline_all_events.csv")
-    df_timeline.to_csv(path, index=False, encoding="utf-8-sig")
+    # Security 만 logon_id 가 있음 (RCM / LSM row 는 None)
+    names = ("timestamp", "source", "event_id", "username", "ip")
+    streams = [ordered_rows(security_events, *names, "logon_id", stream=0),
+               ordered_rows(rcm_events, *names, stream=1),
+               ordered_rows(lsm_events, *names, stream=2)]
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        batch, header = [], True
+        for _, stream, _, (ts, *cols) in merge_ordered(streams):
+            if stream:
+                cols.append(None)
+            batch.append((ts.isoformat() if ts else None, *cols))
+            if len(batch) >= TIMELINE_BATCH:
+                pd.DataFrame(batch, columns=TIMELINE_COLUMNS).to_csv(f, index=False, header=header)
+                batch, header = [], False
+        if batch or header:
+            pd.DataFrame(batch, columns=TIMELINE_COLUMNS).to_csv(f, index=False, header=header)
 
     return path
 
-def write_summary_report(out_dir, sessions, failures_by_ip, failures_by_user_ip):
+
+def write_summary_report(out_dir, sessions, failures_by_ip, failures_by_user_ip, failure_alerts=None):
     report_path = os.path.join(out_dir, "summary_report.txt")
 
     total_sessions = len(sessions)
@@ -110,4 +145,60 @@ def write_summary_report(out_dir, sessions, failures_by_ip, failures_by_user_ip)
             for _, row in failures_by_user_ip.head(10).iterrows():
                 f.write(f"- {row['username']} @ {row['client_ip']}: {row['fail_count']} failures\n")
 
+        if failure_alerts is not None and not failure_alerts.empty:
+            f.write("\n[Brute-force / Password Spray Windows]\n")
+            for _, row in failure_alerts.sort_values("failures", ascending=False, kind="stable").head(20).iterrows():
+                who = row["client_ip"] if row["rule"] != "burst_user" else row["username"]
+                f.write(f"- {row['rule']} {who}: {row['failures']} failures, {row['distinct']} distinct, "
+                        f"{row['start']} -> {row['end']} (peak {row['peak_in_window']} / {row['window_sec'] // 60}m)\n")
+
     return report_path
+
+
+def timeline_frame(security_events, rcm_events, lsm_events):
+    """
+    timeline CSV 와 같은 column 의 typed DataFrame (EventStore column 에서 바로 만듦, dict row 없음).
+    """
+    frames = []
+    for store in (security_events, rcm_events, lsm_events):
+        df = store.to_frame("timestamp", "source", "event_id", "username", "ip")
+        df["logon_id"] = store.to_frame("logon_id")["logon_id"] if store.log_type == "Security" else None
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)[TIMELINE_COLUMNS] \
+        .sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def _typed_times(df, columns):
+    for c in columns:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], utc=True, format="ISO8601")
+    return df
+
+
+def write_datasets(out_dir, sessions, df_failures, security_events, rcm_events, lsm_events, fmt="auto"):
+    """
+    Columnar copies of the timeline / sessions / 4625 tables under out_dir/datasets/
+    (timeline: day + source partitions, sessions / failures: day partitions).
+    Returns {name: dataset root}.
+    """
+    fmt = resolve_format(fmt)
+    root = os.path.join(out_dir, DATASETS_DIR)
+    os.makedirs(root, exist_ok=True)
+    paths = {}
+
+    paths["timeline"] = write_dataset(os.path.join(root, "timeline"),
+                                      timeline_frame(security_events, rcm_events, lsm_events),
+                                      partition_by=("day", "source"), fmt=fmt)
+
+    df_sessions = _typed_times(pd.DataFrame(sessions), SESSION_TIME_COLUMNS)
+    if df_sessions.empty:
+        df_sessions = pd.DataFrame(columns=["session_start"])
+    paths["sessions"] = write_dataset(os.path.join(root, "sessions"), df_sessions,
+                                      time_column="session_start", partition_by=("day",), fmt=fmt)
+
+    df_fail = _typed_times(df_failures.copy(), ("timestamp",))
+    if df_fail.empty:
+        df_fail = pd.DataFrame(columns=["timestamp"])
+    paths["failures_4625"] = write_dataset(os.path.join(root, "failures_4625"), df_fail,
+                                           partition_by=("day",), fmt=fmt)
+    return paths
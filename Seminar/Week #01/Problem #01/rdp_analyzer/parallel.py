@@ -0,0 +1,118 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+
+from .config import LOG_TYPE_EVENT_IDS
+from .evtx_reader import chunk_count, iter_evtx_records
+from .chunk_index import select_chunks
+from .event_store import EventStore
+from .filters import RecordFilter
+from .parsers import parse_records
+
+# 하나의 EVTX 파일을 chunk 범위로 나눠 여러 process 에서 파싱하거나 (load_events_parallel),
+# 서로 다른 EVTX 파일을 동시에 파싱함 (load_logs_concurrently).
+
+# worker 수 대비 작업 단위를 잘게 나눠서 chunk 별 record 수 편차를 흡수
+TASKS_PER_WORKER = 4
+
+
+def split_chunk_ranges(n_chunks, n_parts):
+    """
+    [0, n_chunks) 를 연속된 n_parts 개 이하의 (first, last) 범위로 나눔.
+    """
+    n_parts = max(1, min(n_parts, n_chunks))
+    base, extra = divmod(n_chunks, n_parts)
+    ranges = []
+    first = 0
+    for i in range(n_parts):
+        last = first + base + (1 if i < extra else 0)
+        if last > first:
+            ranges.append((first, last))
+        first = last
+    return ranges
+
+
+def _load_chunk_range(task):
+    """
+    Worker: parse + filter one chunk range, return (record_count, EventStore).
+    The store pickles as a handful of arrays plus one string pool instead of
+    a list of dicts.
+    """
+    (evtx_path, log_type, reader, first_chunk, last_chunk, record_filter, file_id, record_range, index_dir,
+     skip_chunks) = task
+    n_records = 0
+
+    def counted(records):
+        nonlocal n_records
+        for rec in records:
+            n_records += 1
+            yield rec
+
+    min_record_num, max_record_num = record_range
+    records = iter_evtx_records(evtx_path, reader=reader, first_chunk=first_chunk, last_chunk=last_chunk,
+                                record_filter=record_filter, min_record_num=min_record_num,
+                                max_record_num=max_record_num, index_dir=index_dir, skip_chunks=skip_chunks)
+    batch = EventStore(log_type).extend(parse_records(counted(records), log_type, record_filter, file_id))
+    return n_records, batch
+
+
+def load_events_parallel(evtx_path: str, log_type: str, reader: str = "xml", workers: int = 2,
+                         record_filter=None, file_id=None, min_record_num=None, max_record_num=None,
+                         index_dir=None, skip_chunks=None):
+    """
+    load_events 와 같은 결과를 chunk-parallel 로 만듦.
+    pool.map 은 제출 순서대로 결과를 돌려주므로 record 순서가 그대로 유지됨.
+    시간 조건이 있으면 시간 범위에 걸치는 chunk 구간만 worker 에게 나눔.
+    """
+    offset, n_chunks = 0, chunk_count(evtx_path)
+    if record_filter is not None and record_filter.has_time:
+        keep = select_chunks(evtx_path, record_filter.since, record_filter.until, index_dir)
+        offset, n_chunks = (keep[0], keep[-1] + 1 - keep[0]) if keep else (0, 0)
+    ranges = split_chunk_ranges(n_chunks, workers * TASKS_PER_WORKER) if n_chunks else []
+    record_range = (min_record_num, max_record_num)
+    tasks = [(evtx_path, log_type, reader, offset + first, offset + last, record_filter, file_id, record_range,
+              index_dir, skip_chunks) for first, last in ranges]
+    events = EventStore(log_type)
+    with ProcessPoolExecutor(max_workers=workers) as pool, tqdm(desc=f"Parsing {log_type}", unit="it") as bar:
+        for n_records, batch in pool.map(_load_chunk_range, tasks):
+            events.merge(batch)
+            bar.update(n_records)
+
+    return events
+
+
+def _load_log(task):
+    """
+    Worker: parse one whole EVTX file, return (log_type, file_id, record_count, seconds, packed EventStore).
+    결과는 dict 리스트가 아니라 column bytes 로 돌려줌 (EventStore.to_bytes).
+    """
+    evtx_path, log_type, reader, record_filter, file_id, index_dir, skip_chunks = task
+    t0 = time.perf_counter()
+    n_records, batch = _load_chunk_range((evtx_path, log_type, reader, 0, None, record_filter, file_id, (None, None),
+                                          index_dir, skip_chunks))
+    return log_type, file_id, n_records, time.perf_counter() - t0, batch.to_bytes()
+
+
+def load_logs_concurrently(jobs, reader="xml", record_filter=None, index_dir=None):
+    """
+    jobs: [(log_type, evtx_path, file_id[, skip_chunks])] -> {(log_type, file_id): EventStore}
+    서로 독립인 로그 파일을 각각 별도 process 에서 동시에 파싱함
+    (전체 시간 ~= 가장 큰 파일 하나의 파싱 시간).
+    """
+    record_filter = record_filter or RecordFilter()
+    tasks = [(job[1], job[0], reader, record_filter.for_event_ids(LOG_TYPE_EVENT_IDS[job[0]]), job[2], index_dir,
+              job[3] if len(job) > 3 else None)
+             for job in jobs]
+
+    stores = {}
+    with ProcessPoolExecutor(max_workers=max(1, len(tasks))) as pool, \
+            tqdm(total=len(tasks), desc="Parsing logs", unit="log") as bar:
+        for fut in as_completed([pool.submit(_load_log, task) for task in tasks]):
+            log_type, file_id, n_records, seconds, packed = fut.result()
+            store = stores[(log_type, file_id)] = EventStore.from_bytes(packed)
+            tqdm.write(f"[*] {log_type}: {n_records} records -> {len(store)} events ({seconds:.1f}s)")
+            bar.update(1)
+    return stores
@@ -1,9 +1,11 @@
 # My Python version: 3.10.12
 # IDE: VS code
 
+from .config import LOG_TYPE_EVENT_IDS
+from .raw_index import RawRef
 from .utils import normalize_ip
 
-def parse_security_event(event_id, ts, d, raw_xml):
+def parse_security_event(event_id, ts, d, raw_ref):
     return {
         "timestamp": ts,
         "source": "Security",
@@ -16,10 +18,10 @@ def parse_security_event(event_id, ts, d, raw_xml):
         "logon_id": d.get("TargetLogonId") or d.get("LogonId") or d.get("SubjectLogonId"),
         "status": d.get("Status"),
         "substatus": d.get("SubStatus"),
-        "raw_xml": raw_xml,
+        "raw_ref": raw_ref,
     }
 
-def parse_rcm_event(event_id, ts, d, raw_xml):
+def parse_rcm_event(event_id, ts, d, raw_ref):
     return {
         "timestamp": ts,
         "source": "RCM",
@@ -27,10 +29,10 @@ def parse_rcm_event(event_id, ts, d, raw_xml):
         "username": d.get("Param1") or d.get("User") or d.get("UserName") or d.get("Username"),
         "ip": normalize_ip(d.get("Param3") or d.get("ClientAddress") or d.get("Address") or d.get("ClientIP")),
         "client_name": d.get("Param2") or d.get("ClientName") or d.get("Workstation"),
-        "raw_xml": raw_xml,
+        "raw_ref": raw_ref,
     }
 
-def parse_lsm_event(event_id, ts, d, raw_xml):
+def parse_lsm_event(event_id, ts, d, raw_ref):
     return {
         "timestamp": ts,
         "source": "LSM",
@@ -38,10 +40,10 @@ def parse_lsm_event(event_id, ts, d, raw_xml):
         "username": d.get("User") or d.get("UserName") or d.get("Username") or d.get("Param1"),
         "session_id": d.get("SessionID") or d.get("SessionId") or d.get("Param2") or d.get("Session"),
         "ip": normalize_ip(d.get("Address") or d.get("ClientAddress") or d.get("SourceNetworkAddress") or d.get("Param3")),
-        "raw_xml": raw_xml,
+        "raw_ref": raw_ref,
     }
 
-def parse_rdpclient_event(event_id, ts, d, raw_xml):
+def parse_rdpclient_event(event_id, ts, d, raw_ref):
     return {
         "timestamp": ts,
         "source": "RDPClient",
@@ -49,5 +51,37 @@ def parse_rdpclient_event(event_id, ts, d, raw_xml):
         "username": d.get("UserName") or d.get("Username") or d.get("Param1"),
         "target": d.get("ServerName") or d.get("TargetServer") or d.get("Param2") or d.get("Host"),
         "ip": normalize_ip(d.get("ServerAddress") or d.get("Address") or d.get("Param3")),
-        "raw_xml": raw_xml,
-    }
\ No newline at end of file
+        "raw_ref": raw_ref,
+    }
+
+# parser / reader 가 뽑는 값이 바뀌면 올려서 저장된 event cache 를 무효화함
+PARSER_VERSION = 1
+
+PARSERS = {
+    "Security": parse_security_event,
+    "RCM": parse_rcm_event,
+    "LSM": parse_lsm_event,
+    "RDPClient": parse_rdpclient_event,
+}
+
+# 각 parser 가 만드는 dict 의 key 순서 (worker 간 tuple 로 주고받을 때 사용)
+EVENT_FIELDS = {
+    log_type: tuple(parse(None, None, {}, None).keys())
+    for log_type, parse in PARSERS.items()
+}
+
+
+def parse_records(records, log_type, record_filter=None, file_id=None):
+    """
+    iter_evtx_records 결과 중 log_type 에 해당하는 EventID 만 parser 로 변환함.
+    record_filter 의 user/ip 는 여기서 쓰지 않음 (결과 범위만 정함, filters.py).
+    raw XML 대신 RawRef(file_id, chunk_offset, record_num) 만 event 에 남김.
+    """
+    wanted = LOG_TYPE_EVENT_IDS[log_type]
+    parse = PARSERS[log_type]
+    for event_id, channel, ts, d, record_ref in records:
+        if not event_id:
+            continue
+        if wanted is not None and event_id not in wanted:
+            continue
+        yield parse(event_id, ts, d, RawRef(file_id, *record_ref))
@@ -0,0 +1,176 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+import time
+import shutil
+import hashlib
+from datetime import datetime, timezone
+
+from .profiler import StageProfiler
+from .utils import ensure_dir
+
+# 분석 단계(parse / correlate / failures / timeline / v2 / plot ...)를 graph 로 보고
+# 단계마다 "입력 단계들의 fingerprint + 자기 파라미터" 로 결과 폴더를 캐시함.
+#   <cache_dir>/<stage>/<fingerprint>/   결과 파일들 + stage.json (다 써진 뒤에 생김)
+# 파라미터 하나만 바뀌면 그 단계와 그 뒤에 연결된 단계만 다시 계산됨.
+# 예전 fingerprint 폴더는 지우지 않으므로 파라미터를 되돌리면 다시 계산하지 않음.
+
+STAGE_META_NAME = "stage.json"
+PIPELINE_NAME = "pipeline.json"
+
+
+def fingerprint(data):
+    return hashlib.blake2b(json.dumps(data, sort_keys=True, default=str).encode("utf-8"),
+                           digest_size=12).hexdigest()
+
+
+def _safe(name):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+
+
+class Stage:
+    """
+    One node of the pipeline.
+
+    run(stage_dir, inputs, params) writes its files into stage_dir and
+    returns {artifact: file or directory name inside stage_dir}. inputs is
+    {dependency name: {artifact: absolute path}}. params must be JSON
+    serializable; together with version and the fingerprints of deps it
+    decides whether the cached result can be reused. publish: True (every
+    artifact), False (cache only, e.g. parsed .col stores) or the artifact
+    names to copy into the output directory.
+    """
+
+    def __init__(self, name, run, deps=(), params=None, version=1, publish=True):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.version = version
+        self.publish = publish
+
+
+class Pipeline:
+    def __init__(self, cache_dir, profiler=None, force=False):
+        self.cache_dir = cache_dir
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.force = force
+        self.stages = {}
+
+    def add(self, stage):
+        """
+        Stages must be added after their dependencies (topological order).
+        """
+        missing = [d for d in stage.deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"{stage.name}: unknown dependencies {missing}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def _key(self, stage, results):
+        return {
+            "stage": stage.name,
+            "version": stage.version,
+            "params": stage.params,
+            "deps": {d: results[d]["fingerprint"] for d in stage.deps},
+        }
+
+    def _load(self, stage_dir, fp):
+        meta_path = os.path.join(stage_dir, STAGE_META_NAME)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        outputs = {k: os.path.join(stage_dir, v) for k, v in meta.get("outputs", {}).items()}
+        if meta.get("fingerprint") != fp or not all(os.path.exists(p) for p in outputs.values()):
+            return None
+        return outputs
+
+    def run(self):
+        """
+        Run (or reuse) every stage in order.
+        Returns {stage: {"fingerprint", "cached", "seconds", "dir", "outputs"}}.
+        """
+        results = {}
+        for stage in self.stages.values():
+            key = self._key(stage, results)
+            fp = fingerprint(key)
+            stage_dir = os.path.join(self.cache_dir, _safe(stage.name), fp)
+
+            with self.profiler.stage(stage.name) as st:
+                t0 = time.perf_counter()
+                outputs = None if self.force else self._load(stage_dir, fp)
+                cached = outputs is not None
+                if not cached:
+                    outputs = self._execute(stage, key, fp, stage_dir, results)
+                st["cached"] = cached
+
+            results[stage.name] = {
+                "fingerprint": fp,
+                "cached": cached,
+                "seconds": round(time.perf_counter() - t0, 3),
+                "dir": stage_dir,
+                "outputs": outputs,
+            }
+            print(f"[*] {stage.name:<18} {fp}  {'cached' if cached else 'ran'} "
+                  f"({results[stage.name]['seconds']:.2f}s)")
+        return results
+
+    def _execute(self, stage, key, fp, stage_dir, results):
+        tmp = stage_dir + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        ensure_dir(tmp)
+
+        inputs = {d: results[d]["outputs"] for d in stage.deps}
+        names = stage.run(tmp, inputs, stage.params) or {}
+        with open(os.path.join(tmp, STAGE_META_NAME), "w", encoding="utf-8") as f:
+            json.dump({"stage": stage.name, "fingerprint": fp, "key": key, "outputs": names,
+                       "created": datetime.now(timezone.utc).isoformat()}, f, indent=2, ensure_ascii=False)
+
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        os.replace(tmp, stage_dir)
+        return {k: os.path.join(stage_dir, v) for k, v in names.items()}
+
+    def publish(self, out_dir, results):
+        """
+        Hard-link (or copy) the outputs of publish=True stages into out_dir and
+        write pipeline.json. Returns {artifact: path in out_dir}.
+        """
+        ensure_dir(out_dir)
+        published = {}
+        for name, res in results.items():
+            publish = self.stages[name].publish
+            for artifact, src in res["outputs"].items():
+                if publish is not True and (not publish or artifact not in publish):
+                    continue
+                if os.path.isdir(src):
+                    for entry in sorted(os.listdir(src)):
+                        _place(os.path.join(src, entry), os.path.join(out_dir, entry))
+                    published[artifact] = out_dir
+                else:
+                    published[artifact] = _place(src, os.path.join(out_dir, os.path.basename(src)))
+
+        path = os.path.join(out_dir, PIPELINE_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(),
+                "cache_dir": os.path.abspath(self.cache_dir),
+                "stages": {name: {k: v for k, v in res.items() if k != "outputs"} for name, res in results.items()},
+            }, f, indent=2, ensure_ascii=False)
+        published["pipeline"] = path
+        return published
+
+
+def _place(src, dst):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
@@ -0,0 +1,222 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --profile: 단계(load / correlate / write ...)별로 wall/CPU 시간, 처리량, peak RSS 를 기록해서
+# 결과 폴더에 profile.json 으로 남김. cProfile / tracemalloc 은 요청할 때만 켬 (느려짐).
+
+PROFILE_NAME = "profile.json"
+PROFILE_STATS_DIR = "profile_stats"
+PROFILE_MODES = ("basic", "cprofile", "tracemalloc", "all")
+
+_MB = 1024 * 1024
+
+
+def _rusage_peak_mb(children=False):
+    # Linux 는 KiB, macOS 는 bytes
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (_MB if sys.platform == "darwin" else 1024), 1)
+
+
+def _proc_status_mb(field):
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """
+    Linux: "5" -> /proc/self/clear_refs 로 VmHWM(peak RSS) 을 현재 값으로 되돌림.
+    안 되면 False (그 경우 peak 는 process 시작부터의 최대값).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _cpu_seconds():
+    # 자기 자신 + 끝난 worker process (ProcessPoolExecutor) 의 CPU 시간
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class StageProfiler:
+    """
+    Per-stage measurements for one run.
+
+        profiler = StageProfiler(mode="basic")
+        with profiler.stage("correlate", records=n) as st:
+            sessions = correlate_sessions(...)
+            st["sessions"] = len(sessions)
+        profiler.save(out_dir)
+
+    Every stage gets wall/CPU seconds, records/sec (if records is known) and
+    the peak RSS during the stage; extra keys set on the yielded dict are
+    stored as they are. mode "cprofile" dumps a .pstats file per stage,
+    "tracemalloc" adds the Python heap peak and the top allocation sites.
+    A disabled profiler (enabled=False) costs nothing, so callers can always
+    use it instead of checking for None.
+    """
+
+    def __init__(self, command=None, mode="basic", enabled=True, top=10):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"unknown profile mode: {mode}")
+        self.enabled = enabled
+        self.command = command
+        self.use_cprofile = enabled and mode in ("cprofile", "all")
+        self.use_tracemalloc = enabled and mode in ("tracemalloc", "all")
+        self.mode = mode
+        self.top = top
+        self.stages = []
+        self.logs = {}
+        self._cprofiles = {}
+        self._start_wall = time.perf_counter()
+        self._start_cpu = _cpu_seconds()
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, records=None):
+        info = {"records": records}
+        if not self.enabled:
+            yield info
+            return
+
+        exact_peak = _reset_peak_rss()
+        if self.use_tracemalloc:
+            tracemalloc.reset_peak()
+        prof = cProfile.Profile() if self.use_cprofile else None
+
+        wall0, cpu0 = time.perf_counter(), _cpu_seconds()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield info
+        finally:
+            if prof is not None:
+                prof.disable()
+            wall = time.perf_counter() - wall0
+            cpu = _cpu_seconds() - cpu0
+
+            row = {"stage": name, "wall_sec": round(wall, 6), "cpu_sec": round(cpu, 6)}
+            row.update(info)
+            n = row.get("records")
+            row["records_per_sec"] = round(n / wall, 1) if n and wall > 0 else None
+
+            peak = _proc_status_mb("VmHWM") if exact_peak else None
+            row["rss_peak_mb"] = peak if peak is not None else _rusage_peak_mb()
+            row["rss_peak_scope"] = "stage" if peak is not None else "process"
+            row["rss_mb"] = _proc_status_mb("VmRSS")
+            row["children_rss_peak_mb"] = _rusage_peak_mb(children=True)
+
+            if self.use_tracemalloc:
+                current, py_peak = tracemalloc.get_traced_memory()
+                row["py_heap_peak_mb"] = round(py_peak / _MB, 2)
+                row["top_allocations"] = [
+                    {"where": str(s.traceback), "size_mb": round(s.size / _MB, 3), "count": s.count}
+                    for s in tracemalloc.take_snapshot().statistics("lineno")[:self.top]
+                ]
+            if prof is not None:
+                self._cprofiles[name] = prof
+            self.stages.append(row)
+
+    def log_counts(self, log_type, scanned, kept):
+        """
+        Records in the input file vs events kept after EventID/time/user/ip filtering.
+        """
+        if not self.enabled:
+            return
+        self.logs[log_type] = {
+            "records": scanned,
+            "kept": kept,
+            "dropped": max(scanned - kept, 0) if scanned is not None else None,
+        }
+
+    def summary(self):
+        return {
+            "command": self.command,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "mode": self.mode,
+            "python": sys.version.split()[0],
+            "total": {
+                "wall_sec": round(time.perf_counter() - self._start_wall, 6),
+                "cpu_sec": round(_cpu_seconds() - self._start_cpu, 6),
+                "rss_peak_mb": _rusage_peak_mb(),
+            },
+            "logs": self.logs,
+            "stages": self.stages,
+        }
+
+    def save(self, out_dir):
+        """
+        Write profile.json (+ profile_stats/<stage>.pstats for cProfile). Returns the json path.
+        """
+        if not self.enabled:
+            return None
+        data = self.summary()
+
+        if self._cprofiles:
+            stats_dir = os.path.join(out_dir, PROFILE_STATS_DIR)
+            os.makedirs(stats_dir, exist_ok=True)
+            for row in data["stages"]:
+                prof = self._cprofiles.get(row["stage"])
+                if prof is None:
+                    continue
+                safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in row["stage"])
+                path = os.path.join(stats_dir, f"{safe}.pstats")
+                prof.dump_stats(path)
+                row["cprofile"] = path
+                row["top_functions"] = _top_functions(prof, self.top)
+
+        path = os.path.join(out_dir, PROFILE_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return path
+
+    def print_table(self):
+        if not self.enabled:
+            return
+        print("\n=== PROFILE ===")
+        print(f"{'stage':<28}{'wall(s)':>10}{'cpu(s)':>10}{'records':>12}{'rec/s':>12}{'peakRSS(MB)':>13}")
+        for row in self.stages:
+            n = row.get("records")
+            rate = row.get("records_per_sec")
+            print(f"{row['stage']:<28}{row['wall_sec']:>10.3f}{row['cpu_sec']:>10.3f}"
+                  f"{n if n is not None else '-':>12}{f'{rate:,.0f}' if rate else '-':>12}"
+                  f"{row['rss_peak_mb'] if row['rss_peak_mb'] is not None else '-':>13}")
+        for log_type, c in self.logs.items():
+            print(f"[*] {log_type}: {c['records']} records, kept {c['kept']}, dropped {c['dropped']}")
+
+
+def _top_functions(prof, n):
+    stats = pstats.Stats(prof)
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({func})", "calls": nc,
+                     "tottime": round(tt, 6), "cumtime": round(ct, 6)})
+    rows.sort(key=lambda r: r["cumtime"], reverse=True)
+    return rows[:n]
@@ -0,0 +1,115 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import os
+import json
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .evtx_reader import render_record_xml
+
+# raw XML 문자열을 메모리에 들고 있지 않고, 필요할 때 다시 렌더링할 수 있는 위치만 기록함.
+
+RAW_FILES_NAME = "raw_xml_files.json"
+RAW_INDEX_NAME = "raw_xml_index.csv"
+RAW_INDEX_COLUMNS = ["timestamp", "source", "event_id", "username", "ip", "file_id", "chunk_offset", "record_num"]
+RAW_INDEX_BATCH = 100_000
+
+# file_id: FileRegistry 번호, chunk_offset: chunk 의 파일 내 offset, record_num: record header 의 번호
+RawRef = namedtuple("RawRef", ["file_id", "chunk_offset", "record_num"])
+
+
+class FileRegistry:
+    """
+    Input EVTX files by small integer id, so that every event only has to
+    carry the id instead of the path.
+    """
+
+    def __init__(self, files=None):
+        # files: 이전 실행(checkpoint)의 등록 정보 -> 같은 파일은 같은 id 를 유지함
+        self.files = dict(files or {})
+
+    def register(self, evtx_path: str):
+        path = os.path.abspath(evtx_path)
+        st = os.stat(path)
+        for file_id, info in self.files.items():
+            if info["path"] == path:
+                # 파일이 커졌을 수 있으므로 크기/수정 시각은 갱신
+                info.update(size=st.st_size, mtime=st.st_mtime)
+                return file_id
+
+        file_id = max(self.files, default=-1) + 1
+        self.files[file_id] = {"path": path, "size": st.st_size, "mtime": st.st_mtime}
+        return file_id
+
+    def save(self, out_dir):
+        path = os.path.join(out_dir, RAW_FILES_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({str(k): v for k, v in self.files.items()}, f, indent=2, ensure_ascii=False)
+        return path
+
+
+def _iso_times(us):
+    """
+    int64 microseconds -> ISO 문자열 (datetime.isoformat 과 같은 모양: 마이크로초가 0 이면 생략), NULL_TS -> None.
+    datetime64[us] 로 바꾸므로 datetime.min 같은 값도 timeline CSV 와 같게 나옴 (NULL_TS 는 NaT 가 됨).
+    """
+    dt = us.astype("datetime64[us]")
+    out = np.where(us % 1_000_000 == 0, np.datetime_as_string(dt, unit="s"),
+                   np.datetime_as_string(dt, unit="us")).astype(object)
+    out[np.isnat(dt)] = None
+    return out
+
+
+def write_raw_index(out_dir, registry, *event_lists):
+    """
+    Sidecar index: one row per kept event -> (file_id, chunk_offset, record_num).
+    event_lists are EventStores; each is written straight from its column arrays,
+    RAW_INDEX_BATCH rows at a time (event 마다 dict 를 만들지 않음).
+    """
+    files_path = registry.save(out_dir)
+    index_path = os.path.join(out_dir, RAW_INDEX_NAME)
+    with open(index_path, "w", encoding="utf-8-sig", newline="") as f:
+        header = True
+        for events in event_lists:
+            chunk_offset = np.frombuffer(events.chunk_offset, dtype=np.int64)
+            rows = np.flatnonzero(chunk_offset >= 0)        # raw_ref 가 없는 event 는 뺌
+            if not len(rows):
+                continue
+            frame = events.to_frame("source", "event_id", "username", "ip")
+            ts = np.frombuffer(events.ts, dtype=np.int64)
+            file_id = np.frombuffer(events.file_id, dtype=np.int32)
+            record_num = np.frombuffer(events.record_num, dtype=np.int64)
+            for start in range(0, len(rows), RAW_INDEX_BATCH):
+                idx = rows[start:start + RAW_INDEX_BATCH]
+                batch = frame.iloc[idx].reset_index(drop=True)
+                batch.insert(0, "timestamp", _iso_times(ts[idx]))
+                fid = file_id[idx]
+                batch["file_id"] = pd.arrays.IntegerArray(fid.astype(np.int64), fid < 0)     # NULL_CODE -> 빈 칸
+                batch["chunk_offset"] = chunk_offset[idx]
+                batch["record_num"] = record_num[idx]
+                batch.to_csv(f, index=False, header=header)
+                header = False
+        if header:
+            pd.DataFrame(columns=RAW_INDEX_COLUMNS).to_csv(f, index=False)
+    return files_path, index_path
+
+
+def load_raw_xml(out_dir, ref):
+    """
+    RawRef -> 원본 레코드 XML 문자열 (sidecar 의 파일 정보를 사용).
+    """
+    with open(os.path.join(out_dir, RAW_FILES_NAME), encoding="utf-8") as f:
+        files = json.load(f)
+
+    info = files.get(str(ref.file_id))
+    if info is None:
+        raise KeyError(f"unknown file_id: {ref.file_id}")
+
+    st = os.stat(info["path"])
+    if st.st_size != info["size"] or st.st_mtime != info["mtime"]:
+        print(f"[!] {info['path']} changed since the analysis run; offsets may not match")
+
+    return render_record_xml(info["path"], ref.chunk_offset, ref.record_num)
@@ -0,0 +1,315 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+from collections import deque
+from datetime import timedelta
+
+from .join import user_norm
+from .correlator import _make_session_id, _pick_rcm_match, _security_session_row, _fallback_session_row
+
+# correlate_sessions 와 같은 규칙을 이벤트가 들어오는 대로 적용하는 streaming 버전.
+# 열린 세션과 최근 window 안의 이벤트만 메모리에 두고, 확정된 세션은 바로 내보냄.
+
+LSM_PAD = timedelta(minutes=2)           # 4624 세션의 LSM window: start-2m ~ end+2m
+OPEN_LSM_SPAN = timedelta(minutes=30)    # 종료(4634)가 없는 세션은 start+30m 까지
+FALLBACK_GAP = timedelta(minutes=30)     # 1149 묶음 기준 간격
+FALLBACK_END = timedelta(minutes=30)     # 마지막 1149 + 30m 을 종료로 추정
+FALLBACK_LSM_PAD = timedelta(minutes=5)
+
+
+def _lsm_matches(e, user_key):
+    # username 이 없는 LSM 이벤트는 모든 사용자 window 에 포함됨 (batch 와 같은 규칙)
+    if not user_key:
+        return True
+    return not e.get("username") or user_norm(e.get("username")) == user_key
+
+
+def _time_sorted(events):
+    return sorted(events, key=lambda e: e["timestamp"])
+
+
+class StreamingCorrelator:
+    """
+    Incremental correlate_sessions.
+
+    feed(ev) takes parsed events (any source, roughly in time order) and
+    returns the records that became final. Each record is a session row as
+    produced by correlate_sessions plus a "state":
+
+    - "started" : 4624(LogonType=10) seen (alert only, not final)
+    - "closed"  : 4634 seen and the LSM window (end + 2m) has passed
+    - "timeout" : no 4634 within session_timeout_minutes. The session is kept
+                  for another session_timeout_minutes; if its 4634 arrives in
+                  that time, a "closed" record for the same logon_id follows.
+    - "open"    : still open when flush() is called (end of input)
+    - "fallback": RCM 1149 group, only while no 4624(Type10) has been seen
+
+    Time only moves forward with the watermark = newest event time minus
+    lateness_seconds (or wall clock via advance()), so events of different
+    logs may arrive up to that much out of order. State kept between calls:
+    pending / timed-out sessions by logon_id (each with its LSM 21~25 events),
+    1149 / LSM events of the last few minutes and the open fallback groups.
+    """
+
+    def __init__(self, time_window_minutes=5, lateness_seconds=60, session_timeout_minutes=8 * 60):
+        self.win = timedelta(minutes=time_window_minutes)
+        self.win_sec = self.win.total_seconds()
+        self.lateness = timedelta(seconds=lateness_seconds)
+        # timeout 전에 open-session LSM window(start+30m) 와 1149 window 는 닫혀 있어야 함
+        self.timeout = max(timedelta(minutes=session_timeout_minutes), OPEN_LSM_SPAN + self.win)
+        self.watermark = None
+
+        self.pending = {}            # logon_id -> [session state]
+        self.recent_1149 = deque()
+        self.recent_lsm = deque()
+        self.early_logoff = {}       # 4624 보다 먼저 도착한 4634: logon_id -> ts
+        self.recent_admin = {}       # 4672: logon_id -> ts
+        self.timed_out = {}          # timeout 으로 내보낸 세션: logon_id -> [session state] (늦은 4634 대기)
+
+        self.security_seen = False
+        self.fb_current = None
+        self.fb_closing = []
+
+    # ------------------------------------------------------------
+    # input
+    # ------------------------------------------------------------
+    def feed(self, ev):
+        ts = ev["timestamp"]
+        if ts is None:
+            return []
+
+        out = []
+        source, event_id = ev["source"], ev["event_id"]
+        if source == "Security":
+            self._on_security(ev, out)
+        elif source == "RCM" and event_id == 1149:
+            self._on_1149(ev)
+        elif source == "LSM":
+            self._on_lsm(ev)
+
+        mark = ts - self.lateness
+        if self.watermark is None or mark > self.watermark:
+            self.watermark = mark
+        self._expire(out)
+        return out
+
+    def feed_many(self, events):
+        out = []
+        for ev in events:
+            out.extend(self.feed(ev))
+        return out
+
+    def advance(self, now):
+        """
+        Move the watermark by wall clock (naive UTC) so idle logs still time out.
+        """
+        mark = now - self.lateness
+        out = []
+        if self.watermark is None or mark > self.watermark:
+            self.watermark = mark
+            self._expire(out)
+        return out
+
+    def open_count(self):
+        return sum(len(v) for v in self.pending.values())
+
+    # ------------------------------------------------------------
+    # event handlers
+    # ------------------------------------------------------------
+    def _on_security(self, ev, out):
+        event_id = ev["event_id"]
+        logon_id = ev["logon_id"]
+
+        if event_id == 4624:
+            lt = ev.get("logon_type")
+            if not lt or str(lt).strip() != "10":
+                return
+            self._start_session(ev, out)
+
+        elif event_id == 4634 and logon_id:
+            sessions = self.pending.get(logon_id)
+            if not sessions and logon_id in self.timed_out:
+                # timeout 으로 내보낸 세션의 4634 -> 다시 열어서 "closed" 로 한 번 더 내보냄
+                sessions = self.pending[logon_id] = self.timed_out.pop(logon_id)
+            if sessions:
+                for s in sessions:
+                    s["end"] = ev["timestamp"]
+            else:
+                self.early_logoff[logon_id] = ev["timestamp"]
+
+        elif event_id == 4672 and logon_id:
+            self.recent_admin[logon_id] = ev["timestamp"]
+            for s in self.pending.get(logon_id, []) + self.timed_out.get(logon_id, []):
+                s["admin"] = True
+
+    def _start_session(self, ev, out):
+        if not self.security_seen:
+            # Security 세션이 하나라도 있으면 batch 와 같이 fallback 은 쓰지 않음
+            self.security_seen = True
+            self.fb_current = None
+            self.fb_closing = []
+
+        start = ev["timestamp"]
+        user_key = user_norm(ev["username"])
+        logon_id = ev["logon_id"]
+        s = {
+            "ev": ev,
+            "user_key": user_key,
+            "end": self.early_logoff.pop(logon_id, None) if logon_id else None,
+            "admin": logon_id in self.recent_admin,
+            "rcm": [e for e in self.recent_1149 if start - self.win <= e["timestamp"] <= start + self.win],
+            "lsm": [e for e in self.recent_lsm if e["timestamp"] >= start - LSM_PAD and _lsm_matches(e, user_key)],
+        }
+        self.pending.setdefault(logon_id, []).append(s)
+
+        out.append({
+            "state": "started",
+            "session_start": start.isoformat(),
+            "username": ev["username"],
+            "domain": ev["domain"],
+            "client_ip": ev["ip"],
+            "workstation": ev["workstation"],
+            "logon_id": logon_id,
+        })
+
+    def _on_1149(self, ev):
+        ts = ev["timestamp"]
+        self.recent_1149.append(ev)
+        for sessions in self.pending.values():
+            for s in sessions:
+                start = s["ev"]["timestamp"]
+                if start - self.win <= ts <= start + self.win:
+                    s["rcm"].append(ev)
+
+        if not self.security_seen and ev.get("ip"):
+            self._fallback_add(ev)
+
+    def _on_lsm(self, ev):
+        ts = ev["timestamp"]
+        self.recent_lsm.append(ev)
+
+        for sessions in list(self.pending.values()) + list(self.timed_out.values()):
+            for s in sessions:
+                if ts >= s["ev"]["timestamp"] - LSM_PAD and _lsm_matches(ev, s["user_key"]):
+                    s["lsm"].append(ev)
+
+        groups = self.fb_closing + ([self.fb_current] if self.fb_current else [])
+        for g in groups:
+            if ts >= g["session_start_ts"] - FALLBACK_LSM_PAD and _lsm_matches(ev, g["user_key"]):
+                g["lsm"].append(ev)
+
+    def _fallback_add(self, ev):
+        u = ev.get("username") or "UNKNOWN"
+        ip = ev["ip"]
+        ts = ev["timestamp"]
+
+        cur = self.fb_current
+        if cur is not None:
+            same_user = str(cur["username"]).lower() == str(u).lower()
+            same_ip = cur["client_ip"] == ip
+            if same_user and same_ip and (ts - cur["auth_events"][-1]["timestamp"]) <= FALLBACK_GAP:
+                cur["auth_events"].append(ev)
+                return
+            self.fb_closing.append(cur)
+
+        self.fb_current = {
+            "session_start_ts": ts,
+            "session_end_ts": None,
+            "username": u,
+            "client_ip": ip,
+            "session_id": _make_session_id("RCM1149", u, ip, ts),
+            "auth_events": [ev],
+            "user_key": user_norm(u),
+            "lsm": [e for e in self.recent_lsm
+                    if e["timestamp"] >= ts - FALLBACK_LSM_PAD and _lsm_matches(e, user_norm(u))],
+        }
+
+    # ------------------------------------------------------------
+    # emit
+    # ------------------------------------------------------------
+    def _session_record(self, s, state):
+        ev = s["ev"]
+        start, end = ev["timestamp"], s["end"]
+        tmin = start - LSM_PAD
+        tmax = end + LSM_PAD if end else start + OPEN_LSM_SPAN
+        lsm_list = [e for e in _time_sorted(s["lsm"]) if tmin <= e["timestamp"] <= tmax]
+        rcm_match = _pick_rcm_match(_time_sorted(s["rcm"]), start, ev["username"], ev["ip"], self.win_sec)
+        row = _security_session_row(ev, end, rcm_match, lsm_list, s["admin"])
+        row["state"] = state
+        return row
+
+    def _fallback_record(self, g):
+        last_auth = g["auth_events"][-1]["timestamp"]
+        end_guess = last_auth + FALLBACK_END
+        tmin = g["session_start_ts"] - FALLBACK_LSM_PAD
+        tmax = end_guess + FALLBACK_LSM_PAD
+        lsm_list = [e for e in _time_sorted(g["lsm"]) if tmin <= e["timestamp"] <= tmax]
+        row = _fallback_session_row(g, end_guess, lsm_list)
+        row["state"] = "fallback"
+        return row
+
+    def _expire(self, out):
+        wm = self.watermark
+
+        for logon_id in list(self.pending):
+            keep = []
+            for s in self.pending[logon_id]:
+                start = s["ev"]["timestamp"]
+                if s["end"] is not None and wm >= max(s["end"] + LSM_PAD, start + self.win):
+                    out.append(self._session_record(s, "closed"))
+                elif s["end"] is None and wm >= start + self.timeout:
+                    out.append(self._session_record(s, "timeout"))
+                    self.timed_out.setdefault(logon_id, []).append(s)
+                else:
+                    keep.append(s)
+            if keep:
+                self.pending[logon_id] = keep
+            else:
+                del self.pending[logon_id]
+
+        cur = self.fb_current
+        if cur is not None and wm > cur["auth_events"][-1]["timestamp"] + FALLBACK_GAP:
+            self.fb_closing.append(cur)
+            self.fb_current = None
+        still_closing = []
+        for g in self.fb_closing:
+            if wm >= g["auth_events"][-1]["timestamp"] + FALLBACK_END + FALLBACK_LSM_PAD:
+                out.append(self._fallback_record(g))
+            else:
+                still_closing.append(g)
+        self.fb_closing = still_closing
+
+        # 앞으로 올 세션의 window 에 들어갈 수 없는 이벤트는 버림
+        while self.recent_1149 and self.recent_1149[0]["timestamp"] < wm - self.win:
+            self.recent_1149.popleft()
+        lsm_horizon = wm - max(LSM_PAD, FALLBACK_LSM_PAD)
+        while self.recent_lsm and self.recent_lsm[0]["timestamp"] < lsm_horizon:
+            self.recent_lsm.popleft()
+        for d in (self.early_logoff, self.recent_admin):
+            for k in [k for k, t in d.items() if t < wm - self.win]:
+                del d[k]
+        for logon_id in list(self.timed_out):
+            keep = [s for s in self.timed_out[logon_id] if wm < s["ev"]["timestamp"] + 2 * self.timeout]
+            if keep:
+                self.timed_out[logon_id] = keep
+            else:
+                del self.timed_out[logon_id]
+
+    def flush(self):
+        """
+        End of input: emit everything still held (same result as the batch run).
+        """
+        out = []
+        for sessions in self.pending.values():
+            for s in sessions:
+                out.append(self._session_record(s, "closed" if s["end"] is not None else "open"))
+        self.pending = {}
+        self.timed_out = {}
+
+        if self.fb_current is not None:
+            self.fb_closing.append(self.fb_current)
+            self.fb_current = None
+        for g in self.fb_closing:
+            out.append(self._fallback_record(g))
+        self.fb_closing = []
+        return out
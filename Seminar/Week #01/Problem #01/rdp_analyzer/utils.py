@@ -2,11 +2,51 @@
 # IDE: VS code
 
 import os
+import re
+from datetime import datetime, timezone
 from dateutil import parser as dtparser
 
+# python-evtx 가 만드는 SystemTime 형식: "2025-12-02 06:10:45.365297" (소수점 없을 수도 있음)
+_ISO_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?$")
+
+FILETIME_EPOCH_DIFF = 11644473600  # 1601-01-01 -> 1970-01-01 (sec)
+
+
+def parse_iso_fast(dt_str: str):
+    """
+    고정 형식 ISO-8601(naive) 만 처리하는 빠른 파서. 형식이 다르면 None.
+    """
+    m = _ISO_RE.match(dt_str)
+    if m is None:
+        return None
+    year, month, day, hour, minute, sec, frac = m.groups()
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(sec),
+                        int(frac.ljust(6, "0")) if frac else 0)
+    except ValueError:
+        return None
+
+
+def filetime_to_dt(qword: int):
+    """
+    Raw FILETIME -> naive UTC datetime.
+    python-evtx 의 parse_filetime 과 같은 float 계산을 써서 XML 경로와 결과가 같게 함.
+    """
+    if qword == 0:
+        return datetime.min
+    try:
+        return datetime.fromtimestamp(float(qword) * 1e-7 - FILETIME_EPOCH_DIFF, timezone.utc).replace(tzinfo=None)
+    except (ValueError, OSError, OverflowError):
+        return datetime.min
+
+
 def safe_dt(dt_str: str):
     if not dt_str:
         return None
+    dt = parse_iso_fast(dt_str)
+    if dt is not None:
+        return dt
+    # 형식이 다를 때만 범용 파서 사용
     try:
         return dtparser.parse(dt_str)
     except Exception:
@@ -0,0 +1,36 @@
+# My Python version: 3.10.12
+# IDE: VS code
+
+import argparse
+import pandas as pd
+
+from rdp_analyzer.raw_index import RAW_INDEX_NAME, RawRef, load_raw_xml
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render the raw XML of analyzed events from the sidecar index")
+    parser.add_argument("--outdir", default="output", help="Output directory of main.py")
+    parser.add_argument("--record", type=int, required=True, help="EVTX record number (record_num column of the index)")
+    parser.add_argument("--source", help="Security / RCM / LSM / RDPClient")
+    parser.add_argument("--event-id", type=int)
+    args = parser.parse_args()
+
+    df = pd.read_csv(f"{args.outdir}/{RAW_INDEX_NAME}")
+    df = df[df["record_num"] == args.record]
+    if args.source:
+        df = df[df["source"] == args.source]
+    if args.event_id:
+        df = df[df["event_id"] == args.event_id]
+
+    if df.empty:
+        print("[!] no matching event in index")
+        return
+
+    for _, row in df.iterrows():
+        ref = RawRef(int(row["file_id"]), int(row["chunk_offset"]), int(row["record_num"]))
+        print(f"# {row['timestamp']} {row['source']} {row['event_id']} {ref}")
+        print(load_raw_xml(args.outdir, ref))
+
+
+if __name__ == "__main__":
+    main()